@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for the hot paths of the sc2 library, see run_benchmarks.py
+"""
@@ -0,0 +1,466 @@
+"""
+Benchmark cases for the hot paths of the sc2 library.
+
+Each case receives a 'SyntheticGame' and returns the function that is timed.
+Everything that should not be measured (creating the bot, choosing targets) happens before returning.
+"""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from benchmarks.synthetic import SyntheticGame
+from sc2.action import combine_actions
+from sc2.client import Client
+from sc2.creep import CreepAnalysis
+from sc2.data import Status
+from sc2.enemy_memory import EnemyMemory
+from sc2.expiring_dict import ExpiringDict, FrameExpiringDict
+from sc2.game_data import GameData
+from sc2.game_state import GameState
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.pixel_map import PixelMap
+from sc2.position import Point2, Point3
+from sc2.power_source import PowerSource, PsionicMatrix
+from sc2.proxy import Proxy
+from sc2.unit_command import UnitCommand
+
+BenchmarkSetup = Callable[[SyntheticGame], Callable[[], Any]]
+
+BENCHMARKS: Dict[str, BenchmarkSetup] = {}
+
+
+def benchmark(name: str) -> Callable[[BenchmarkSetup], BenchmarkSetup]:
+    """ Registers a benchmark case under 'name'. """
+
+    def register(setup: BenchmarkSetup) -> BenchmarkSetup:
+        assert name not in BENCHMARKS, f"Benchmark {name} is registered twice"
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@benchmark("units.closer_than")
+def units_closer_than(game: SyntheticGame):
+    bot = game.bot()
+    center = bot.game_info.map_center
+    return lambda: bot.all_units.closer_than(20, center)
+
+
+@benchmark("units.of_type")
+def units_of_type(game: SyntheticGame):
+    bot = game.bot()
+    types = {UnitTypeId.SCV, UnitTypeId.MARINE, UnitTypeId.ZERGLING}
+    return lambda: bot.all_units.of_type(types)
+
+
+@benchmark("units.tags_in")
+def units_tags_in(game: SyntheticGame):
+    bot = game.bot()
+    tags = {unit.tag for unit in bot.all_units[::2]}
+    return lambda: bot.all_units.tags_in(tags)
+
+
+@benchmark("units.union")
+def units_union(game: SyntheticGame):
+    bot = game.bot()
+    return lambda: bot.units | bot.enemy_units | bot.resources
+
+
+@benchmark("units.difference")
+def units_difference(game: SyntheticGame):
+    bot = game.bot()
+    half = bot.all_units.subgroup(bot.all_units[::2])
+    return lambda: bot.all_units.subgroup(bot.all_units) - half
+
+
+@benchmark("units.find_by_tag")
+def units_find_by_tag(game: SyntheticGame):
+    bot = game.bot()
+    tags = [unit.tag for unit in bot.all_units[::10]]
+    return lambda: [bot.all_units.find_by_tag(tag) for tag in tags]
+
+
+@benchmark("units.sorted_by_distance_to")
+def units_sorted_by_distance_to(game: SyntheticGame):
+    bot = game.bot()
+    center = bot.game_info.map_center
+    return lambda: bot.all_units.sorted_by_distance_to(center)
+
+
+def _distance_benchmark(method: int) -> BenchmarkSetup:
+
+    def setup(game: SyntheticGame):
+        bot = game.bot(distance_calculation_method=method)
+        own = list(bot.units)
+        enemies = list(bot.enemy_units)
+
+        def run():
+            # A new frame: invalidate the distance cache, then query all own-enemy pairs
+            bot._generated_frame = -1
+            if method != 0:
+                bot.calculate_distances()
+            for unit in own:
+                for enemy in enemies:
+                    unit.distance_to_squared(enemy)
+
+        return run
+
+    return setup
+
+
+for _method in range(4):
+    benchmark(f"distance.method{_method}")(_distance_benchmark(_method))
+
+
+@benchmark("bot._prepare_units")
+def bot_prepare_units(game: SyntheticGame):
+    bot = game.bot()
+    return bot._prepare_units
+
+
+@benchmark("unit.type_properties")
+def unit_type_properties(game: SyntheticGame):
+    bot = game.bot()
+
+    def run():
+        # Fresh Unit objects as in a new frame, then read the per-type data of each
+        bot._prepare_units()
+        for unit in bot.all_units:
+            _ = unit.is_structure, unit.can_attack_ground, unit.ground_range, unit.air_dps, unit.is_armored
+
+    return run
+
+
+@benchmark("game_state.init")
+def game_state_init(game: SyntheticGame):
+    observation = game.observation_proto
+    return lambda: GameState(observation)
+
+
+@benchmark("game_state.init_eager")
+def game_state_init_eager(game: SyntheticGame):
+    observation = game.observation_proto
+    return lambda: GameState(observation).decode_lazy_fields()
+
+
+@benchmark("game_data.init")
+def game_data_init(game: SyntheticGame):
+    data = game.game_data_proto
+    return lambda: GameData(data)
+
+
+@benchmark("pixel_map.init_bits")
+def pixel_map_init_bits(game: SyntheticGame):
+    grid = game.game_info_proto.start_raw.pathing_grid
+    return lambda: PixelMap(grid, in_bits=True)
+
+
+@benchmark("pixel_map.init_bytes")
+def pixel_map_init_bytes(game: SyntheticGame):
+    grid = game.game_info_proto.start_raw.terrain_height
+    return lambda: PixelMap(grid)
+
+
+@benchmark("pixel_map.init_packed")
+def pixel_map_init_packed(game: SyntheticGame):
+    grid = game.game_info_proto.start_raw.pathing_grid
+    return lambda: PixelMap(grid, in_bits=True, packed=True)
+
+
+def _pixel_map_lookup_benchmark(packed: bool, batch: bool) -> BenchmarkSetup:
+
+    def setup(game: SyntheticGame):
+        pixel_map = PixelMap(game.game_info_proto.start_raw.pathing_grid, in_bits=True, packed=packed)
+        points = [unit.position.rounded for unit in game.bot().all_units]
+        if batch:
+            points_array = np.array(points)
+            return lambda: pixel_map.values_at(points_array)
+        return lambda: [pixel_map[point] for point in points]
+
+    return setup
+
+
+for _packed in (False, True):
+    for _batch in (False, True):
+        benchmark(f"pixel_map.{'values_at' if _batch else 'getitem'}{'_packed' if _packed else ''}")(
+            _pixel_map_lookup_benchmark(_packed, _batch)
+        )
+
+
+@benchmark("bot.grid_predicates")
+def bot_grid_predicates(game: SyntheticGame):
+    bot = game.bot()
+    points = [unit.position for unit in bot.all_units]
+    return lambda: [bot.in_pathing_grid(p) and bot.has_creep(p) and bot.is_visible(p) for p in points]
+
+
+@benchmark("bot.grid_predicates_batch")
+def bot_grid_predicates_batch(game: SyntheticGame):
+    bot = game.bot()
+    points = bot._points_array(bot.all_units)
+    return lambda: bot.in_pathing_grid_batch(points) & bot.has_creep_batch(points) & bot.is_visible_batch(points)
+
+
+@benchmark("bot.production_queries")
+def bot_production_queries(game: SyntheticGame):
+    bot = game.bot()
+    unit_types = [UnitTypeId.SCV, UnitTypeId.MARINE, UnitTypeId.BARRACKS, UnitTypeId.SUPPLYDEPOT, UnitTypeId.COMMANDCENTER]
+
+    def run():
+        # A new frame, then the queries of a macro manager
+        bot.state.game_loop += 1
+        for _ in range(10):
+            for unit_type in unit_types:
+                bot.already_pending(unit_type)
+                bot.structure_type_build_progress(unit_type)
+            bot.tech_requirement_progress(UnitTypeId.MARINE)
+
+    return run
+
+
+@benchmark("bot.train_many")
+def bot_train_many(game: SyntheticGame):
+    bot = game.bot()
+
+    def run():
+        # A new frame with enough resources, then one macro round
+        bot.state.game_loop += 1
+        bot.actions.clear()
+        bot.unit_tags_received_action.clear()
+        bot.minerals, bot.vespene, bot.supply_left = 5000, 5000, 100
+        bot.train_many({UnitTypeId.SCV: 4, UnitTypeId.MARINE: 10, UnitTypeId.MARAUDER: 4})
+
+    return run
+
+
+def _expiring_dict_benchmark(dict_class) -> BenchmarkSetup:
+
+    def setup(game: SyntheticGame):
+        bot = game.bot()
+        tags = [unit.tag for unit in bot.all_units]
+        expiring = dict_class(bot, max_age_frames=20)
+
+        def run():
+            # One frame: remember a third of the units, then look all of them up
+            bot.state.game_loop += 1
+            for tag in tags[bot.state.game_loop % 3::3]:
+                expiring[tag] = bot.state.game_loop
+            for tag in tags:
+                _ = tag in expiring
+            return len(expiring)
+
+        return run
+
+    return setup
+
+
+benchmark("expiring_dict.frame")(_expiring_dict_benchmark(ExpiringDict))
+benchmark("expiring_dict.frame_bucketed")(_expiring_dict_benchmark(FrameExpiringDict))
+
+
+@benchmark("enemy_memory.update_and_query")
+def enemy_memory_update_and_query(game: SyntheticGame):
+    bot = game.bot()
+    memory = EnemyMemory()
+    enemies = bot.all_enemy_units
+    center = bot.game_info.map_center
+
+    def run():
+        # One frame: store the visible enemies, then the queries of an army manager
+        bot.state.game_loop += 1
+        memory.update(enemies, bot.state.game_loop)
+        return memory.closer_than(20, center), memory.of_type(UnitTypeId.ZERGLING)
+
+    return run
+
+
+def _debug_client() -> Client:
+    client = Client(object())
+
+    async def execute(**kwargs):
+        # Serialize the request as the websocket would
+        return await execute_serialized(sc_pb.Request(**kwargs).SerializeToString())
+
+    async def execute_serialized(request_bytes: bytes):
+        return request_bytes
+
+    client._execute = execute
+    client._execute_serialized = execute_serialized
+    return client
+
+
+@benchmark("debug.immediate")
+def debug_immediate(game: SyntheticGame):
+    bot = game.bot()
+    client = _debug_client()
+    points = [Point3((*unit.position, 10)) for unit in bot.all_units]
+    center = Point3((*bot.game_info.map_center, 10))
+    loop = asyncio.new_event_loop()
+
+    def run():
+        # The same drawings have to be queued again every frame, one of them moves
+        bot.state.game_loop += 1
+        for point in points:
+            client.debug_line_out(point, center)
+            client.debug_box2_out(point)
+        client.debug_sphere_out(center + Point3((bot.state.game_loop % 10, 0, 0)), 1)
+        loop.run_until_complete(client._send_debug())
+
+    return run
+
+
+@benchmark("debug.retained")
+def debug_retained(game: SyntheticGame):
+    bot = game.bot()
+    client = _debug_client()
+    points = [Point3((*unit.position, 10)) for unit in bot.all_units]
+    center = Point3((*bot.game_info.map_center, 10))
+    layer = client.debug_layer("units")
+    for point in points:
+        layer.line(point, center)
+        layer.box(point + Point3((-0.25, -0.25, -0.25)), point + Point3((0.25, 0.25, 0.25)))
+    loop = asyncio.new_event_loop()
+
+    def run():
+        # Only the layer with the moving sphere changes
+        bot.state.game_loop += 1
+        moving = client.debug_layer("moving")
+        moving.clear()
+        moving.sphere(center + Point3((bot.state.game_loop % 10, 0, 0)), 1)
+        loop.run_until_complete(client._send_debug())
+
+    return run
+
+
+def _proxy_response_bytes(game: SyntheticGame) -> bytes:
+    return sc_pb.Response(observation=game.observation_proto, status=Status.in_game.value).SerializeToString()
+
+
+@benchmark("proxy.full_decode")
+def proxy_full_decode(game: SyntheticGame):
+    # Reference: decoding and encoding every observation, as the proxy did before
+    response_bytes = _proxy_response_bytes(game)
+    return lambda: sc_pb.Response.FromString(response_bytes).SerializeToString()
+
+
+@benchmark("proxy.parse_response")
+def proxy_parse_response(game: SyntheticGame):
+    response_bytes = _proxy_response_bytes(game)
+    controller = SimpleNamespace(_process=SimpleNamespace(_port=0), _status=Status.in_game)
+    proxy = Proxy(controller, SimpleNamespace(name="bot"), 0, game_time_limit=3600)
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(proxy.parse_response(response_bytes))
+
+
+def _psionic_matrix(game: SyntheticGame) -> PsionicMatrix:
+    # A pylon at every own structure
+    bot = game.bot()
+    return PsionicMatrix([PowerSource(structure.position, 6.5, structure.tag) for structure in bot.structures])
+
+
+@benchmark("psionic_matrix.covers")
+def psionic_matrix_covers(game: SyntheticGame):
+    matrix = _psionic_matrix(game)
+    points = [Point2((x + 0.5, y + 0.5)) for x in range(20, 60) for y in range(20, 60)]
+    return lambda: [point for point in points if any(source.covers(point) for source in matrix.sources)]
+
+
+@benchmark("psionic_matrix.covers_batch")
+def psionic_matrix_covers_batch(game: SyntheticGame):
+    matrix = _psionic_matrix(game)
+    points = np.array([(x + 0.5, y + 0.5) for x in range(20, 60) for y in range(20, 60)])
+    return lambda: points[matrix.covers_batch(points)]
+
+
+@benchmark("warp_in.spots")
+def warp_in_spots(game: SyntheticGame):
+    bot = game.bot()
+    bot.state.psionic_matrix = _psionic_matrix(game)
+
+    def run():
+        # A new frame: the free cells are computed again, then spots for 10 stalkers
+        bot.state.game_loop += 1
+        return bot.warp_in_planner.spots(10, footprint=2)
+
+    return run
+
+
+def _creep_grids(game: SyntheticGame):
+    bot = game.bot()
+    creep = bot.state.creep.data_numpy == 1
+    pathable = bot.game_info.pathing_grid.data_numpy == 1
+    placeable = bot.game_info.placement_grid.data_numpy == 1
+    # The creep of the next frame has grown at one side
+    grown = creep.copy()
+    rows, columns = np.nonzero(creep)
+    grown[rows.min() - 2:rows.min(), columns.min():columns.max()] = True
+    return creep, grown, pathable, placeable
+
+
+@benchmark("creep.update_incremental")
+def creep_update_incremental(game: SyntheticGame):
+    creep, grown, pathable, placeable = _creep_grids(game)
+    analysis = CreepAnalysis()
+    analysis.update(creep, pathable, placeable)
+    frames = [grown, creep]
+
+    def run():
+        frames.reverse()
+        analysis.update(frames[0], pathable, placeable)
+
+    return run
+
+
+@benchmark("creep.tumor_spots")
+def creep_tumor_spots(game: SyntheticGame):
+    creep, grown, pathable, placeable = _creep_grids(game)
+    analysis = CreepAnalysis()
+    analysis.update(creep, pathable, placeable)
+    frames = [grown, creep]
+
+    def run():
+        # A new frame, then spots for 3 queens
+        frames.reverse()
+        analysis.update(frames[0], pathable, placeable)
+        return analysis.tumor_spots(3)
+
+    return run
+
+
+@benchmark("action.combine_actions")
+def action_combine_actions(game: SyntheticGame):
+    bot = game.bot()
+    targets = [Point2((40, 40)), Point2((100, 100)), bot.enemy_units.first if bot.enemy_units else None]
+    commands: List[UnitCommand] = []
+    for i, unit in enumerate(bot.units):
+        target = targets[i % len(targets)]
+        ability = AbilityId.ATTACK if i % 2 else AbilityId.MOVE_MOVE
+        commands.append(UnitCommand(ability, unit, target=target))
+        if i % 7 == 0:
+            commands.append(UnitCommand(AbilityId.STOP_STOP, unit))
+    return lambda: [sc_pb.Action(action_raw=action) for action in combine_actions(commands)]
+
+
+@benchmark("bot._find_expansion_locations")
+def bot_find_expansion_locations(game: SyntheticGame):
+    bot = game.bot(first_step=False)
+
+    def run():
+        bot._expansion_positions_list.clear()
+        bot._resource_location_to_expansion_position_dict.clear()
+        bot._find_expansion_locations()
+
+    return run
+
+
+@benchmark("game_info._find_ramps_and_vision_blockers")
+def game_info_find_ramps_and_vision_blockers(game: SyntheticGame):
+    bot = game.bot(first_step=False)
+    return bot.game_info._find_ramps_and_vision_blockers
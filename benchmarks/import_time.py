@@ -0,0 +1,64 @@
+"""
+Measures how long importing the library takes, using python's '-X importtime' in fresh interpreter processes.
+
+Usage from the repository root::
+
+    python -m benchmarks.import_time
+    # Other module, more runs, and store the results
+    python -m benchmarks.import_time --module sc2.main --repeat 10 --output import_time.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """ Imports 'module' in a new interpreter and returns the cumulative import time in microseconds of each imported module. """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="sc2.bot_ai", help="Module to import, default sc2.bot_ai")
+    parser.add_argument("--repeat", type=int, default=5, help="Amount of fresh interpreters to import in")
+    parser.add_argument("--top", type=int, default=15, help="Amount of slowest imported modules to print")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    medians = {name: statistics.median(run.get(name, 0) for run in runs) for name in runs[0]}
+    totals = [run[args.module] for run in runs]
+    print(f"{'module':<55} {'cumulative':>12}")
+    for name, value in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:<55} {value / 1000:>10.1f} ms")
+    print(f"\nimport {args.module}: median {statistics.median(totals) / 1000:.1f} ms, min {min(totals) / 1000:.1f} ms")
+
+    if args.output:
+        report = {"module": args.module, "python": sys.version, "total_us": totals, "median_us": medians}
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
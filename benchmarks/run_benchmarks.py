@@ -0,0 +1,119 @@
+"""
+Runs the sc2 hot path benchmarks offline on synthetic observations and writes the results as JSON.
+
+Usage from the repository root::
+
+    # Run all benchmarks and store the results
+    python -m benchmarks.run_benchmarks --output baseline.json
+    # After a change: compare against the baseline, exit code 1 if a benchmark got more than 20% slower
+    python -m benchmarks.run_benchmarks --output new.json --baseline baseline.json --threshold 0.2
+    # Only run some of the benchmarks
+    python -m benchmarks.run_benchmarks --filter units. --sizes 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.cases import BENCHMARKS
+from benchmarks.synthetic import SyntheticGame
+
+DEFAULT_SIZES = [50, 200, 500]
+
+
+def time_function(function, repeat: int, min_time: float) -> Dict[str, float]:
+    """ Returns min, median and max time of one call in microseconds, using timeit's autorange to pick the number of calls. """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    timings = [timer.timeit(number) / number * 1e6 for _ in range(repeat)]
+    return {
+        "min_us": min(timings),
+        "median_us": statistics.median(timings),
+        "max_us": max(timings),
+        "calls": number,
+    }
+
+
+def run(sizes: List[int], name_filter: Optional[str], repeat: int, min_time: float) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for size in sizes:
+        game = SyntheticGame(size)
+        for name, setup in BENCHMARKS.items():
+            if name_filter and name_filter not in name:
+                continue
+            key = f"{name}[n={size}]"
+            results[key] = time_function(setup(game), repeat, min_time)
+            print(f"{key:<55} {results[key]['median_us']:>12.1f} us")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """ Prints the relative change of each benchmark and returns the names of the ones slower than the threshold. """
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        old, new = baseline[key]["median_us"], result["median_us"]
+        change = new / old - 1 if old else 0
+        marker = ""
+        if change > threshold:
+            regressions.append(key)
+            marker = "  REGRESSION"
+        print(f"{key:<55} {old:>12.1f} {new:>12.1f} {change:>+8.1%}{marker}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="JSON file of a previous run to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown of the median compared to the baseline before failing, default 0.2 (20%%)",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Amount of units per observation")
+    parser.add_argument("--filter", dest="name_filter", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timing repetition")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.name_filter, args.repeat, args.min_time)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nWrote results to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) are more than {args.threshold:.0%} slower than the baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Deterministic synthetic game data for the benchmarks, no SC2 installation is required.
+
+The map is 152x152 with two high ground mains that each have one ramp, a few vision blockers
+and up to 8 bases with 8 mineral fields and 2 vespene geysers each.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from s2clientprotocol import common_pb2 as common_pb
+from s2clientprotocol import raw_pb2 as raw_pb
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.bot_ai import BotAI
+from sc2.data import Attribute, Race
+from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+from sc2.game_data import GameData
+from sc2.game_info import GameInfo
+from sc2.game_state import GameState
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.effect_id import EffectId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.ids.upgrade_id import UpgradeId
+
+MAP_SIZE = 152
+PLAYABLE_MIN = 8
+PLAYABLE_MAX = MAP_SIZE - 8
+LOW_GROUND = 100
+HIGH_GROUND = 150
+PLATEAU_SIZE = 36
+RAMP_LENGTH = 4
+
+BASE_CENTERS: List[Tuple[float, float]] = [
+    (24.5, 24.5),
+    (127.5, 127.5),
+    (24.5, 75.5),
+    (127.5, 76.5),
+    (75.5, 24.5),
+    (76.5, 127.5),
+    (60.5, 60.5),
+    (91.5, 91.5),
+]
+
+L, A, B, M, S = Attribute.Light, Attribute.Armored, Attribute.Biological, Attribute.Mechanical, Attribute.Structure
+# unit type: (race, attributes, minerals, vespene, food, weapon range or None)
+UNIT_SPECS: Dict[UnitTypeId, Tuple[Race, Tuple[Attribute, ...], int, int, float, Optional[float]]] = {
+    UnitTypeId.SCV: (Race.Terran, (L, B, M), 50, 0, 1, 0.1),
+    UnitTypeId.MARINE: (Race.Terran, (L, B), 50, 0, 1, 5),
+    UnitTypeId.MARAUDER: (Race.Terran, (A, B), 100, 25, 2, 6),
+    UnitTypeId.COMMANDCENTER: (Race.Terran, (A, M, S), 400, 0, 0, None),
+    UnitTypeId.BARRACKS: (Race.Terran, (A, M, S), 150, 0, 0, None),
+    UnitTypeId.SUPPLYDEPOT: (Race.Terran, (A, M, S), 100, 0, 0, None),
+    UnitTypeId.DRONE: (Race.Zerg, (L, B), 50, 0, 1, 0.1),
+    UnitTypeId.ZERGLING: (Race.Zerg, (L, B), 25, 0, 0.5, 0.1),
+    UnitTypeId.ROACH: (Race.Zerg, (A, B), 75, 25, 2, 4),
+    UnitTypeId.HATCHERY: (Race.Zerg, (A, B, S), 300, 0, 0, None),
+    UnitTypeId.MINERALFIELD: (Race.NoRace, (A, S), 0, 0, 0, None),
+    UnitTypeId.MINERALFIELD750: (Race.NoRace, (A, S), 0, 0, 0, None),
+    UnitTypeId.VESPENEGEYSER: (Race.NoRace, (A, S), 0, 0, 0, None),
+}
+OWN_TYPES = [UnitTypeId.SCV, UnitTypeId.SCV, UnitTypeId.MARINE, UnitTypeId.MARINE, UnitTypeId.MARAUDER]
+OWN_STRUCTURE_TYPES = [UnitTypeId.BARRACKS, UnitTypeId.SUPPLYDEPOT]
+ENEMY_TYPES = [UnitTypeId.DRONE, UnitTypeId.ZERGLING, UnitTypeId.ZERGLING, UnitTypeId.ROACH]
+
+
+def _image(data: np.ndarray, bits_per_pixel: int) -> common_pb.ImageData:
+    """ Converts a (height, width) numpy array to ImageData as it is sent by SC2. """
+    image = common_pb.ImageData(bits_per_pixel=bits_per_pixel)
+    image.size.x = data.shape[1]
+    image.size.y = data.shape[0]
+    if bits_per_pixel == 1:
+        image.data = np.packbits(data.astype(np.uint8).ravel()).tobytes()
+    else:
+        image.data = data.astype(np.uint8).ravel().tobytes()
+    return image
+
+
+def _terrain() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ Returns height, pathing and placement grids, all indexed by [y, x]. """
+    height = np.full((MAP_SIZE, MAP_SIZE), LOW_GROUND, dtype=np.uint8)
+    pathing = np.zeros((MAP_SIZE, MAP_SIZE), dtype=bool)
+    pathing[PLAYABLE_MIN:PLAYABLE_MAX, PLAYABLE_MIN:PLAYABLE_MAX] = True
+    placement = pathing.copy()
+
+    low, high = PLAYABLE_MIN, PLAYABLE_MIN + PLATEAU_SIZE
+    for flip in (False, True):
+        sl = slice(MAP_SIZE - high, MAP_SIZE - low) if flip else slice(low, high)
+        height[sl, sl] = HIGH_GROUND
+        # Cliff ring on the inner edges of the plateau
+        edge = MAP_SIZE - high if flip else high - 1
+        pathing[sl, edge] = placement[sl, edge] = False
+        pathing[edge, sl] = placement[edge, sl] = False
+        # Ramp through the cliff along the x axis, going down from the plateau
+        ramp_y = slice(MAP_SIZE - low - 20, MAP_SIZE - low - 14) if flip else slice(low + 14, low + 20)
+        for step in range(RAMP_LENGTH):
+            x = edge - 1 + step
+            level = HIGH_GROUND - (HIGH_GROUND - LOW_GROUND) * step / (RAMP_LENGTH - 1)
+            height[ramp_y, x] = LOW_GROUND + HIGH_GROUND - level if flip else level
+            pathing[ramp_y, x] = True
+            placement[ramp_y, x] = False
+
+    # Vision blockers: pathable but not placeable patches on flat ground
+    for x, y in ((70, 40), (40, 110), (110, 40), (80, 76)):
+        placement[y:y + 3, x:x + 3] = False
+    return height, pathing, placement
+
+
+def game_data_proto() -> sc_pb.ResponseData:
+    data = sc_pb.ResponseData()
+    for ability in AbilityId:
+        if ability.value == 0:
+            continue
+        a = data.abilities.add()
+        a.ability_id = ability.value
+        a.available = True
+        a.link_name = ability.name
+        a.button_name = ability.name
+        a.friendly_name = ability.name
+    creation_abilities: Dict[UnitTypeId, AbilityId] = {
+        unit_type: info["ability"]
+        for trained in TRAIN_INFO.values()
+        for unit_type, info in trained.items()
+    }
+    for unit_type, (race, attributes, minerals, vespene, food, weapon_range) in UNIT_SPECS.items():
+        u = data.units.add()
+        u.unit_id = unit_type.value
+        u.name = unit_type.name.title().replace("_", "")
+        u.available = True
+        u.race = race.value
+        u.attributes.extend(attribute.value for attribute in attributes)
+        u.mineral_cost = minerals
+        u.vespene_cost = vespene
+        u.food_required = food
+        u.build_time = 272
+        u.sight_range = 9
+        if unit_type in creation_abilities:
+            u.ability_id = creation_abilities[unit_type].value
+        if unit_type in {UnitTypeId.MINERALFIELD, UnitTypeId.MINERALFIELD750}:
+            u.has_minerals = True
+        if unit_type == UnitTypeId.VESPENEGEYSER:
+            u.has_vespene = True
+        if weapon_range is not None:
+            w = u.weapons.add()
+            w.type = 3
+            w.damage = 6
+            w.attacks = 1
+            w.range = weapon_range
+            w.speed = 0.61
+    for upgrade in (UpgradeId.STIMPACK, UpgradeId.SHIELDWALL, UpgradeId.ZERGLINGMOVEMENTSPEED):
+        data.upgrades.add(upgrade_id=upgrade.value, name=upgrade.name, mineral_cost=100, vespene_cost=100)
+    return data
+
+
+def game_info_proto() -> sc_pb.ResponseGameInfo:
+    height, pathing, placement = _terrain()
+    info = sc_pb.ResponseGameInfo(map_name="Synthetic LE", local_map_path="Synthetic.SC2Map")
+    info.start_raw.map_size.x = MAP_SIZE
+    info.start_raw.map_size.y = MAP_SIZE
+    info.start_raw.terrain_height.CopyFrom(_image(height, 8))
+    info.start_raw.pathing_grid.CopyFrom(_image(pathing, 1))
+    info.start_raw.placement_grid.CopyFrom(_image(placement, 1))
+    info.start_raw.playable_area.p0.x = PLAYABLE_MIN
+    info.start_raw.playable_area.p0.y = PLAYABLE_MIN
+    info.start_raw.playable_area.p1.x = PLAYABLE_MAX
+    info.start_raw.playable_area.p1.y = PLAYABLE_MAX
+    start = info.start_raw.start_locations.add()
+    start.x, start.y = BASE_CENTERS[1]
+    info.player_info.add(player_id=1, type=1, race_requested=Race.Terran.value, race_actual=Race.Terran.value)
+    info.player_info.add(player_id=2, type=1, race_requested=Race.Zerg.value, race_actual=Race.Zerg.value)
+    return info
+
+
+def _resource_positions(base: Tuple[float, float]) -> List[Tuple[UnitTypeId, float, float]]:
+    """ 8 mineral fields in an arc facing away from the map center and 2 geysers at the ends of the arc. """
+    cx, cy = base
+    facing = math.atan2(cy - MAP_SIZE / 2, cx - MAP_SIZE / 2) if (cx, cy) != (MAP_SIZE / 2, MAP_SIZE / 2) else 0
+    resources = []
+    for i in range(8):
+        angle = facing + math.radians(-60 + i * 120 / 7)
+        mineral_type = UnitTypeId.MINERALFIELD if i % 2 else UnitTypeId.MINERALFIELD750
+        x, y = cx + 7.5 * math.cos(angle), cy + 7.5 * math.sin(angle)
+        resources.append((mineral_type, round(x), round(y) + 0.5))
+    for side in (-1, 1):
+        angle = facing + side * math.radians(95)
+        x, y = cx + 8 * math.cos(angle), cy + 8 * math.sin(angle)
+        resources.append((UnitTypeId.VESPENEGEYSER, round(x) + 0.5, round(y) + 0.5))
+    return resources
+
+
+def observation_proto(unit_count: int, game_loop: int = 0, seed: int = 0) -> sc_pb.ResponseObservation:
+    """
+    Creates an observation with 'unit_count' units in total.
+    Every 50 units add one base with 10 resources (up to 8 bases),
+    the rest is split between own (55%) and enemy (45%) units.
+    """
+    rng = np.random.default_rng(seed)
+    response = sc_pb.ResponseObservation()
+    obs = response.observation
+    obs.game_loop = game_loop
+    common = obs.player_common
+    common.player_id = 1
+    common.minerals = 1000
+    common.vespene = 500
+    common.food_cap = 200
+    raw = obs.raw_data
+    raw.player.camera.x, raw.player.camera.y = BASE_CENTERS[0]
+    raw.player.upgrade_ids.extend([UpgradeId.STIMPACK.value, UpgradeId.SHIELDWALL.value])
+
+    visibility = rng.integers(0, 3, size=(MAP_SIZE, MAP_SIZE), dtype=np.uint8)
+    creep = np.zeros((MAP_SIZE, MAP_SIZE), dtype=bool)
+    creep[MAP_SIZE - 60:MAP_SIZE - 8, MAP_SIZE - 60:MAP_SIZE - 8] = True
+    raw.map_state.visibility.CopyFrom(_image(visibility, 8))
+    raw.map_state.creep.CopyFrom(_image(creep, 1))
+
+    tag = 0x100000000
+
+    def add_unit(unit_type: UnitTypeId, alliance: int, x: float, y: float, build_progress: float = 1) -> raw_pb.Unit:
+        nonlocal tag
+        tag += 1
+        u = raw.units.add()
+        u.tag = tag
+        u.unit_type = unit_type.value
+        u.alliance = alliance
+        u.owner = {1: 1, 3: 16, 4: 2}[alliance]
+        u.display_type = 1
+        u.pos.x, u.pos.y = x, y
+        u.pos.z = 10
+        u.facing = 0
+        u.radius = 2.75 if unit_type in {UnitTypeId.COMMANDCENTER, UnitTypeId.HATCHERY} else 0.5
+        u.build_progress = build_progress
+        u.health = u.health_max = 100
+        u.is_on_screen = False
+        return u
+
+    base_count = min(len(BASE_CENTERS), max(2, unit_count // 50))
+    mineral_tags = []
+    for base in BASE_CENTERS[:base_count]:
+        for unit_type, x, y in _resource_positions(base):
+            resource = add_unit(unit_type, 3, x, y)
+            if unit_type == UnitTypeId.VESPENEGEYSER:
+                resource.vespene_contents = 2250
+            else:
+                resource.mineral_contents = 1800 if unit_type == UnitTypeId.MINERALFIELD else 900
+                mineral_tags.append(resource.tag)
+
+    remaining = max(0, unit_count - len(raw.units) - 2)
+    own_count = remaining * 55 // 100
+    enemy_count = remaining - own_count
+    add_unit(UnitTypeId.COMMANDCENTER, 1, *BASE_CENTERS[0])
+    add_unit(UnitTypeId.HATCHERY, 4, *BASE_CENTERS[1])
+    for i in range(own_count):
+        if i % 10 == 9:
+            unit_type = OWN_STRUCTURE_TYPES[i % len(OWN_STRUCTURE_TYPES)]
+            u = add_unit(unit_type, 1, *rng.uniform(14, 40, 2), build_progress=0.5 if i % 20 == 9 else 1)
+            if unit_type == UnitTypeId.BARRACKS and u.build_progress == 1:
+                u.orders.add(ability_id=AbilityId.BARRACKSTRAIN_MARINE.value, progress=0.3)
+            continue
+        unit_type = OWN_TYPES[i % len(OWN_TYPES)]
+        u = add_unit(unit_type, 1, *rng.uniform(PLAYABLE_MIN + 2, PLAYABLE_MAX - 2, 2))
+        if unit_type == UnitTypeId.SCV and mineral_tags:
+            mineral_tag = mineral_tags[i % len(mineral_tags)]
+            u.orders.add(ability_id=AbilityId.HARVEST_GATHER_SCV.value, target_unit_tag=mineral_tag)
+    for i in range(enemy_count):
+        add_unit(ENEMY_TYPES[i % len(ENEMY_TYPES)], 4, *rng.uniform(PLAYABLE_MIN + 2, PLAYABLE_MAX - 2, 2))
+
+    for i in range(4):
+        effect = raw.effects.add(effect_id=EffectId.PSISTORMPERSISTENT.value, alliance=4, owner=2, radius=1.5)
+        effect.pos.add(x=40 + 10 * i, y=60)
+    return response
+
+
+class SyntheticGame:
+    """ Holds the protos of a synthetic game and creates bots that are prepared as if they were in that game. """
+
+    def __init__(self, unit_count: int, seed: int = 0):
+        self.unit_count = unit_count
+        self.game_data_proto = game_data_proto()
+        self.game_info_proto = game_info_proto()
+        self.observation_proto = observation_proto(unit_count, seed=seed)
+        self.response_game_info = sc_pb.Response(game_info=self.game_info_proto)
+
+    def game_state(self) -> GameState:
+        return GameState(self.observation_proto)
+
+    def bot(self, distance_calculation_method: int = 2, first_step: bool = True) -> BotAI:
+        """ Returns a bot after _prepare_start and _prepare_step, and optionally _prepare_first_step. """
+        bot = BotAI()
+        bot.distance_calculation_method = distance_calculation_method
+        bot._initialize_variables()
+        bot._prepare_start(
+            None, 1, GameInfo(self.game_info_proto), GameData(self.game_data_proto), base_build=89720
+        )
+        bot._prepare_step(self.game_state(), self.response_game_info)
+        if first_step:
+            bot._prepare_first_step()
+        return bot
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from itertools import groupby
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple, Union
 
 from s2clientprotocol import raw_pb2 as raw_pb
 
@@ -12,10 +11,55 @@ if TYPE_CHECKING:
     from sc2.ids.ability_id import AbilityId
     from sc2.unit_command import UnitCommand
 
+# Target points are rounded to this many decimals for grouping
+TARGET_KEY_DECIMALS = 6
 
-# pylint: disable=R0912
-def combine_actions(action_iter):
+
+def _group_key(action: UnitCommand) -> Tuple:
+    """ Returns the combining tuple of the command, with the target point rounded. """
+    key = action.combining_tuple
+    target = key[1]
+    if isinstance(target, Point2):
+        # Points are equal within a tolerance but hashed exactly, rounding gives points that are equal the same key
+        return key[0], tuple(round(coordinate, TARGET_KEY_DECIMALS) for coordinate in target), key[2], key[3]
+    return key
+
+
+def group_actions(action_iter: Iterable[UnitCommand]) -> List[Dict[Tuple, List[UnitCommand]]]:
+    """Groups unit commands by their 'combining_tuple' (ability, target, queue, combineable), independent of the order they were issued in.
+    Target points are rounded to TARGET_KEY_DECIMALS decimals in the keys, so points that are equal are grouped even if their hashes differ.
+    The n-th command of each unit is put into layer n, so the commands of one unit are still sent in the order they were issued.
+    A combineable command that is the same as the previous command of that unit is dropped, it would only repeat that command.
+
+    Returns the layers in order, each maps a combining tuple to its commands in order of first appearance.
     """
+    layers: List[Dict[Tuple, List[UnitCommand]]] = []
+    commands_per_unit: Dict[int, int] = {}
+    last_command_of_unit: Dict[int, Tuple] = {}
+    for action in action_iter:
+        tag: int = action.unit.tag
+        key = _group_key(action)
+        # key[3]: combineable
+        if key[3] and last_command_of_unit.get(tag) == key:
+            continue
+        last_command_of_unit[tag] = key
+        layer_index = commands_per_unit.get(tag, 0)
+        commands_per_unit[tag] = layer_index + 1
+        if layer_index == len(layers):
+            layers.append({})
+        group = layers[layer_index].get(key)
+        if group is None:
+            layers[layer_index][key] = [action]
+        else:
+            group.append(action)
+    return layers
+
+
+def combine_actions(action_iter: Iterable[UnitCommand]):
+    """
+    Converts unit commands to ActionRaw protos, commands with the same combineable ability, target and queue are sent as one action.
+    Commands do not need to be issued next to each other to be combined, see 'group_actions'.
+
     Example input:
     [
         # Each entry in the list is a unit command, with an ability, unit, target, and queue=boolean
@@ -24,13 +68,24 @@ def combine_actions(action_iter):
         UnitCommand(AbilityId.TRAINQUEEN_QUEEN, Unit(name='Hatchery', tag=4359454723), None, False),
     ]
     """
-    for key, items in groupby(action_iter, key=lambda a: a.combining_tuple):
+    for action, _commands in combine_actions_with_commands(action_iter):
+        yield action
+
+
+# pylint: disable=R0912
+def combine_actions_with_commands(
+    action_iter: Iterable[UnitCommand]
+) -> Iterator[Tuple[raw_pb.ActionRaw, List[UnitCommand]]]:
+    """ Same as 'combine_actions', but yields each ActionRaw together with the unit commands it was created from. """
+    for key, items in (group for layer in group_actions(action_iter) for group in layer.items()):
         ability: AbilityId
         target: Union[None, Point2, Unit]
         queue: bool
         # See constants.py for combineable abilities
         combineable: bool
-        ability, target, queue, combineable = key
+        ability, _target_key, queue, combineable = key
+        # The target of the first command, the key only contains the rounded coordinates of a target point
+        target = items[0].target
 
         if combineable:
             # Combine actions with no target, e.g. lift, burrowup, burrowdown, siege, unsiege, uproot spines
@@ -48,7 +103,7 @@ def combine_actions(action_iter):
             elif target is not None:
                 raise RuntimeError(f"Must target a unit, point or None, found '{target !r}'")
 
-            yield raw_pb.ActionRaw(unit_command=cmd)
+            yield raw_pb.ActionRaw(unit_command=cmd), items
 
         else:
             """
@@ -64,7 +119,7 @@ def combine_actions(action_iter):
                     cmd = raw_pb.ActionRawUnitCommand(
                         ability_id=ability.value, unit_tags={u.unit.tag}, queue_command=queue
                     )
-                    yield raw_pb.ActionRaw(unit_command=cmd)
+                    yield raw_pb.ActionRaw(unit_command=cmd), [u]
             elif isinstance(target, Point2):
                 for u in items:
                     cmd = raw_pb.ActionRawUnitCommand(
@@ -73,7 +128,7 @@ def combine_actions(action_iter):
                         queue_command=queue,
                         target_world_space_pos=target.as_Point2D,
                     )
-                    yield raw_pb.ActionRaw(unit_command=cmd)
+                    yield raw_pb.ActionRaw(unit_command=cmd), [u]
 
             elif isinstance(target, Unit):
                 for u in items:
@@ -83,6 +138,6 @@ def combine_actions(action_iter):
                         queue_command=queue,
                         target_unit_tag=target.tag,
                     )
-                    yield raw_pb.ActionRaw(unit_command=cmd)
+                    yield raw_pb.ActionRaw(unit_command=cmd), [u]
             else:
                 raise RuntimeError(f"Must target a unit, point or None, found '{target !r}'")
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from sc2.data import ActionResult
+from sc2.dicts.generic_redirect_abilities import GENERIC_REDIRECT_ABILITIES
+from sc2.ids.ability_id import AbilityId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+if TYPE_CHECKING:
+    from sc2.game_state import ActionError
+    from sc2.unit_command import UnitCommand
+
+
+@dataclass
+class LedgerEntry:
+    """One unit command that was sent to the game, with the result of the action request and an error reported in a later observation.
+    Only the unit tag, ability and target (tag of the target unit, or the target point) are stored, so no units or observations are kept alive."""
+
+    unit_tag: int
+    ability: AbilityId
+    target: Union[None, int, Point2]
+    game_loop: int
+    result: ActionResult
+    error: Optional[ActionResult] = None
+
+    @property
+    def wasted(self) -> bool:
+        """ True if the command failed right away or the game reported an error for it afterwards. """
+        return self.result != ActionResult.Success or self.error is not None
+
+    @property
+    def failure(self) -> Optional[ActionResult]:
+        if self.result != ActionResult.Success:
+            return self.result
+        return self.error
+
+
+class ActionLedger:
+    """
+    Keeps track of the results of all unit commands of a bot.
+
+    Each command that is sent is stored as 'LedgerEntry' with the result of the action request.
+    Errors that the game reports in the next observation ('state.action_errors') are matched to the commands by unit tag and ability.
+    Failed commands are counted per ability, in total and over the last 'rolling_window' game loops.
+
+    If 'suppress_frames' is larger than 0, a command is not sent again if the same command (ability and target) failed on the same unit
+    with the same error twice in a row, each time within that many game loops of the previous failure.
+
+    The ledger is only used if 'self.action_ledger_enabled' is set to True in the bot.
+
+    Example::
+
+        ledger = self.action_ledger
+        print(f"{ledger.commands_wasted} of {ledger.commands_sent} commands were wasted")
+        for ability, count in ledger.recent_failures_by_ability().most_common(3):
+            print(ability, count)
+    """
+
+    def __init__(self, suppress_frames: int = 0, rolling_window: int = 1344, history_size: int = 1000):
+        """
+        :param suppress_frames: 0 disables suppression of repeated failing commands
+        :param rolling_window: amount of game loops for 'recent_failures_by_ability', default is one minute
+        :param history_size: amount of entries kept in 'history'
+        """
+        self.suppress_frames = suppress_frames
+        self.rolling_window = rolling_window
+        self.commands_sent: int = 0
+        self.commands_wasted: int = 0
+        self.commands_suppressed: int = 0
+        self.failures_by_ability: Counter[AbilityId] = Counter()
+        self.failures_by_result: Counter[ActionResult] = Counter()
+        self.history: Deque[LedgerEntry] = deque(maxlen=history_size)
+        # Commands sent in the last step, errors of the next observation are matched against these
+        self._pending: Dict[int, List[LedgerEntry]] = {}
+        self._recent_failures: Deque[Tuple[int, AbilityId]] = deque()
+        # (unit tag, ability, target, error) -> (amount of repeats, game loop) of the last failure
+        self._last_failure: Dict[Tuple[int, AbilityId, Hashable, ActionResult], Tuple[int, int]] = {}
+        # (unit tag, ability, target) -> game loop until which the command is suppressed
+        self._suppressed_until: Dict[Tuple[int, AbilityId, Hashable], int] = {}
+
+    @staticmethod
+    def _target_key(target: Union[None, Point2, Unit]) -> Union[None, int, Point2]:
+        if isinstance(target, Unit):
+            return target.tag
+        return target
+
+    @staticmethod
+    def _same_ability(command_ability: AbilityId, error_ability: AbilityId) -> bool:
+        return command_ability == error_ability or command_ability == GENERIC_REDIRECT_ABILITIES.get(
+            error_ability, error_ability
+        )
+
+    def _add_failure(self, entry: LedgerEntry, failure: ActionResult, game_loop: int):
+        self.commands_wasted += 1
+        self.failures_by_ability[entry.ability] += 1
+        self.failures_by_result[failure] += 1
+        self._recent_failures.append((game_loop, entry.ability))
+        if self.suppress_frames <= 0:
+            return
+        command_key = (entry.unit_tag, entry.ability, entry.target)
+        failure_key = (*command_key, failure)
+        repeats, last_game_loop = self._last_failure.get(failure_key, (0, game_loop))
+        repeats = repeats + 1 if game_loop - last_game_loop <= self.suppress_frames else 1
+        self._last_failure[failure_key] = (repeats, game_loop)
+        if repeats >= 2:
+            self._suppressed_until[command_key] = game_loop + self.suppress_frames
+
+    def should_suppress(self, command: UnitCommand, game_loop: int) -> bool:
+        """Returns True if this command failed on the same unit with the same target and the same error twice in a row,
+        and the last failure was within the last 'suppress_frames' game loops.
+
+        :param command:
+        :param game_loop:
+        """
+        if self.suppress_frames <= 0:
+            return False
+        suppressed_until = self._suppressed_until.get((command.unit.tag, command.ability, self._target_key(command.target)))
+        return suppressed_until is not None and game_loop <= suppressed_until
+
+    def filter_suppressed(self, commands: Iterable[UnitCommand], game_loop: int) -> List[UnitCommand]:
+        """Removes the commands for which 'should_suppress' is True and counts them in 'commands_suppressed'.
+
+        :param commands:
+        :param game_loop:
+        """
+        if self.suppress_frames <= 0:
+            return list(commands)
+        commands = list(commands)
+        kept = [command for command in commands if not self.should_suppress(command, game_loop)]
+        self.commands_suppressed += len(commands) - len(kept)
+        return kept
+
+    def record_results(self, results: Iterable[Tuple[List[UnitCommand], ActionResult]], game_loop: int):
+        """Stores the commands of one action request with the result of the action they were sent in.
+
+        :param results: pairs of the commands that were combined into one action and the result of that action
+        :param game_loop:
+        """
+        for commands, result in results:
+            for command in commands:
+                entry = LedgerEntry(command.unit.tag, command.ability, self._target_key(command.target), game_loop, result)
+                self.commands_sent += 1
+                self.history.append(entry)
+                if result != ActionResult.Success:
+                    self._add_failure(entry, result, game_loop)
+                else:
+                    self._pending.setdefault(entry.unit_tag, []).append(entry)
+
+    def record_errors(self, action_errors: Iterable[ActionError], game_loop: int):
+        """Matches the errors of an observation to the commands sent in the previous step. Each command can only receive one error.
+
+        :param action_errors:
+        :param game_loop:
+        """
+        for error in action_errors:
+            entries = self._pending.get(error.unit_tag)
+            if not entries:
+                continue
+            error_ability = error.exact_id
+            for entry in entries:
+                if entry.error is None and self._same_ability(entry.ability, error_ability):
+                    entry.error = ActionResult(error.result)
+                    self._add_failure(entry, entry.error, game_loop)
+                    break
+        self._pending.clear()
+        # Forget failures that are older than the rolling window and the suppression duration
+        while self._recent_failures and game_loop - self._recent_failures[0][0] > self.rolling_window:
+            self._recent_failures.popleft()
+        if len(self._last_failure) > 1000:
+            oldest_allowed = game_loop - self.suppress_frames
+            self._last_failure = {key: value for key, value in self._last_failure.items() if value[1] >= oldest_allowed}
+            self._suppressed_until = {key: value for key, value in self._suppressed_until.items() if value >= game_loop}
+
+    def recent_failures_by_ability(self) -> Counter[AbilityId]:
+        """ Returns the amount of failed commands per ability within the last 'rolling_window' game loops. """
+        return Counter(ability for _, ability in self._recent_failures)
+
+    @property
+    def wasted_ratio(self) -> float:
+        """ Ratio of sent commands that failed. """
+        return self.commands_wasted / self.commands_sent if self.commands_sent else 0
@@ -6,8 +6,9 @@ import random
 import warnings
 from collections import Counter
 from functools import cached_property
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
 
+import numpy as np
 from loguru import logger
 
 from sc2.bot_ai_internal import BotAIInternal
@@ -21,10 +22,13 @@ from sc2.constants import (
     ZERG_TECH_REQUIREMENT,
 )
 from sc2.data import Alert, Race, Result, Target
-from sc2.dicts.unit_research_abilities import RESEARCH_INFO
-from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+from sc2.dicts.lookup_tables import (
+    UNIT_REQUIRES_TECHLAB_BITS,
+    UNIT_TRAINED_FROM_BITS,
+    UPGRADE_REQUIRED_BUILDING,
+    UPGRADE_RESEARCHED_FROM_BITS,
+)
 from sc2.dicts.unit_trained_from import UNIT_TRAINED_FROM
-from sc2.dicts.upgrade_researched_from import UPGRADE_RESEARCHED_FROM
 from sc2.game_data import AbilityData, Cost
 from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId
@@ -32,11 +36,18 @@ from sc2.ids.upgrade_id import UpgradeId
 from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
+from sc2.warp_in import WARP_IN_FOOTPRINT
 
 if TYPE_CHECKING:
     from sc2.game_info import Ramp
 
 
+# Bitmask of the structure type values that can have addons
+_ADDON_STRUCTURE_BITS: int = (1 << UnitTypeId.BARRACKS.value) | (1 << UnitTypeId.FACTORY.value) | (
+    1 << UnitTypeId.STARPORT.value
+)
+
+
 class BotAI(BotAIInternal):
     """Base class for bots."""
 
@@ -717,7 +728,6 @@ class BotAI(BotAIInternal):
             return min(possible, key=lambda p: p.distance_to_point2(near))
         return None
 
-    # TODO: improve using cache per frame
     def already_pending_upgrade(self, upgrade_type: UpgradeId) -> float:
         """Check if an upgrade is being researched
 
@@ -737,11 +747,7 @@ class BotAI(BotAIInternal):
         if upgrade_type in self.state.upgrades:
             return 1
         creationAbilityID = self.game_data.upgrades[upgrade_type.value].research_ability.exact_id
-        for structure in self.structures.filter(lambda unit: unit.is_ready):
-            for order in structure.orders:
-                if order.ability.exact_id == creationAbilityID:
-                    return order.progress
-        return 0
+        return self._structure_and_research_progress[1].get(creationAbilityID, 0)
 
     def structure_type_build_progress(self, structure_type: Union[UnitTypeId, int]) -> float:
         """
@@ -779,23 +785,18 @@ class BotAI(BotAIInternal):
         else:
             structure_type_value = structure_type.value
         assert structure_type_value, f"structure_type can not be 0 or NOTAUNIT, but was: {structure_type_value}"
-        equiv_values: Set[int] = {structure_type_value} | {
-            s_type.value
-            for s_type in EQUIVALENTS_FOR_TECH_PROGRESS.get(structure_type, set())
-        }
+        structure_progress: Dict[int, float] = self._structure_and_research_progress[0]
+        existing_progress: float = structure_progress.get(structure_type_value, 0)
+        for equiv_type in EQUIVALENTS_FOR_TECH_PROGRESS.get(structure_type, ()):
+            existing_progress = max(existing_progress, structure_progress.get(equiv_type.value, 0))
         # SUPPLYDEPOTDROP is not in self.game_data.units, so bot_ai should not check the build progress via creation ability (worker abilities)
         if structure_type_value not in self.game_data.units:
-            return max((s.build_progress for s in self.structures if s._proto.unit_type in equiv_values), default=0)
+            return existing_progress
         creation_ability_data: AbilityData = self.game_data.units[structure_type_value].creation_ability
         if creation_ability_data is None:
             return 0
         creation_ability: AbilityId = creation_ability_data.exact_id
-        max_value = max(
-            [s.build_progress for s in self.structures if s._proto.unit_type in equiv_values] +
-            [self._abilities_count_and_build_progress[1].get(creation_ability, 0)],
-            default=0,
-        )
-        return max_value
+        return max(existing_progress, self._abilities_count_and_build_progress[1].get(creation_ability, 0))
 
     def tech_requirement_progress(self, structure_type: UnitTypeId) -> float:
         """Returns the tech requirement progress for a specific building
@@ -819,6 +820,10 @@ class BotAI(BotAIInternal):
             print(tech_requirement) # Prints 1 because even though the type id of the flying factory is different, it still has build progress of 1 and thus tech requirement is completed
 
         :param structure_type:"""
+        cache = self._production_query_cache
+        cache_key = ("tech_requirement_progress", structure_type)
+        if cache_key in cache:
+            return cache[cache_key]
         race_dict = {
             Race.Protoss: PROTOSS_TECH_REQUIREMENT,
             Race.Terran: TERRAN_TECH_REQUIREMENT,
@@ -829,11 +834,13 @@ class BotAI(BotAIInternal):
         # The following commented out line is unreliable for ghost / thor as they return 0 which is incorrect
         # unit_info_id_value = self.game_data.units[structure_type.value]._proto.tech_requirement
         if not unit_info_id_value:  # Equivalent to "if unit_info_id_value == 0:"
+            cache[cache_key] = 1
             return 1
         progresses: List[float] = [self.structure_type_build_progress(unit_info_id_value)]
         for equiv_structure in EQUIVALENTS_FOR_TECH_PROGRESS.get(unit_info_id, []):
             progresses.append(self.structure_type_build_progress(equiv_structure.value))
-        return max(progresses)
+        cache[cache_key] = max(progresses)
+        return cache[cache_key]
 
     def already_pending(self, unit_type: Union[UpgradeId, UnitTypeId]) -> float:
         """
@@ -849,6 +856,14 @@ class BotAI(BotAIInternal):
 
         :param unit_type:
         """
+        cache = self._production_query_cache
+        cache_key = ("already_pending", unit_type)
+        pending = cache.get(cache_key)
+        if pending is None:
+            pending = cache[cache_key] = self._already_pending_uncached(unit_type)
+        return pending
+
+    def _already_pending_uncached(self, unit_type: Union[UpgradeId, UnitTypeId]) -> float:
         if isinstance(unit_type, UpgradeId):
             return self.already_pending_upgrade(unit_type)
         try:
@@ -942,7 +957,7 @@ class BotAI(BotAIInternal):
         train_only_idle_buildings: bool = True
     ) -> int:
         """Trains a specified number of units. Trains only one if amount is not specified.
-        Warning: currently has issues with warp gate warp ins
+        Warp gates warp in at spots from self.warp_in_planner, closest to "closest_to" if it is given.
 
         Very generic function. Please use with caution and report any bugs!
 
@@ -985,43 +1000,36 @@ class BotAI(BotAIInternal):
             return 0
 
         trained_amount = 0
-        # All train structure types: queen can made from hatchery, lair, hive
-        train_structure_type: Set[UnitTypeId] = UNIT_TRAINED_FROM[unit_type]
-        train_structures = self.structures if self.race != Race.Zerg else self.structures | self.larva
-        requires_techlab = any(
-            TRAIN_INFO[structure_type][unit_type].get("requires_techlab", False)
-            for structure_type in train_structure_type
-        )
-        is_protoss = self.race == Race.Protoss
+        # Bitmask of all train structure types: queen can made from hatchery, lair, hive. See generate_lookup_tables.py
+        train_structure_bits: int = UNIT_TRAINED_FROM_BITS[unit_type.value]
+        requires_techlab = bool(UNIT_REQUIRES_TECHLAB_BITS >> unit_type.value & 1)
+        can_have_addons = bool(train_structure_bits & _ADDON_STRUCTURE_BITS)
         is_terran = self.race == Race.Terran
-        can_have_addons = any(
-            # pylint: disable=C0208
-            u in train_structure_type for u in {UnitTypeId.BARRACKS, UnitTypeId.FACTORY, UnitTypeId.STARPORT}
-        )
+        # In observation order, so the result does not depend on the order of the structure types
+        train_structures: List[Unit] = [
+            structure for structure in self._production_structures
+            if train_structure_bits >> structure._proto.unit_type & 1
+        ]
         # Sort structures closest to a point
         if closest_to is not None:
-            train_structures = train_structures.sorted_by_distance_to(closest_to)
+            train_structures.sort(key=lambda structure: structure.distance_to_squared(closest_to))
         elif can_have_addons:
             # This should sort the structures in ascending order: first structures with reactor, then naked, then with techlab
-            train_structures = train_structures.sorted(
+            train_structures.sort(
                 key=lambda structure: -1 * (structure.add_on_tag in self.reactor_tags) + 1 *
                 (structure.add_on_tag in self.techlab_tags)
             )
 
+        warp_in_spots: Optional[List[Point2]] = None
         structure: Unit
-        for structure in train_structures:
+        for index, structure in enumerate(train_structures):
             # Exit early if we can't afford
             if not self.can_afford(unit_type):
                 return trained_amount
             if (
                 # If structure hasn't received an action/order this frame
+                # The structures were already filtered by type, build progress and power, see _production_structures
                 structure.tag not in self.unit_tags_received_action
-                # If structure can train this unit at all
-                and structure.type_id in train_structure_type
-                # Structure has to be completed to be able to train
-                and structure.build_progress == 1
-                # If structure is protoss, it needs to be powered to train
-                and (not is_protoss or structure.is_powered or structure.type_id == UnitTypeId.NEXUS)
                 # Either parameter "train_only_idle_buildings" is False or structure is idle or structure has less than 2 orders and has reactor
                 and (
                     not train_only_idle_buildings
@@ -1032,12 +1040,24 @@ class BotAI(BotAIInternal):
                 and (not requires_techlab or structure.add_on_tag in self.techlab_tags)
             ):
                 # Warp in at location
-                # TODO: find fast warp in locations either random location or closest to the given parameter "closest_to"
                 # TODO: find out which pylons have fast warp in by checking distance to nexus and warpgates.ready
                 if structure.type_id == UnitTypeId.WARPGATE:
-                    pylons = self.structures(UnitTypeId.PYLON)
-                    location = pylons.random.position.random_on_distance(4)
-                    successfully_trained = structure.warp_in(unit_type, location)
+                    if warp_in_spots is None:
+                        # Spots are reserved for the rest of the frame, so only request one per warp gate that can still warp in
+                        warpgate_amount = sum(
+                            1 for warpgate in train_structures[index:] if warpgate.type_id == UnitTypeId.WARPGATE
+                            and warpgate.tag not in self.unit_tags_received_action
+                            and (not train_only_idle_buildings or not warpgate.orders)
+                        )
+                        # Spots for the remaining units in one pass, best spot last
+                        warp_in_spots = self.warp_in_planner.spots(
+                            min(amount - trained_amount, warpgate_amount),
+                            near=closest_to,
+                            footprint=WARP_IN_FOOTPRINT.get(unit_type, 1),
+                        )[::-1]
+                    if not warp_in_spots:
+                        continue
+                    successfully_trained = structure.warp_in(unit_type, warp_in_spots.pop())
                 else:
                     # Normal train a unit from larva or inside a structure
                     successfully_trained = self.do(
@@ -1077,6 +1097,32 @@ class BotAI(BotAIInternal):
                     return trained_amount
         return trained_amount
 
+    def train_many(
+        self,
+        amounts: Dict[UnitTypeId, int],
+        closest_to: Point2 = None,
+        train_only_idle_buildings: bool = True
+    ) -> Dict[UnitTypeId, int]:
+        """Trains several unit types in one call, see 'train'.
+        Unit types are trained in the order of the dictionary, so earlier types have priority on resources and production structures.
+        A structure that received a train order is not used again for a later type in the same frame.
+
+        Example::
+
+            trained = self.train_many({UnitTypeId.SCV: 2, UnitTypeId.MARAUDER: 2, UnitTypeId.MARINE: 6})
+            print(trained)
+            # {UnitTypeId.SCV: 2, UnitTypeId.MARAUDER: 1, UnitTypeId.MARINE: 4}
+
+        :param amounts:
+        :param closest_to:
+        :param train_only_idle_buildings:"""
+        trained: Dict[UnitTypeId, int] = {}
+        for unit_type, amount in amounts.items():
+            trained[unit_type] = (
+                self.train(unit_type, amount, closest_to, train_only_idle_buildings) if amount > 0 else 0
+            )
+        return trained
+
     def research(self, upgrade_type: UpgradeId) -> bool:
         """
         Researches an upgrade from a structure that can research it, if it is idle and powered (protoss).
@@ -1099,45 +1145,33 @@ class BotAI(BotAIInternal):
         :param upgrade_type:
         """
         assert (
-            upgrade_type in UPGRADE_RESEARCHED_FROM
+            upgrade_type.value in UPGRADE_RESEARCHED_FROM_BITS
         ), f"Could not find upgrade {upgrade_type} in 'research from'-dictionary"
 
         # Not affordable
         if not self.can_afford(upgrade_type):
             return False
 
-        research_structure_types: UnitTypeId = UPGRADE_RESEARCHED_FROM[upgrade_type]
-        required_tech_building: Optional[UnitTypeId] = RESEARCH_INFO[research_structure_types][upgrade_type].get(
-            "required_building", None
-        )
+        required_tech_building: Optional[int] = UPGRADE_REQUIRED_BUILDING.get(upgrade_type.value)
 
         requirement_met = (
-            required_tech_building is None or self.structure_type_build_progress(required_tech_building) == 1
+            required_tech_building is None
+            or self.structure_type_build_progress(UnitTypeId(required_tech_building)) == 1
         )
         if not requirement_met:
             return False
 
         is_protoss = self.race == Race.Protoss
 
-        # All upgrades right now that can be researched in spire and hatch can also be researched in their morphs
-        equiv_structures = {
-            UnitTypeId.SPIRE: {UnitTypeId.SPIRE, UnitTypeId.GREATERSPIRE},
-            UnitTypeId.GREATERSPIRE: {UnitTypeId.SPIRE, UnitTypeId.GREATERSPIRE},
-            UnitTypeId.HATCHERY: {UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE},
-            UnitTypeId.LAIR: {UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE},
-            UnitTypeId.HIVE: {UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE},
-        }
-        # Convert to a set, or equivalent structures are chosen
-        # Overlord speed upgrade can be researched from hatchery, lair or hive
-        research_structure_types: Set[UnitTypeId] = equiv_structures.get(
-            research_structure_types, {research_structure_types}
-        )
+        # Bitmask of the structure type values that can research the upgrade
+        # All upgrades right now that can be researched in spire and hatch can also be researched in their morphs, see generate_lookup_tables.py
+        research_structure_bits: int = UPGRADE_RESEARCHED_FROM_BITS[upgrade_type.value]
 
         structure: Unit
         for structure in self.structures:
             if (
                 # Structure can research this upgrade
-                structure.type_id in research_structure_types
+                research_structure_bits >> structure._proto.unit_type & 1
                 # If structure hasn't received an action/order this frame
                 and structure.tag not in self.unit_tags_received_action
                 # Structure is idle
@@ -1152,6 +1186,20 @@ class BotAI(BotAIInternal):
                 return successful_action
         return False
 
+    def unit_by_tag(self, tag: int) -> Optional[Unit]:
+        """Returns the unit with this tag if it is visible in the current frame (own, enemy or neutral), else None.
+        Uses a dictionary that is built once per frame, so it is faster than 'self.all_units.find_by_tag(tag)'.
+
+        Example::
+
+            target = self.unit_by_tag(self.target_tag)
+            if target is not None:
+                marine.attack(target)
+
+        :param tag:
+        """
+        return self._all_units_map.get(tag)
+
     async def chat_send(self, message: str, team_only: bool = False):
         """Send a chat message to the SC2 Client.
 
@@ -1227,6 +1275,67 @@ class BotAI(BotAIInternal):
         pos = pos.position.rounded
         return self.state.creep[pos] == 1
 
+    # Batch variants of the functions above, they look up all points in one vectorized call.
+    # Points outside of the map are treated as not placeable, not pathable, not visible, no creep and height 0.
+
+    @staticmethod
+    def _points_array(points: Union[Units, np.ndarray, Iterable[Union[Point2, Tuple[float, float]]]]) -> np.ndarray:
+        """ Converts Units or points to a float array of shape (N, 2). """
+        if isinstance(points, np.ndarray):
+            return points.reshape((-1, 2))
+        if isinstance(points, Units):
+            return np.array([unit.position_tuple for unit in points], dtype=float).reshape((-1, 2))
+        return np.array([(p[0], p[1]) for p in points], dtype=float).reshape((-1, 2))
+
+    def in_map_bounds_batch(self, points: Union[Units, np.ndarray, Iterable[Point2]]) -> np.ndarray:
+        """Batch variant of in_map_bounds, returns a boolean array.
+
+        :param points: Units, or points as array of shape (N, 2)"""
+        points = self._points_array(points)
+        area = self.game_info.playable_area
+        xs, ys = points[:, 0], points[:, 1]
+        return (area.x <= xs) & (xs < area.x + area.width) & (area.y <= ys) & (ys < area.y + area.height)
+
+    def get_terrain_height_batch(self, points: Union[Units, np.ndarray, Iterable[Point2]]) -> np.ndarray:
+        """Batch variant of get_terrain_height, returns an integer array.
+
+        Example::
+
+            heights = self.get_terrain_height_batch(self.enemy_units)
+            highest_enemy = self.enemy_units[int(heights.argmax())]
+
+        :param points: Units, or points as array of shape (N, 2)"""
+        return self.game_info.terrain_height.values_at(self._points_array(points), out_of_bounds=0)
+
+    def in_placement_grid_batch(self, points: Union[Units, np.ndarray, Iterable[Point2]]) -> np.ndarray:
+        """Batch variant of in_placement_grid, returns a boolean array.
+
+        :param points: Units, or points as array of shape (N, 2)"""
+        return self.game_info.placement_grid.values_at(self._points_array(points), out_of_bounds=0) == 1
+
+    def in_pathing_grid_batch(self, points: Union[Units, np.ndarray, Iterable[Point2]]) -> np.ndarray:
+        """Batch variant of in_pathing_grid, returns a boolean array.
+
+        :param points: Units, or points as array of shape (N, 2)"""
+        return self.game_info.pathing_grid.values_at(self._points_array(points), out_of_bounds=0) == 1
+
+    def is_visible_batch(self, points: Union[Units, np.ndarray, Iterable[Point2]]) -> np.ndarray:
+        """Batch variant of is_visible, returns a boolean array.
+
+        :param points: Units, or points as array of shape (N, 2)"""
+        return self.state.visibility.values_at(self._points_array(points), out_of_bounds=0) == 2
+
+    def has_creep_batch(self, points: Union[Units, np.ndarray, Iterable[Point2]]) -> np.ndarray:
+        """Batch variant of has_creep, returns a boolean array.
+
+        Example::
+
+            candidates = np.array([(x, y) for x in range(20, 40) for y in range(20, 40)])
+            creep_candidates = candidates[self.has_creep_batch(candidates)]
+
+        :param points: Units, or points as array of shape (N, 2)"""
+        return self.state.creep.values_at(self._points_array(points), out_of_bounds=0) == 1
+
     async def on_unit_destroyed(self, unit_tag: int):
         """
         Override this in your bot class.
@@ -8,6 +8,7 @@ import warnings
 from abc import ABC
 from collections import Counter
 from contextlib import suppress
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any
 from typing import Counter as CounterType
 from typing import Dict, Generator, Iterable, List, Set, Tuple, Union, final
@@ -16,6 +17,7 @@ import numpy as np
 from loguru import logger
 from s2clientprotocol import sc2api_pb2 as sc_pb
 
+from sc2.action_ledger import ActionLedger
 from sc2.cache import property_cache_once_per_frame
 from sc2.constants import (
     ALL_GAS,
@@ -27,27 +29,36 @@ from sc2.constants import (
     geyser_ids,
     mineral_ids,
 )
+from sc2.creep import CreepAnalysis
 from sc2.data import ActionResult, Race, race_townhalls
+from sc2.enemy_memory import EnemyMemory
 from sc2.game_data import Cost, GameData
-from sc2.game_state import Blip, EffectData, GameState
+from sc2.game_state import Blip, GameState
 from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.upgrade_id import UpgradeId
 from sc2.pixel_map import PixelMap
 from sc2.position import Point2
-from sc2.unit import Unit
+from sc2.unit import Unit, UnitTypeStaticTable
 from sc2.unit_command import UnitCommand
 from sc2.units import Units
-
-with warnings.catch_warnings():
-    warnings.simplefilter("ignore")
-    from scipy.spatial.distance import cdist, pdist
+from sc2.warp_in import WarpInPlanner
 
 if TYPE_CHECKING:
     from sc2.client import Client
     from sc2.game_info import GameInfo
 
 
+@lru_cache(maxsize=None)
+def _scipy_distance():
+    """Imports scipy.spatial.distance on first use. It takes longer to import than the rest of the library and is only needed by
+    the distance calculation methods 1 to 3, see BotAIInternal._distances_override_functions"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from scipy.spatial import distance  # pylint: disable=C0415
+    return distance
+
+
 class BotAIInternal(ABC):
     """Base class for bots."""
 
@@ -64,6 +75,27 @@ class BotAIInternal(ABC):
         # Select distance calculation method, see _distances_override_functions function
         if not hasattr(self, "distance_calculation_method"):
             self.distance_calculation_method: int = 2
+        # Select if all fields of self.state should be decoded every frame, instead of only when they are accessed. See GameState.decode_lazy_fields
+        if not hasattr(self, "game_state_eager_decoding"):
+            self.game_state_eager_decoding: bool = False
+        # Select if the results and errors of all unit commands should be tracked in self.action_ledger. See sc2/action_ledger.py
+        if not hasattr(self, "action_ledger_enabled"):
+            self.action_ledger_enabled: bool = False
+        # Commands that failed repeatedly on a unit with the same error are not sent again for this many game loops, 0 disables this
+        # Only used if the action ledger is enabled
+        if not hasattr(self, "action_ledger_suppress_frames"):
+            self.action_ledger_suppress_frames: int = 0
+        self.action_ledger: ActionLedger = ActionLedger(suppress_frames=self.action_ledger_suppress_frames)
+        # Select if the last seen values of enemy units should be stored in self.enemy_memory every frame. See sc2/enemy_memory.py
+        if not hasattr(self, "enemy_memory_enabled"):
+            self.enemy_memory_enabled: bool = False
+        self.enemy_memory: EnemyMemory = EnemyMemory()
+        # Select if the creep frontier and distances to the creep edge should be updated in self.creep_analysis every frame. See sc2/creep.py
+        if not hasattr(self, "creep_analysis_enabled"):
+            self.creep_analysis_enabled: bool = False
+        self.creep_analysis: CreepAnalysis = CreepAnalysis()
+        # Finds spots for warp gate warp ins, see sc2/warp_in.py
+        self.warp_in_planner: WarpInPlanner = WarpInPlanner(self)
         # Select if the Unit.command should return UnitCommand objects. Set this to True if your bot uses 'self.do(unit(ability, target))'
         if not hasattr(self, "unit_command_uses_self_do"):
             self.unit_command_uses_self_do: bool = False
@@ -71,6 +103,8 @@ class BotAIInternal(ABC):
         self.realtime: bool = False
         self.base_build: int = -1
         self.all_units: Units = Units([], self)
+        # All units of this frame by tag, see BotAI.unit_by_tag
+        self._all_units_map: Dict[int, Unit] = {}
         self.units: Units = Units([], self)
         self.workers: Units = Units([], self)
         self.larva: Units = Units([], self)
@@ -111,6 +145,8 @@ class BotAIInternal(ABC):
         self._enemy_units_previous_map: Dict[int, Unit] = {}
         self._enemy_structures_previous_map: Dict[int, Unit] = {}
         self._all_units_previous_map: Dict[int, Unit] = {}
+        # Static data per unit type, filled with the game data in _prepare_start
+        self._unit_type_static: UnitTypeStaticTable = UnitTypeStaticTable(None)
         self._previous_upgrades: Set[UpgradeId] = set()
         self._expansion_positions_list: List[Point2] = []
         self._resource_location_to_expansion_position_dict: Dict[Point2, Point2] = {}
@@ -273,7 +309,7 @@ class BotAIInternal(ABC):
         abilities_amount: CounterType[AbilityId] = Counter()
         max_build_progress: Dict[AbilityId, float] = {}
         unit: Unit
-        for unit in self.units + self.structures:
+        for unit in itertools.chain(self.units, self.structures):
             for order in unit.orders:
                 abilities_amount[order.ability.exact_id] += 1
             if not unit.is_ready:
@@ -298,6 +334,46 @@ class BotAIInternal(ABC):
 
         return abilities_amount, max_build_progress
 
+    @final
+    @property_cache_once_per_frame
+    def _structure_and_research_progress(self) -> Tuple[Dict[int, float], Dict[AbilityId, float]]:
+        """Cache for the structure_type_build_progress and already_pending_upgrade functions.
+        Contains the highest build progress per own structure type (by type value)
+        and the highest progress of each ability that ready structures are currently executing, e.g. researches"""
+        structure_progress: Dict[int, float] = {}
+        order_progress: Dict[AbilityId, float] = {}
+        for structure in self.structures:
+            unit_type: int = structure._proto.unit_type
+            build_progress: float = structure.build_progress
+            if build_progress > structure_progress.get(unit_type, 0):
+                structure_progress[unit_type] = build_progress
+            if build_progress == 1:
+                for order in structure.orders:
+                    ability: AbilityId = order.ability.exact_id
+                    order_progress[ability] = max(order_progress.get(ability, 0), order.progress)
+        return structure_progress, order_progress
+
+    @final
+    @property_cache_once_per_frame
+    def _production_structures(self) -> List[Unit]:
+        """Cache for the train function: all own structures (and larva) that are able to produce this frame, in observation order.
+        Structures that are under construction or protoss structures without power (except nexus) are left out."""
+        production_structures: List[Unit] = []
+        is_protoss = self.race == Race.Protoss
+        for structure in itertools.chain(self.structures, self.larva):
+            if structure.build_progress < 1:
+                continue
+            if is_protoss and structure.type_id != UnitTypeId.NEXUS and not structure.is_powered:
+                continue
+            production_structures.append(structure)
+        return production_structures
+
+    @final
+    @property_cache_once_per_frame
+    def _production_query_cache(self) -> Dict[Tuple[str, Union[UnitTypeId, UpgradeId]], float]:
+        """ Results of already_pending and tech_requirement_progress of this frame. """
+        return {}
+
     @final
     @property_cache_once_per_frame
     def _worker_orders(self) -> CounterType[AbilityId]:
@@ -420,8 +496,13 @@ class BotAIInternal(ABC):
             return None
         if prevent_double:
             actions = list(filter(self.prevent_double_actions, actions))
-        result = await self.client.actions(actions)
-        return result
+        if not self.action_ledger_enabled:
+            return await self.client.actions(actions)
+        game_loop = self.state.game_loop
+        actions = self.action_ledger.filter_suppressed(actions, game_loop)
+        results = await self.client.actions_with_commands(actions)
+        self.action_ledger.record_results(results, game_loop)
+        return [result for _commands, result in results if result != ActionResult.Success]
 
     @final
     @staticmethod
@@ -465,6 +546,7 @@ class BotAIInternal(ABC):
         self.player_id: int = player_id
         self.game_info: GameInfo = game_info
         self.game_data: GameData = game_data
+        self._unit_type_static: UnitTypeStaticTable = UnitTypeStaticTable(game_data)
         self.realtime: bool = realtime
         self.base_build: int = base_build
 
@@ -494,7 +576,7 @@ class BotAIInternal(ABC):
         # Set attributes from new state before on_step."""
         self.state: GameState = state  # See game_state.py
         # update pathing grid, which unfortunately is in GameInfo instead of GameState
-        self.game_info.pathing_grid = PixelMap(proto_game_info.game_info.start_raw.pathing_grid, in_bits=True)
+        self.game_info.pathing_grid = PixelMap(proto_game_info.game_info.start_raw.pathing_grid, in_bits=True, packed=True)
         # Required for events, needs to be before self.units are initialized so the old units are stored
         self._units_previous_map: Dict[int, Unit] = {unit.tag: unit for unit in self.units}
         self._structures_previous_map: Dict[int, Unit] = {structure.tag: structure for structure in self.structures}
@@ -503,9 +585,24 @@ class BotAIInternal(ABC):
             structure.tag: structure
             for structure in self.enemy_structures
         }
-        self._all_units_previous_map: Dict[int, Unit] = {unit.tag: unit for unit in self.all_units}
+        # Keep the tag map of the previous frame, _prepare_units fills a new one for this frame
+        self._all_units_previous_map: Dict[int, Unit] = self._all_units_map
+        self._all_units_map: Dict[int, Unit] = {}
 
         self._prepare_units()
+        if self.action_ledger_enabled:
+            self.action_ledger.record_errors(state.action_errors, state.game_loop)
+        if self.enemy_memory_enabled:
+            self.enemy_memory.remove(state.dead_units)
+            self.enemy_memory.update(self.all_enemy_units, state.game_loop)
+        if self.creep_analysis_enabled:
+            self.creep_analysis.update(
+                state.creep.data_numpy == 1,
+                self.game_info.pathing_grid.data_numpy == 1,
+                self.game_info.placement_grid.data_numpy == 1,
+            )
+        if self.game_state_eager_decoding:
+            state.decode_lazy_fields()
         self.minerals: int = state.common.minerals
         self.vespene: int = state.common.vespene
         self.supply_army: int = state.common.food_army
@@ -561,11 +658,12 @@ class BotAIInternal(ABC):
                 unit_type: int = unit.unit_type
                 # Convert these units to effects: reaper grenade, parasitic bomb dummy, forcefield
                 if unit_type in FakeEffectID:
-                    self.state.effects.add(EffectData(unit, fake=True))
+                    self.state._add_fake_effect(unit)
                     continue
                 unit_obj = Unit(unit, self, distance_calculation_index=index, base_build=self.base_build)
                 index += 1
                 self.all_units.append(unit_obj)
+                self._all_units_map[unit.tag] = unit_obj
                 if unit.display_type == IS_PLACEHOLDER:
                     self.placeholders.append(unit_obj)
                     continue
@@ -794,7 +892,7 @@ class BotAIInternal(ABC):
         ).reshape((self._units_count, 2))
         assert len(positions_array) == self._units_count
         # See performance benchmarks
-        self._cached_pdist = pdist(positions_array, "sqeuclidean")
+        self._cached_pdist = _scipy_distance().pdist(positions_array, "sqeuclidean")
 
         return self._cached_pdist
 
@@ -811,7 +909,7 @@ class BotAIInternal(ABC):
         ).reshape((self._units_count, 2))
         assert len(positions_array) == self._units_count
         # See performance benchmarks
-        self._cached_cdist = cdist(positions_array, positions_array, "sqeuclidean")
+        self._cached_cdist = _scipy_distance().cdist(positions_array, positions_array, "sqeuclidean")
 
         return self._cached_cdist
 
@@ -826,7 +924,7 @@ class BotAIInternal(ABC):
             count=2 * self._units_count,
         ).reshape((-1, 2))
         # See performance benchmarks
-        self._cached_cdist = cdist(positions_array, positions_array, "sqeuclidean")
+        self._cached_cdist = _scipy_distance().cdist(positions_array, positions_array, "sqeuclidean")
 
         return self._cached_cdist
 
@@ -927,6 +1025,9 @@ class BotAIInternal(ABC):
         method 2: Use scipy's cidst square matrix (2d array)
         method 3: Use scipy's cidst square matrix (2d array) without asserts (careful: very weird error messages, but maybe slightly faster)"""
         assert 0 <= method <= 3, f"Selected method was: {method}"
+        if method != 0:
+            # Import scipy before the first step instead of during it
+            _scipy_distance()
         if method == 0:
             self._distance_squared_unit_to_unit = self._distance_squared_unit_to_unit_method0
         elif method == 1:
@@ -1,42 +1,55 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+import itertools
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
+import numpy as np
 from loguru import logger
+from s2clientprotocol import common_pb2 as common_pb
 from s2clientprotocol import debug_pb2 as debug_pb
 from s2clientprotocol import query_pb2 as query_pb
 from s2clientprotocol import raw_pb2 as raw_pb
 from s2clientprotocol import sc2api_pb2 as sc_pb
 from s2clientprotocol import spatial_pb2 as spatial_pb
 
-from sc2.action import combine_actions
+from sc2.action import combine_actions_with_commands
 from sc2.data import ActionResult, ChatChannel, Race, Result, Status
 from sc2.game_data import AbilityData, GameData
+from sc2.game_data_cache import cache_key, load_game_data, store_game_data
 from sc2.game_info import GameInfo
 from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId
+from sc2.observation_recording import ObservationRecorder, RecordingSocket, read_recording
 from sc2.position import Point2, Point3
 from sc2.protocol import ConnectionAlreadyClosed, Protocol, ProtocolError
 from sc2.renderer import Renderer
 from sc2.unit import Unit
+from sc2.unit_command import UnitCommand
 from sc2.units import Units
 
 
 # pylint: disable=R0904
 class Client(Protocol):
 
-    def __init__(self, ws, save_replay_path: str = None):
+    def __init__(self, ws, save_replay_path: str = None, record_observations_path: str = None):
         """
         :param ws:
+        :param save_replay_path:
+        :param record_observations_path: if set, game data, game info and all observations are written to this file, see sc2/observation_recording.py
         """
         super().__init__(ws)
         # How many frames will be waited between iterations before the next one is called
         self.game_step: int = 4
         self.save_replay_path: Optional[str] = save_replay_path
+        self._observation_recorder: Optional[ObservationRecorder] = (
+            ObservationRecorder(record_observations_path) if record_observations_path is not None else None
+        )
         self._player_id = None
         self._game_result = None
-        # Store a hash value of all the debug requests to prevent sending the same ones again if they haven't changed last frame
-        self._debug_hash_tuple_last_iteration: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        # Store a hash value of all the debug requests and the versions of the debug layers to prevent sending the same ones again if they haven't changed last frame
+        self._debug_hash_tuple_last_iteration: Tuple[Any, ...] = ((0, 0, 0, 0), ())
+        self._debug_layers: Dict[str, DebugLayer] = {}
         self._debug_draw_last_frame = False
         self._debug_texts = []
         self._debug_lines = []
@@ -45,11 +58,22 @@ class Client(Protocol):
 
         self._renderer = None
         self.raw_affects_selection = False
+        # Amount of ActionRaw messages that were not sent this game because unit commands were combined or deduplicated
+        self.actions_saved_by_combining: int = 0
+        # Select if the game data should be cached per SC2 version, see sc2/game_data_cache.py
+        # The cached game data is shared by all clients of the process and must not be modified
+        self.use_game_data_cache: bool = True
 
     @property
     def in_game(self) -> bool:
         return self._status in {Status.in_game, Status.in_replay}
 
+    async def _execute(self, **kwargs):
+        response = await super()._execute(**kwargs)
+        if self._observation_recorder is not None:
+            self._observation_recorder.record(response)
+        return response
+
     async def join_game(self, name=None, race=None, observed_player_id=None, portconfig=None, rgb_render_config=None):
         ifopts = sc_pb.InterfaceOptions(
             raw=True,
@@ -118,6 +142,9 @@ class Client(Protocol):
         except (ProtocolError, ConnectionAlreadyClosed):
             if is_resign:
                 raise
+        finally:
+            if self._observation_recorder is not None:
+                self._observation_recorder.close()
 
     async def save_replay(self, path):
         logger.debug("Requesting replay from server")
@@ -143,6 +170,8 @@ class Client(Protocol):
             for pr in result.observation.player_result:
                 player_id_to_result[pr.player_id] = Result(pr.result)
             self._game_result = player_id_to_result
+            if self._observation_recorder is not None:
+                self._observation_recorder.close()
 
         # if render_data is available, then RGB rendering was requested
         if self._renderer and result.observation.observation.HasField("render_data"):
@@ -155,10 +184,22 @@ class Client(Protocol):
         step_size = step_size or self.game_step
         return await self._execute(step=sc_pb.RequestStep(count=step_size))
 
-    async def get_game_data(self) -> GameData:
+    async def get_game_data(self, ping: Optional[sc_pb.ResponsePing] = None) -> GameData:
+        """
+        :param ping: if set, the game data is cached for the SC2 version that answered the ping and is not requested again in later games, see sc2/game_data_cache.py
+            The cached game data is shared with other games of the process and has to be treated as read-only
+        """
+        # Recordings need the data response, so it is always requested while recording or playing back a recording
+        use_cache = ping is not None and self.use_game_data_cache and self._observation_recorder is None
+        if use_cache:
+            game_data = load_game_data(cache_key(ping))
+            if game_data is not None:
+                return game_data
         result = await self._execute(
             data=sc_pb.RequestData(ability_id=True, unit_type_id=True, upgrade_id=True, buff_id=True, effect_id=True)
         )
+        if use_cache:
+            return store_game_data(cache_key(ping), result.data)
         return GameData(result.data)
 
     async def dump_data(self, ability_id=True, unit_type_id=True, upgrade_id=True, buff_id=True, effect_id=True):
@@ -190,17 +231,28 @@ class Client(Protocol):
             return None
         if not isinstance(actions, list):
             actions = [actions]
+        results = await self.actions_with_commands(actions)
+        if return_successes:
+            return [result for _commands, result in results]
+        return [result for _commands, result in results if result != ActionResult.Success]
+
+    async def actions_with_commands(self, actions: List[UnitCommand]) -> List[Tuple[List[UnitCommand], ActionResult]]:
+        """Sends the unit commands and returns the result of each sent action together with the commands that were combined into it.
+        Returns an empty list if the actions could not be sent.
 
+        :param actions:"""
+        if not actions:
+            return []
+        combined_actions = list(combine_actions_with_commands(actions))
         # On realtime=True, might get an error here: sc2.protocol.ProtocolError: ['Not in a game']
         try:
             res = await self._execute(
-                action=sc_pb.RequestAction(actions=(sc_pb.Action(action_raw=a) for a in combine_actions(actions)))
+                action=sc_pb.RequestAction(actions=(sc_pb.Action(action_raw=a) for a, _commands in combined_actions))
             )
         except ProtocolError:
             return []
-        if return_successes:
-            return [ActionResult(r) for r in res.action.result]
-        return [ActionResult(r) for r in res.action.result if ActionResult(r) != ActionResult.Success]
+        self.actions_saved_by_combining += len(actions) - len(combined_actions)
+        return [(commands, ActionResult(r)) for (_action, commands), r in zip(combined_actions, res.action.result)]
 
     async def query_pathing(self, start: Union[Unit, Point2, Point3],
                             end: Union[Point2, Point3]) -> Optional[Union[int, float]]:
@@ -577,9 +629,31 @@ class Client(Protocol):
         assert isinstance(p, Point3)
         self._debug_spheres.append(DrawItemSphere(start_point=p, radius=r, color=color))
 
+    def debug_layer(self, name: str) -> DebugLayer:
+        """
+        Returns the retained debug layer with this name, a new empty one is created if it doesn't exist yet.
+        Drawings of a layer are shown every frame until the layer is changed, cleared or removed, so they don't need to be drawn again in every on_step.
+        See DebugLayer.
+
+        :param name:
+        """
+        layer = self._debug_layers.get(name)
+        if layer is None:
+            layer = self._debug_layers[name] = DebugLayer()
+        return layer
+
+    def debug_remove_layer(self, name: str):
+        """
+        Removes the retained debug layer with this name, its drawings disappear in the next frame.
+
+        :param name:
+        """
+        self._debug_layers.pop(name, None)
+
     async def _send_debug(self):
         """Sends the debug draw execution. This is run by main.py now automatically, if there is any items in the list. You do not need to run this manually any longer.
         Check examples/terran/ramp_wall.py for example drawing. Each draw request needs to be sent again in every single on_step iteration.
+        Drawings of debug layers (see debug_layer) are kept until they are changed, only layers that changed since the last request are serialized again.
         """
         debug_hash = (
             sum(hash(item) for item in self._debug_texts),
@@ -587,29 +661,22 @@ class Client(Protocol):
             sum(hash(item) for item in self._debug_boxes),
             sum(hash(item) for item in self._debug_spheres),
         )
-        if debug_hash != (0, 0, 0, 0):
-            if debug_hash != self._debug_hash_tuple_last_iteration:
+        layers = [layer for layer in self._debug_layers.values() if layer]
+        debug_state = (debug_hash, tuple(layer.version for layer in layers))
+        if debug_state != ((0, 0, 0, 0), ()):
+            if debug_state != self._debug_hash_tuple_last_iteration:
                 # Something has changed, either more or less is to be drawn, or a position of a drawing changed (e.g. when drawing on a moving unit)
-                self._debug_hash_tuple_last_iteration = debug_hash
+                self._debug_hash_tuple_last_iteration = debug_state
+                draw = debug_pb.DebugDraw(
+                    text=[text.to_proto() for text in self._debug_texts] if self._debug_texts else None,
+                    lines=[line.to_proto() for line in self._debug_lines] if self._debug_lines else None,
+                    boxes=[box.to_proto() for box in self._debug_boxes] if self._debug_boxes else None,
+                    spheres=[sphere.to_proto() for sphere in self._debug_spheres] if self._debug_spheres else None,
+                )
+                # Serialized messages can be concatenated, the repeated fields of all layers are appended to the draw message
+                draw_bytes = draw.SerializeToString() + b"".join(layer.serialized for layer in layers)
                 try:
-                    await self._execute(
-                        debug=sc_pb.RequestDebug(
-                            debug=[
-                                debug_pb.DebugCommand(
-                                    draw=debug_pb.DebugDraw(
-                                        text=[text.to_proto()
-                                              for text in self._debug_texts] if self._debug_texts else None,
-                                        lines=[line.to_proto()
-                                               for line in self._debug_lines] if self._debug_lines else None,
-                                        boxes=[box.to_proto()
-                                               for box in self._debug_boxes] if self._debug_boxes else None,
-                                        spheres=[sphere.to_proto()
-                                                 for sphere in self._debug_spheres] if self._debug_spheres else None,
-                                    )
-                                )
-                            ]
-                        )
-                    )
+                    await self._execute_serialized(_debug_draw_request(draw_bytes))
                 except ProtocolError:
                     return
             self._debug_draw_last_frame = True
@@ -619,7 +686,7 @@ class Client(Protocol):
             self._debug_spheres.clear()
         elif self._debug_draw_last_frame:
             # Clear drawing if we drew last frame but nothing to draw this frame
-            self._debug_hash_tuple_last_iteration = (0, 0, 0, 0)
+            self._debug_hash_tuple_last_iteration = ((0, 0, 0, 0), ())
             await self._execute(
                 debug=sc_pb.RequestDebug(
                     debug=[
@@ -732,6 +799,33 @@ class Client(Protocol):
         await self._execute(quick_load=sc_pb.RequestQuickLoad())
 
 
+class RecordedClient(Client):
+    """
+    Client that plays back a file written by 'ObservationRecorder' instead of connecting to SC2.
+    Use it to run a bot offline on recorded games, e.g. to profile it or to compare which actions it issues.
+
+    Example::
+
+        from sc2.main import run_recording
+
+        bot = MyBot()
+        run_recording(bot, "game.sc2obs")
+        for game_loop, actions in bot.client.recorded_actions.items():
+            print(game_loop, len(actions))
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.recording_path = Path(path)
+        super().__init__(RecordingSocket(list(read_recording(self.recording_path))))
+        self._player_id = self._ws.player_id
+        self.use_game_data_cache = False
+
+    @property
+    def recorded_actions(self) -> Dict[int, List[raw_pb.ActionRaw]]:
+        """ Actions the bot would have sent, keyed by the game loop of the observation they were issued on. """
+        return self._ws.actions
+
+
 class DrawItem:
 
     @staticmethod
@@ -845,3 +939,194 @@ class DrawItemSphere(DrawItem):
 
     def __hash__(self):
         return hash((self._start_point, self._radius, self._color))
+
+
+def _length_delimited(field_number: int, payload: bytes) -> bytes:
+    """ Encodes 'payload' as protobuf field of wire type 2 (embedded message). """
+    encoded = bytearray()
+    for value in ((field_number << 3) | 2, len(payload)):
+        while value > 0x7F:
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        encoded.append(value)
+    return bytes(encoded) + payload
+
+
+def _debug_draw_request(draw_bytes: bytes) -> bytes:
+    """ Returns the serialized sc_pb.Request that contains one DebugCommand with the serialized DebugDraw 'draw_bytes'. """
+    command = _length_delimited(debug_pb.DebugCommand.DESCRIPTOR.fields_by_name["draw"].number, draw_bytes)
+    request_debug = _length_delimited(sc_pb.RequestDebug.DESCRIPTOR.fields_by_name["debug"].number, command)
+    return _length_delimited(sc_pb.Request.DESCRIPTOR.fields_by_name["debug"].number, request_debug)
+
+
+_debug_layer_versions = itertools.count(1)
+
+
+class DebugLayer:
+    """
+    Retained debug drawings, see Client.debug_layer.
+
+    The drawings are converted to protobuf messages when they are added, and the layer is serialized once after each change.
+    As long as a layer is not changed, sending it again costs no more than copying its bytes.
+    'grid' draws a 2d array (e.g. an influence map) with one box per run of equal values in a row instead of one box per cell.
+
+    Example::
+
+        layer = self.client.debug_layer("influence")
+        if self.iteration % 22 == 0:
+            layer.clear()
+            layer.grid(influence, self.game_info.terrain_height.data_numpy * 32 / 255 - 16 + 0.1)
+        self.client.debug_layer("target").clear()
+        self.client.debug_layer("target").sphere(target, 1)
+    """
+
+    def __init__(self):
+        self._draw = debug_pb.DebugDraw()
+        self._serialized: Optional[bytes] = None
+        self.version: int = next(_debug_layer_versions)
+
+    def _changed(self):
+        self._serialized = None
+        self.version = next(_debug_layer_versions)
+
+    def __len__(self) -> int:
+        draw = self._draw
+        return len(draw.text) + len(draw.lines) + len(draw.boxes) + len(draw.spheres)
+
+    @property
+    def serialized(self) -> bytes:
+        """ The drawings of this layer as serialized DebugDraw message. """
+        if self._serialized is None:
+            self._serialized = self._draw.SerializeToString()
+        return self._serialized
+
+    def clear(self):
+        """ Removes all drawings of this layer. """
+        if len(self):
+            self._draw.Clear()
+            self._changed()
+
+    def text_screen(self, text: str, pos: Union[Point2, tuple], color: Union[tuple, list, Point3] = None, size: int = 8):
+        """
+        Draws a text on the screen with coordinates 0 <= x, y <= 1.
+
+        :param text:
+        :param pos:
+        :param color:
+        :param size:
+        """
+        self._draw.text.add(
+            color=DrawItem.to_debug_color(color),
+            text=text,
+            virtual_pos=common_pb.Point(x=pos[0], y=pos[1], z=0),
+            size=size,
+        )
+        self._changed()
+
+    def text_world(self, text: str, pos: Union[Unit, Point3], color: Union[tuple, list, Point3] = None, size: int = 8):
+        """
+        Draws a text at a Point3 position in the game world.
+
+        :param text:
+        :param pos:
+        :param color:
+        :param size:
+        """
+        if isinstance(pos, Unit):
+            pos = pos.position3d
+        self._draw.text.add(color=DrawItem.to_debug_color(color), text=text, world_pos=pos.as_Point, size=size)
+        self._changed()
+
+    def line(self, p0: Union[Unit, Point3], p1: Union[Unit, Point3], color: Union[tuple, list, Point3] = None):
+        """
+        Draws a line from p0 to p1.
+
+        :param p0:
+        :param p1:
+        :param color:
+        """
+        if isinstance(p0, Unit):
+            p0 = p0.position3d
+        if isinstance(p1, Unit):
+            p1 = p1.position3d
+        self._draw.lines.add(
+            line=debug_pb.Line(p0=p0.as_Point, p1=p1.as_Point), color=DrawItem.to_debug_color(color)
+        )
+        self._changed()
+
+    def box(self, p_min: Union[Unit, Point3], p_max: Union[Unit, Point3], color: Union[tuple, list, Point3] = None):
+        """
+        Draws a box with p_min and p_max as corners of the box.
+
+        :param p_min:
+        :param p_max:
+        :param color:
+        """
+        if isinstance(p_min, Unit):
+            p_min = p_min.position3d
+        if isinstance(p_max, Unit):
+            p_max = p_max.position3d
+        self._draw.boxes.add(min=p_min.as_Point, max=p_max.as_Point, color=DrawItem.to_debug_color(color))
+        self._changed()
+
+    def sphere(self, p: Union[Unit, Point3], r: float, color: Union[tuple, list, Point3] = None):
+        """
+        Draws a sphere at point p with radius r.
+
+        :param p:
+        :param r:
+        :param color:
+        """
+        if isinstance(p, Unit):
+            p = p.position3d
+        self._draw.spheres.add(p=p.as_Point, r=r, color=DrawItem.to_debug_color(color))
+        self._changed()
+
+    def grid(
+        self,
+        values: np.ndarray,
+        height: Union[float, np.ndarray],
+        low_color: Union[tuple, list, Point3] = (0, 0, 255),
+        high_color: Union[tuple, list, Point3] = (255, 0, 0),
+        skip_value: float = 0,
+        origin: Union[Point2, tuple] = (0, 0),
+    ):
+        """
+        Draws a 2d array indexed [y, x] (like PixelMap.data_numpy) as flat boxes of one cell height.
+        Neighbouring cells in a row with the same value are drawn as one box.
+        The color is interpolated between 'low_color' and 'high_color' from the smallest to the largest drawn value.
+
+        :param values:
+        :param height: z value of the boxes, either one value or an array of the same shape as 'values'
+        :param low_color:
+        :param high_color:
+        :param skip_value: cells with this value or NaN are not drawn
+        :param origin: map position of values[0, 0]
+        """
+        values = np.asarray(values, dtype=np.float64)
+        heights = np.broadcast_to(np.asarray(height, dtype=np.float64), values.shape)
+        drawn = ~np.isnan(values) & (values != skip_value)
+        if not drawn.any():
+            return
+        low, high = values[drawn].min(), values[drawn].max()
+        scale = (values - low) / (high - low) if high > low else np.ones_like(values)
+        low_rgb = np.array(low_color[:3], dtype=np.float64)
+        rgb_range = np.array(high_color[:3], dtype=np.float64) - low_rgb
+        boxes = self._draw.boxes
+        origin_x, origin_y = origin[0], origin[1]
+        for y, (row, row_drawn) in enumerate(zip(values, drawn)):
+            if not row_drawn.any():
+                continue
+            # A run of equal values ends where the value changes or the next cell is not drawn
+            breaks = (row[1:] != row[:-1]) | ~row_drawn[1:] | ~row_drawn[:-1]
+            starts = np.flatnonzero(row_drawn & np.concatenate(([True], breaks)))
+            ends = np.flatnonzero(row_drawn & np.concatenate((breaks, [True])))
+            for x0, x1 in zip(starts.tolist(), ends.tolist()):
+                z = float(heights[y, x0:x1 + 1].max())
+                r, g, b = (low_rgb + rgb_range * scale[y, x0]).astype(int).tolist()
+                boxes.add(
+                    min=common_pb.Point(x=origin_x + x0, y=origin_y + y, z=z),
+                    max=common_pb.Point(x=origin_x + x1 + 1, y=origin_y + y + 1, z=z),
+                    color=debug_pb.Color(r=r, g=g, b=b),
+                )
+        self._changed()
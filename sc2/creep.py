@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from sc2.position import Point2
+
+# Creep spreads this many cells around a creep tumor
+CREEP_TUMOR_SPREAD_RADIUS = 10
+
+
+class CreepAnalysis:
+    """
+    Creep frontier and distance to the creep edge, updated from the creep map every frame.
+
+    The open cells are the pathable cells without creep.
+    'edge_distance' is the chebyshev distance of each creep cell to the closest open cell, capped at 'max_distance', and 0 for all other cells.
+    The frontier are the creep cells next to an open cell, their edge distance is 1.
+    Only the area around the cells whose creep or pathing changed since the last update is computed again.
+
+    The analysis is updated before each step if 'self.creep_analysis_enabled' is set to True in the bot.
+
+    Example::
+
+        for queen in self.units(UnitTypeId.QUEEN).filter(lambda queen: queen.energy >= 25):
+            spots = self.creep_analysis.tumor_spots(1, near=queen.position)
+            if spots:
+                queen(AbilityId.BUILD_CREEPTUMOR_QUEEN, spots[0])
+    """
+
+    def __init__(self, max_distance: int = CREEP_TUMOR_SPREAD_RADIUS):
+        """
+        :param max_distance: edge distances are capped at this value, the cost of an update grows with it
+        """
+        assert max_distance >= 1, f"max_distance is {max_distance}, it should be at least 1"
+        self.max_distance = max_distance
+        self._creep: Optional[np.ndarray] = None
+        self._pathable: Optional[np.ndarray] = None
+        self._placeable: Optional[np.ndarray] = None
+        self._edge_distance: Optional[np.ndarray] = None
+        # Row-wise prefix sums of the open cells for tumor_spots, computed on first use after an update
+        self._open_prefix: Optional[np.ndarray] = None
+
+    @property
+    def edge_distance(self) -> np.ndarray:
+        """ Array of shape (height, width) indexed by [y, x], see the class description. """
+        assert self._edge_distance is not None, "The creep analysis was not updated yet"
+        return self._edge_distance
+
+    @property
+    def frontier(self) -> np.ndarray:
+        """ Boolean array of shape (height, width) indexed by [y, x], True for the creep cells next to open cells. """
+        return self.edge_distance == 1
+
+    def frontier_points(self) -> np.ndarray:
+        """ Returns the centers of the frontier cells as array of shape (N, 2) with x and y coordinates. """
+        ys, xs = np.nonzero(self.frontier)
+        return np.column_stack((xs + 0.5, ys + 0.5))
+
+    def update(self, creep: np.ndarray, pathable: np.ndarray, placeable: Optional[np.ndarray] = None):
+        """Updates the frontier and edge distances from the creep map of this frame.
+
+        :param creep: boolean array of shape (height, width), e.g. self.state.creep.data_numpy == 1
+        :param pathable: boolean array of shape (height, width), e.g. self.game_info.pathing_grid.data_numpy == 1
+        :param placeable: boolean array of shape (height, width) of the cells where tumors can be placed if they have creep and are pathable,
+            e.g. self.game_info.placement_grid.data_numpy == 1. All cells if None
+        """
+        creep = np.asarray(creep, dtype=bool)
+        pathable = np.asarray(pathable, dtype=bool)
+        self._placeable = None if placeable is None else np.asarray(placeable, dtype=bool)
+        if self._creep is None or self._creep.shape != creep.shape:
+            self._edge_distance = np.zeros(creep.shape, dtype=np.uint8)
+            y0, y1, x0, x1 = 0, creep.shape[0], 0, creep.shape[1]
+        else:
+            changed = (creep != self._creep) | (pathable != self._pathable)
+            changed_rows = np.flatnonzero(changed.any(axis=1))
+            if not changed_rows.size:
+                return
+            changed_columns = np.flatnonzero(changed.any(axis=0))
+            y0, y1 = int(changed_rows[0]), int(changed_rows[-1]) + 1
+            x0, x1 = int(changed_columns[0]), int(changed_columns[-1]) + 1
+        self._creep = creep
+        self._pathable = pathable
+        self._open_prefix = None
+
+        # Edge distances up to max_distance change around the changed cells
+        height, width = creep.shape
+        distance = self.max_distance
+        y0, y1 = max(0, y0 - distance), min(height, y1 + distance)
+        x0, x1 = max(0, x0 - distance), min(width, x1 + distance)
+        self._edge_distance[y0:y1, x0:x1] = self._edge_distances(y0, y1, x0, x1)
+
+    def _edge_distances(self, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """ Computes the edge distances of the cells in [y0:y1, x0:x1] by repeated erosion of the cells that are not open. """
+        height, width = self._creep.shape
+        distance = self.max_distance
+        # The edge distance of a cell depends on the cells up to max_distance away
+        wy0, wy1 = max(0, y0 - distance), min(height, y1 + distance)
+        wx0, wx1 = max(0, x0 - distance), min(width, x1 + distance)
+        creep = self._creep[wy0:wy1, wx0:wx1]
+        # Cells outside of the map are not open
+        closed = creep | ~self._pathable[wy0:wy1, wx0:wx1]
+        window_height, window_width = closed.shape
+        distances = np.zeros(closed.shape, dtype=np.uint8)
+        padded = np.ones((window_height + 2, window_width + 2), dtype=bool)
+        for _ in range(distance):
+            distances += closed
+            padded[1:-1, 1:-1] = closed
+            closed = padded[1:-1, 1:-1].copy()
+            for dy in range(3):
+                for dx in range(3):
+                    closed &= padded[dy:dy + window_height, dx:dx + window_width]
+            if not closed.any():
+                break
+        distances[~creep] = 0
+        return distances[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0]
+
+    def coverage_gain(self, points: np.ndarray, radius: int = CREEP_TUMOR_SPREAD_RADIUS) -> np.ndarray:
+        """Returns the amount of open cells within 'radius' of each point, which a creep tumor at that point would cover.
+
+        :param points: array of shape (N, 2) with x and y coordinates
+        :param radius:
+        """
+        assert self._creep is not None, "The creep analysis was not updated yet"
+        if self._open_prefix is None:
+            open_cells = self._pathable & ~self._creep
+            self._open_prefix = np.zeros((open_cells.shape[0], open_cells.shape[1] + 1), dtype=np.int32)
+            np.cumsum(open_cells, axis=1, out=self._open_prefix[:, 1:])
+        prefix = self._open_prefix
+        height, width = self._creep.shape
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 2))
+        xs = np.floor(points[:, 0]).astype(np.intp)
+        ys = np.floor(points[:, 1]).astype(np.intp)
+        gains = np.zeros(len(points), dtype=np.int32)
+        # Sum the open cells of each row of the disc with the prefix sums
+        for dy in range(-radius, radius + 1):
+            half_width = math.isqrt(radius * radius - dy * dy)
+            rows = ys + dy
+            inside = (0 <= rows) & (rows < height)
+            rows = np.clip(rows, 0, height - 1)
+            start = np.clip(xs - half_width, 0, width)
+            end = np.clip(xs + half_width + 1, 0, width)
+            gains += np.where(inside, prefix[rows, end] - prefix[rows, start], 0)
+        return gains
+
+    def tumor_spots(
+        self,
+        amount: int,
+        near: Optional[Point2] = None,
+        max_edge_distance: int = 3,
+        min_spacing: float = CREEP_TUMOR_SPREAD_RADIUS / 2,
+        radius: int = CREEP_TUMOR_SPREAD_RADIUS,
+    ) -> List[Point2]:
+        """Returns up to 'amount' cells for creep tumors, ranked by the amount of open cells they would cover.
+
+        :param amount:
+        :param near: only cells within 'radius' of this point, e.g. the position of the creep tumor that spreads
+        :param max_edge_distance: only cells at most this far inside of the creep edge
+        :param min_spacing: minimum distance between the returned spots
+        :param radius: spread radius of the tumor
+        """
+        edge_distance = self.edge_distance
+        candidates = (edge_distance > 0) & (edge_distance <= max_edge_distance) & self._pathable
+        if self._placeable is not None:
+            candidates &= self._placeable
+        ys, xs = np.nonzero(candidates)
+        points = np.column_stack((xs + 0.5, ys + 0.5))
+        if near is not None:
+            points = points[((points - np.array(near[:2], dtype=np.float64))**2).sum(axis=1) <= radius**2]
+        if amount <= 0 or not len(points):
+            return []
+
+        gains = self.coverage_gain(points, radius)
+        spots: List[Point2] = []
+        chosen = np.zeros((0, 2), dtype=np.float64)
+        for index in np.argsort(-gains, kind="stable").tolist():
+            if gains[index] == 0:
+                break
+            point = points[index]
+            if len(chosen) and (((chosen - point)**2).sum(axis=1) < min_spacing**2).any():
+                continue
+            chosen = np.vstack((chosen, point))
+            spots.append(Point2(point.tolist()))
+            if len(spots) == amount:
+                break
+        return spots
@@ -0,0 +1,245 @@
+# THIS FILE WAS AUTOMATICALLY GENERATED BY "generate_lookup_tables.py" DO NOT CHANGE MANUALLY!
+# ANY CHANGE WILL BE OVERWRITTEN
+
+from typing import Dict
+
+# UnitTypeId value -> bitmask of the UnitTypeId values that can train, build or morph into it
+UNIT_TRAINED_FROM_BITS: Dict[int, int] = {
+    4: 0x800000000000000000,
+    9: 0x200000000000000000000000000,
+    10: 0x800000000000000,
+    12: 0x10000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000200000000000000000000000000000000,
+    18: 0x200000000000,
+    19: 0x200000000000,
+    20: 0x200000000000,
+    21: 0x200000000000,
+    22: 0x200000000000,
+    23: 0x200000000000,
+    24: 0x200000000000,
+    25: 0x200000000000,
+    26: 0x200000000000,
+    27: 0x200000000000,
+    28: 0x200000000000,
+    29: 0x200000000000,
+    30: 0x200000000000,
+    31: 0x100000000000000,
+    33: 0x8000000,
+    35: 0x10000000,
+    45: 0x1400000000000000000000000000040000,
+    48: 0x200000,
+    49: 0x200000,
+    50: 0x200000,
+    51: 0x200000,
+    52: 0x8000000,
+    53: 0x8000000,
+    54: 0x10000000,
+    55: 0x10000000,
+    56: 0x10000000,
+    57: 0x10000000,
+    59: 0x1000000000000000000000,
+    60: 0x1000000000000000000000,
+    61: 0x1000000000000000000000,
+    62: 0x1000000000000000000000,
+    63: 0x1000000000000000000000,
+    64: 0x1000000000000000000000,
+    65: 0x1000000000000000000000,
+    66: 0x1000000000000000000000,
+    67: 0x1000000000000000000000,
+    68: 0x1000000000000000000000,
+    69: 0x1000000000000000000000,
+    70: 0x1000000000000000000000,
+    71: 0x1000000000000000000000,
+    72: 0x1000000000000000000000,
+    73: 0x2000000000000000004000000000000000,
+    74: 0x2000000000000000004000000000000000,
+    75: 0x2000000000000000004000000000000000,
+    76: 0x2000000000000000004000000000000000,
+    77: 0x2000000000000000004000000000000000,
+    78: 0x80000000000000000,
+    79: 0x80000000000000000,
+    80: 0x80000000000000000,
+    81: 0x800000000000000000,
+    82: 0x800000000000000000,
+    83: 0x800000000000000000,
+    84: 0x800000000000000,
+    86: 0x100000000000000000000000000,
+    87: 0x20040000000008000000000000000000000,
+    88: 0x100000000000000000000000000,
+    89: 0x100000000000000000000000000,
+    90: 0x100000000000000000000000000,
+    91: 0x100000000000000000000000000,
+    92: 0x100000000000000000000000000,
+    93: 0x100000000000000000000000000,
+    94: 0x100000000000000000000000000,
+    95: 0x100000000000000000000000000,
+    96: 0x100000000000000000000000000,
+    97: 0x100000000000000000000000000,
+    98: 0x100000000000000000000000000,
+    99: 0x100000000000000000000000000,
+    100: 0x4000000000000000000000,
+    101: 0x10000000000000000000000000,
+    102: 0x100000000000000000000000,
+    104: 0x80000000000000000000000000000000000000,
+    105: 0x80000000000000000000000000000000000000,
+    106: 0x80000000000000000000000000000000000000,
+    107: 0x80000000000000000000000000000000000000,
+    108: 0x80000000000000000000000000000000000000,
+    109: 0x80000000000000000000000000000000000000,
+    110: 0x80000000000000000000000000000000000000,
+    111: 0x80000000000000000000000000000000000000,
+    112: 0x80000000000000000000000000000000000000,
+    114: 0x10000000000000000000000000000,
+    126: 0x30004000000000000000000000,
+    129: 0x20000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000400000000000000000000000000,
+    130: 0x40000,
+    132: 0x40000,
+    138: 0x40000000000000000000000000000000,
+    142: 0x800000000000000000000000,
+    311: 0x2000000000000000004000000000000000,
+    484: 0x8000000,
+    494: 0x80000000000000000000000000000000000000,
+    495: 0x80000000000000000,
+    496: 0x80000000000000000,
+    498: 0x8000000,
+    499: 0x80000000000000000000000000000000000000,
+    502: 0x800000000000000000000000000,
+    504: 0x100000000000000000000000000,
+    688: 0x4000000000000000000000000000,
+    689: 0x10000000,
+    692: 0x8000000,
+    693: 0x6000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000,
+    694: 0x800000000000000000,
+    732: 0x8000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000,
+    893: 0x400000000000000000000000000,
+    1910: 0x1000000000000000000000,
+}
+
+# Bitmask of the UnitTypeId values that need a techlab in the structure that trains them
+UNIT_REQUIRES_TECHLAB_BITS: int = 0x39c000200000000
+
+# UpgradeId value -> bitmask of the UnitTypeId values that can research it, including morphs of the structure
+UPGRADE_RESEARCHED_FROM_BITS: Dict[int, int] = {
+    2: 0x2000000000000000000000000,
+    3: 0x2000000000000000000000000,
+    4: 0x200000000000000000000000,
+    5: 0x400000,
+    6: 0x400000,
+    7: 0x400000,
+    8: 0x400000,
+    9: 0x400000,
+    11: 0x400000,
+    12: 0x400000,
+    13: 0x400000,
+    15: 0x2000000000,
+    16: 0x2000000000,
+    17: 0x2000000000,
+    19: 0x8000000000,
+    20: 0x20000000000,
+    21: 0x40000000,
+    25: 0x4000000,
+    30: 0x20000000,
+    31: 0x20000000,
+    32: 0x20000000,
+    36: 0x20000000,
+    37: 0x20000000,
+    38: 0x20000000,
+    39: 0x8000000000000000,
+    40: 0x8000000000000000,
+    41: 0x8000000000000000,
+    42: 0x8000000000000000,
+    43: 0x8000000000000000,
+    44: 0x8000000000000000,
+    45: 0x8000000000000000,
+    46: 0x8000000000000000,
+    47: 0x8000000000000000,
+    48: 0x400000000000000000,
+    49: 0x400000000000000000,
+    50: 0x400000000000000000,
+    52: 0x100000000000000000,
+    53: 0x40000000000000000000000,
+    54: 0x40000000000000000000000,
+    55: 0x40000000000000000000000,
+    56: 0x40000000000000000000000,
+    57: 0x40000000000000000000000,
+    58: 0x40000000000000000000000,
+    59: 0x40000000000000000000000,
+    60: 0x40000000000000000000000,
+    61: 0x40000000000000000000000,
+    62: 0x30004000000000000000000000,
+    64: 0x30004000000000000000000000,
+    65: 0x20000000000000000000000,
+    66: 0x20000000000000000000000,
+    68: 0x40100000000000000000000000,
+    69: 0x40100000000000000000000000,
+    70: 0x40100000000000000000000000,
+    71: 0x40100000000000000000000000,
+    72: 0x40100000000000000000000000,
+    73: 0x40100000000000000000000000,
+    75: 0x1000000000000000000000000,
+    76: 0x40000000,
+    78: 0x1000000000000000000,
+    79: 0x1000000000000000000,
+    80: 0x1000000000000000000,
+    81: 0x1000000000000000000,
+    82: 0x1000000000000000000,
+    83: 0x1000000000000000000,
+    84: 0x1000000000000000000,
+    86: 0x20000000000000000,
+    87: 0x20000000000000000,
+    88: 0x200000000000000000000000,
+    99: 0x10000000000000000,
+    101: 0x400000000000000000000000,
+    116: 0x20000000,
+    117: 0x20000000,
+    118: 0x20000000,
+    122: 0x8000000000,
+    127: 0x1000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000,
+    130: 0x20000000000000000,
+    134: 0x80000000000000000000000,
+    135: 0x80000000000000000000000,
+    136: 0x20000000000,
+    140: 0x40000000,
+    141: 0x200000000000000000,
+    288: 0x10000000000000000,
+    289: 0x8000000000,
+    293: 0x1000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000,
+    296: 0x8000000000,
+    297: 0x10000000000000000,
+    299: 0x20000000000,
+}
+
+# UpgradeId value -> UnitTypeId value of the structure that is required to research it
+UPGRADE_REQUIRED_BUILDING: Dict[int, int] = {
+    2: 100,
+    3: 100,
+    8: 29,
+    9: 29,
+    12: 29,
+    13: 29,
+    40: 65,
+    41: 65,
+    43: 65,
+    44: 65,
+    46: 65,
+    47: 65,
+    54: 100,
+    55: 101,
+    57: 100,
+    58: 101,
+    60: 100,
+    61: 101,
+    65: 101,
+    69: 100,
+    70: 101,
+    72: 100,
+    73: 101,
+    75: 100,
+    79: 64,
+    80: 64,
+    82: 64,
+    83: 64,
+    122: 29,
+    127: 101,
+    289: 29,
+    293: 101,
+}
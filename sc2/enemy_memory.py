@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+_STRUCTURE = 1
+_FLYING = 2
+# The unit was visible when it was last seen, not only a snapshot
+_VISIBLE = 4
+
+
+class RememberedUnit(NamedTuple):
+    """ What is known about an enemy unit from the last frame it was seen. """
+
+    tag: int
+    type_id: UnitTypeId
+    position: Point2
+    estimated_position: Point2
+    health: float
+    shield: float
+    last_seen: int
+    is_structure: bool
+    is_flying: bool
+
+
+class EnemyMemory:
+    """
+    Remembers the enemy units and structures that were seen, keyed by tag.
+
+    Only the values that are needed later are copied into numpy arrays (type, position, velocity, health, shield and the last frame the unit was seen),
+    so no Unit objects or observations are kept alive.
+    While a unit is not visible, its position is estimated from the velocity it had when it was last seen, for at most 'max_extrapolation_frames' game loops.
+    Units that were not seen for more than 'max_age_frames' (structures: 'structure_max_age_frames') game loops are forgotten,
+    units that died are removed right away.
+
+    The memory is updated before each step if 'self.enemy_memory_enabled' is set to True in the bot.
+
+    Example::
+
+        # Enemy army units that were seen within the last 30 seconds near our natural
+        for remembered in self.enemy_memory.closer_than(20, natural, max_age=672):
+            if not remembered.is_structure:
+                print(remembered.type_id, remembered.estimated_position, remembered.last_seen)
+    """
+
+    def __init__(
+        self,
+        max_age_frames: float = 2688,
+        structure_max_age_frames: float = math.inf,
+        max_extrapolation_frames: int = 45,
+        capacity: int = 128,
+    ):
+        """
+        :param max_age_frames: default is two minutes
+        :param structure_max_age_frames: structures don't move, so they are kept until they are seen dying by default
+        :param max_extrapolation_frames: estimated positions move along the last velocity for at most this many game loops, default is two seconds
+        :param capacity: initial size of the arrays, they grow when needed
+        """
+        self.max_age_frames = max_age_frames
+        self.structure_max_age_frames = structure_max_age_frames
+        self.max_extrapolation_frames = max_extrapolation_frames
+        self.game_loop: int = 0
+        self._size: int = 0
+        self._tag_to_row: Dict[int, int] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        size = self._size
+        self._tags = self._grow(getattr(self, "_tags", None), (capacity, ), np.uint64, size)
+        self._types = self._grow(getattr(self, "_types", None), (capacity, ), np.int32, size)
+        self._flags = self._grow(getattr(self, "_flags", None), (capacity, ), np.uint8, size)
+        self._last_seen = self._grow(getattr(self, "_last_seen", None), (capacity, ), np.int64, size)
+        self._positions = self._grow(getattr(self, "_positions", None), (capacity, 2), np.float64, size)
+        self._velocities = self._grow(getattr(self, "_velocities", None), (capacity, 2), np.float64, size)
+        # Health and shield
+        self._vitals = self._grow(getattr(self, "_vitals", None), (capacity, 2), np.float64, size)
+
+    @staticmethod
+    def _grow(old: Optional[np.ndarray], shape, dtype, size: int) -> np.ndarray:
+        new = np.zeros(shape, dtype=dtype)
+        if old is not None:
+            new[:size] = old[:size]
+        return new
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, tag: int) -> bool:
+        return tag in self._tag_to_row
+
+    def __iter__(self) -> Iterator[RememberedUnit]:
+        return iter(self._rows_to_units(np.arange(self._size)))
+
+    @property
+    def tags(self) -> Set[int]:
+        """ Tags of all remembered units. """
+        return set(self._tag_to_row)
+
+    def update(self, units: Iterable[Unit], game_loop: int):
+        """Stores the visible units of this frame and forgets units that are too old.
+        Snapshots (structures in the fog of war) are only stored if the unit is not known yet, because their values are outdated.
+        The type and flags of visible units are updated every time, so morphs, lift offs and siege modes are picked up.
+        A unit that was only seen as snapshot does not count as visible.
+
+        :param units:
+        :param game_loop:
+        """
+        tag_to_row = self._tag_to_row
+        rows: List[int] = []
+        values: List[Tuple[float, float, float, float]] = []
+        types: List[int] = []
+        flags: List[int] = []
+        new_rows: List[int] = []
+        for unit in units:
+            row = tag_to_row.get(unit.tag)
+            is_visible = unit.is_visible
+            if row is None:
+                row = self._add(unit)
+                new_rows.append(row)
+            elif not is_visible:
+                continue
+            rows.append(row)
+            proto = unit._proto
+            values.append((proto.pos.x, proto.pos.y, proto.health, proto.shield))
+            types.append(proto.unit_type)
+            flags.append(
+                (_STRUCTURE if unit.is_structure else 0) | (_FLYING if unit.is_flying else 0) |
+                (_VISIBLE if is_visible else 0)
+            )
+        if rows:
+            rows_array = np.array(rows)
+            values_array = np.array(values)
+            positions = values_array[:, :2]
+            frames = game_loop - self._last_seen[rows_array]
+            # Only units that were seen a moment ago give a usable velocity
+            moving = (0 < frames) & (frames <= self.max_extrapolation_frames)
+            moving[np.isin(rows_array, new_rows)] = False
+            self._velocities[rows_array] = np.where(
+                moving[:, None], (positions - self._positions[rows_array]) / np.maximum(frames, 1)[:, None], 0
+            )
+            self._positions[rows_array] = positions
+            self._vitals[rows_array] = values_array[:, 2:]
+            self._types[rows_array] = types
+            self._flags[rows_array] = flags
+            self._last_seen[rows_array] = game_loop
+        self.game_loop = game_loop
+        self.evict(game_loop)
+
+    def _add(self, unit: Unit) -> int:
+        row = self._size
+        if row == len(self._tags):
+            self._allocate(2 * row)
+        self._size += 1
+        self._tag_to_row[unit.tag] = row
+        self._tags[row] = unit.tag
+        return row
+
+    def remove(self, tags: Iterable[int]):
+        """Forgets the units with these tags, e.g. the dead units of this frame.
+
+        :param tags:
+        """
+        tag_to_row = self._tag_to_row
+        for tag in tags:
+            row = tag_to_row.pop(tag, None)
+            if row is None:
+                continue
+            # Move the last row into the gap to keep the arrays compact
+            last = self._size - 1
+            if row != last:
+                for array in (self._tags, self._types, self._flags, self._last_seen, self._positions, self._velocities, self._vitals):
+                    array[row] = array[last]
+                tag_to_row[int(self._tags[row])] = row
+            self._size = last
+
+    def evict(self, game_loop: int):
+        """Forgets the units that were not seen for longer than their maximum age.
+
+        :param game_loop:
+        """
+        size = self._size
+        if not size:
+            return
+        ages = game_loop - self._last_seen[:size]
+        max_ages = np.where(self._flags[:size] & _STRUCTURE, self.structure_max_age_frames, self.max_age_frames)
+        expired = np.flatnonzero(ages > max_ages)
+        if expired.size:
+            self.remove(self._tags[expired].tolist())
+
+    def clear(self):
+        self._tag_to_row.clear()
+        self._size = 0
+
+    def age(self, tag: int) -> Optional[int]:
+        """Returns the amount of game loops since the unit was last seen, or None if it is not remembered.
+
+        :param tag:
+        """
+        row = self._tag_to_row.get(tag)
+        if row is None:
+            return None
+        return self.game_loop - int(self._last_seen[row])
+
+    def get(self, tag: int) -> Optional[RememberedUnit]:
+        """Returns what is known about the unit with this tag, or None.
+
+        :param tag:
+        """
+        row = self._tag_to_row.get(tag)
+        if row is None:
+            return None
+        return self._rows_to_units(np.array([row]))[0]
+
+    def estimated_positions(self) -> np.ndarray:
+        """ Returns the estimated positions of all remembered units as (n, 2) array, in the same order as iterating over the memory. """
+        size = self._size
+        ages = np.minimum(self.game_loop - self._last_seen[:size], self.max_extrapolation_frames)
+        return self._positions[:size] + self._velocities[:size] * ages[:, None]
+
+    def _selected_rows(self, max_age: Optional[float], not_visible: bool) -> np.ndarray:
+        size = self._size
+        mask = np.ones(size, dtype=bool)
+        if max_age is not None:
+            mask &= self.game_loop - self._last_seen[:size] <= max_age
+        if not_visible:
+            mask &= (self._last_seen[:size] < self.game_loop) | (self._flags[:size] & _VISIBLE == 0)
+        return mask
+
+    def closer_than(
+        self,
+        distance: float,
+        position: Union[Unit, Point2],
+        estimated: bool = True,
+        max_age: Optional[float] = None,
+        not_visible: bool = False,
+    ) -> List[RememberedUnit]:
+        """Returns the remembered units within 'distance' of 'position', closest first.
+
+        :param distance:
+        :param position:
+        :param estimated: use the estimated positions instead of the last seen positions
+        :param max_age: only units that were seen within this many game loops
+        :param not_visible: only units that are not visible this frame
+        """
+        if isinstance(position, Unit):
+            position = position.position
+        points = self.estimated_positions() if estimated else self._positions[:self._size]
+        distances_squared = ((points - np.array(position, dtype=np.float64))**2).sum(axis=1)
+        mask = self._selected_rows(max_age, not_visible) & (distances_squared < distance**2)
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(distances_squared[rows], kind="stable")]
+        return self._rows_to_units(rows)
+
+    def of_type(
+        self,
+        other: Union[UnitTypeId, Iterable[UnitTypeId]],
+        max_age: Optional[float] = None,
+        not_visible: bool = False,
+    ) -> List[RememberedUnit]:
+        """Returns the remembered units of the given type(s).
+
+        :param other:
+        :param max_age: only units that were seen within this many game loops
+        :param not_visible: only units that are not visible this frame
+        """
+        if isinstance(other, UnitTypeId):
+            other = (other, )
+        type_values = np.fromiter((unit_type.value for unit_type in other), dtype=np.int32)
+        mask = self._selected_rows(max_age, not_visible) & np.isin(self._types[:self._size], type_values)
+        return self._rows_to_units(np.flatnonzero(mask))
+
+    def not_visible(self, max_age: Optional[float] = None) -> List[RememberedUnit]:
+        """Returns the remembered units that are not visible this frame.
+
+        :param max_age: only units that were seen within this many game loops
+        """
+        return self._rows_to_units(np.flatnonzero(self._selected_rows(max_age, True)))
+
+    def _rows_to_units(self, rows: np.ndarray) -> List[RememberedUnit]:
+        if not rows.size:
+            return []
+        ages = np.minimum(self.game_loop - self._last_seen[rows], self.max_extrapolation_frames)
+        estimated = self._positions[rows] + self._velocities[rows] * ages[:, None]
+        return [
+            RememberedUnit(
+                tag,
+                UnitTypeId(type_value),
+                Point2(position),
+                Point2(estimated_position),
+                health,
+                shield,
+                last_seen,
+                bool(flags & _STRUCTURE),
+                bool(flags & _FLYING),
+            ) for tag, type_value, position, estimated_position, (health, shield), last_seen, flags in zip(
+                self._tags[rows].tolist(),
+                self._types[rows].tolist(),
+                map(tuple, self._positions[rows].tolist()),
+                map(tuple, estimated.tolist()),
+                self._vitals[rows].tolist(),
+                self._last_seen[rows].tolist(),
+                self._flags[rows].tolist(),
+            )
+        ]
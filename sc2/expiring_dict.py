@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from collections import OrderedDict
+import math
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from contextlib import nullcontext
 from threading import RLock
-from typing import TYPE_CHECKING, Any, Iterable, Union
+from typing import TYPE_CHECKING, Any, Deque, Dict, Hashable, Iterable, Iterator, List, Tuple, Union
 
 if TYPE_CHECKING:
     from sc2.bot_ai import BotAI
@@ -156,3 +159,157 @@ class ExpiringDict(OrderedDict):
             for value in OrderedDict.values(self):
                 if self.frame - value[1] < self.max_age:
                     yield value[0]
+
+
+class FrameExpiringDict(MutableMapping):
+    """
+    Faster alternative to 'ExpiringDict' for bots that run on a single asyncio loop.
+
+    Values are valid for 'max_age_frames' game loops after they were set, like in 'ExpiringDict'.
+    Keys are remembered in one bucket per game loop they were set in, the buckets are in order of the game loop.
+    Expired buckets are removed from the front at the first access in a new game loop (or by calling 'expire'),
+    so reads, 'len' and iteration do not need to check the age of every item.
+    No lock is used unless 'thread_safe=True' is given.
+
+    Example usages::
+
+        async def on_start(self):
+            # Remember the target of each unit for 5 seconds
+            self.unit_targets = FrameExpiringDict(self, max_age_frames=112)
+
+        async def on_step(self, iteration: int):
+            for marine in self.units(UnitTypeId.MARINE):
+                if marine.tag not in self.unit_targets:
+                    self.unit_targets[marine.tag] = self.enemy_units.closest_to(marine).tag
+    """
+
+    def __init__(self, bot: BotAI, max_age_frames: Union[int, float] = 1, thread_safe: bool = False):
+        """
+        :param bot:
+        :param max_age_frames: values are returned if they were set less than this many game loops ago, math.inf never expires values
+        :param thread_safe: use a lock for each access
+        """
+        assert max_age_frames >= 1, f"max_age_frames has to be at least 1, but was {max_age_frames}"
+        assert bot
+        self.bot: BotAI = bot
+        self.max_age: Union[int, float] = max_age_frames
+        # key -> (value, game loop when it was set)
+        self._data: Dict[Hashable, Tuple[Any, int]] = {}
+        # (game loop, keys set in that game loop), oldest first
+        self._buckets: Deque[Tuple[int, List[Hashable]]] = deque()
+        self._expired_frame: int = -1
+        self._thread_safe: bool = thread_safe
+        self.lock: Union[RLock, nullcontext] = RLock() if thread_safe else nullcontext()
+
+    @property
+    def frame(self) -> int:
+        return self.bot.state.game_loop
+
+    def expire(self):
+        """ Removes all expired items, only needs to look at the buckets of expired game loops. Called automatically once per game loop. """
+        frame = self.frame
+        with self.lock:
+            self._expired_frame = frame
+            buckets = self._buckets
+            data = self._data
+            while buckets and frame - buckets[0][0] >= self.max_age:
+                bucket_frame, keys = buckets.popleft()
+                for key in keys:
+                    item = data.get(key)
+                    # Skip keys that were set again in a later game loop or deleted
+                    if item is not None and item[1] == bucket_frame:
+                        del data[key]
+
+    def _data_of_frame(self) -> Dict[Hashable, Tuple[Any, int]]:
+        if self._expired_frame != self.frame:
+            self.expire()
+        return self._data
+
+    # The most used functions below skip the lock and the function call of _data_of_frame if not thread safe
+
+    def __contains__(self, key) -> bool:
+        """ Return True if dict has key, else False, e.g. 'key in dict' """
+        if self._thread_safe:
+            with self.lock:
+                return key in self._data_of_frame()
+        if self._expired_frame != self.bot.state.game_loop:
+            self.expire()
+        return key in self._data
+
+    def __getitem__(self, key) -> Any:
+        """ Return the item of the dict using d[key] """
+        if self._thread_safe:
+            with self.lock:
+                return self._data_of_frame()[key][0]
+        if self._expired_frame != self.bot.state.game_loop:
+            self.expire()
+        return self._data[key][0]
+
+    def __setitem__(self, key, value):
+        """ Set d[key] = value """
+        if self._thread_safe:
+            with self.lock:
+                self._set(key, value)
+        else:
+            self._set(key, value)
+
+    def _set(self, key, value):
+        frame = self.bot.state.game_loop
+        if self._expired_frame != frame:
+            self.expire()
+        self._data[key] = (value, frame)
+        if self.max_age == math.inf:
+            # Values never expire, no need to remember when they were set
+            return
+        buckets = self._buckets
+        if buckets and buckets[-1][0] == frame:
+            buckets[-1][1].append(key)
+        else:
+            buckets.append((frame, [key]))
+
+    def __delitem__(self, key):
+        with self.lock:
+            del self._data_of_frame()[key]
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._data_of_frame())
+
+    def __iter__(self) -> Iterator:
+        """ Iterates over a copy of the keys, so items can be deleted while iterating """
+        with self.lock:
+            return iter(list(self._data_of_frame()))
+
+    def __repr__(self) -> str:
+        with self.lock:
+            return f"FrameExpiringDict({', '.join(f'{key!r}: {item!r}' for key, item in self._data_of_frame().items())})"
+
+    def get(self, key, default=None, with_age: bool = False) -> Any:
+        """ Return the value for key if key is in dict, else default. With 'with_age', returns a tuple of value and the game loop it was set in """
+        with self.lock:
+            item = self._data_of_frame().get(key)
+        if item is None:
+            return (default, self.frame) if with_age else default
+        return item if with_age else item[0]
+
+    def age(self, key) -> int:
+        """ Returns how many game loops ago the value of key was set. """
+        with self.lock:
+            return self.frame - self._data_of_frame()[key][1]
+
+    def clear(self):
+        with self.lock:
+            self._data.clear()
+            self._buckets.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        with self.lock:
+            return [(key, item[0]) for key, item in self._data_of_frame().items()]
+
+    def keys(self) -> List[Hashable]:
+        with self.lock:
+            return list(self._data_of_frame())
+
+    def values(self) -> List[Any]:
+        with self.lock:
+            return [item[0] for item in self._data_of_frame().values()]
@@ -4,7 +4,6 @@ from __future__ import annotations
 from bisect import bisect_left
 from contextlib import suppress
 from dataclasses import dataclass
-from functools import lru_cache
 from typing import Dict, List, Optional, Union
 
 from sc2.data import Attribute, Race
@@ -26,54 +25,89 @@ class GameData:
         """
         :param data:
         """
-        ids = set(a.value for a in AbilityId if a.value != 0)
+        ids = set(AbilityData.ability_ids)
         self.abilities: Dict[int, AbilityData] = {
             a.ability_id: AbilityData(self, a)
             for a in data.abilities if a.ability_id in ids
         }
         self.units: Dict[int, UnitTypeData] = {u.unit_id: UnitTypeData(self, u) for u in data.units if u.available}
         self.upgrades: Dict[int, UpgradeData] = {u.upgrade_id: UpgradeData(self, u) for u in data.upgrades}
-        # Cached UnitTypeIds so that conversion does not take long. This needs to be moved elsewhere if a new GameData object is created multiple times per game
-
-    @lru_cache(maxsize=256)
-    def calculate_ability_cost(self, ability: Union[AbilityData, AbilityId, UnitCommand]) -> Cost:
-        if isinstance(ability, AbilityId):
-            ability = self.abilities[ability.value]
-        elif isinstance(ability, UnitCommand):
-            ability = self.abilities[ability.ability.value]
-
-        assert isinstance(ability, AbilityData), f"Ability is not of type 'AbilityData', but was {type(ability)}"
-
+        # Cost of each ability by its exact id, see calculate_ability_cost
+        self._ability_costs: Dict[int, Cost] = {}
+        self._build_ability_costs()
+
+    def _build_ability_costs(self):
+        """ Fills the table of calculate_ability_cost with the cost of every ability. """
+        # The first unit that is created by an ability, and the first upgrade that is researched by it
+        self._ability_creates_unit: Dict[int, UnitTypeData] = {}
         for unit in self.units.values():
-            if unit.creation_ability is None:
+            creation_ability = unit.creation_ability
+            if creation_ability is None:
                 continue
-
-            if not AbilityData.id_exists(unit.creation_ability.id.value):
+            if not AbilityData.id_exists(creation_ability.id.value):
                 continue
-
-            if unit.creation_ability.is_free_morph:
+            if creation_ability.is_free_morph:
                 continue
-
-            if unit.creation_ability == ability:
-                if unit.id == UnitTypeId.ZERGLING:
-                    # HARD CODED: zerglings are generated in pairs
-                    return Cost(unit.cost.minerals * 2, unit.cost.vespene * 2, unit.cost.time)
-                if unit.id == UnitTypeId.BANELING:
-                    # HARD CODED: banelings don't cost 50/25 as described in the API, but 25/25
-                    return Cost(25, 25, unit.cost.time)
-                # Correction for morphing units, e.g. orbital would return 550/0 instead of actual 150/0
-                morph_cost = unit.morph_cost
-                if morph_cost:  # can be None
-                    return morph_cost
-                # Correction for zerg structures without morph: Extractor would return 75 instead of actual 25
-                return unit.cost_zerg_corrected
-
+            self._ability_creates_unit.setdefault(creation_ability._proto.ability_id, unit)
+        self._ability_researches_upgrade: Dict[int, UpgradeData] = {}
         for upgrade in self.upgrades.values():
-            if upgrade.research_ability == ability:
-                return upgrade.cost
+            research_ability = upgrade.research_ability
+            if research_ability is not None:
+                self._ability_researches_upgrade.setdefault(research_ability._proto.ability_id, upgrade)
+        for ability_id in self.abilities:
+            if ability_id in self._ability_costs:
+                # Morph costs of units depend on the cost of their producer, which may already be in the table
+                continue
+            try:
+                self._ability_costs[ability_id] = self._calculate_ability_cost(ability_id)
+            except KeyError:
+                # The producer of a morph is missing in the game data, calculate_ability_cost raises when it is used
+                continue
+
+    def _calculate_ability_cost(self, ability_id: int) -> Cost:
+        unit = self._ability_creates_unit.get(ability_id)
+        if unit is not None:
+            if unit.id == UnitTypeId.ZERGLING:
+                # HARD CODED: zerglings are generated in pairs
+                return Cost(unit.cost.minerals * 2, unit.cost.vespene * 2, unit.cost.time)
+            if unit.id == UnitTypeId.BANELING:
+                # HARD CODED: banelings don't cost 50/25 as described in the API, but 25/25
+                return Cost(25, 25, unit.cost.time)
+            # Correction for morphing units, e.g. orbital would return 550/0 instead of actual 150/0
+            morph_cost = unit.morph_cost
+            if morph_cost:  # can be None
+                return morph_cost
+            # Correction for zerg structures without morph: Extractor would return 75 instead of actual 25
+            return unit.cost_zerg_corrected
+
+        upgrade = self._ability_researches_upgrade.get(ability_id)
+        if upgrade is not None:
+            return upgrade.cost
 
         return Cost(0, 0)
 
+    def calculate_ability_cost(self, ability: Union[AbilityData, AbilityId, UnitCommand]) -> Cost:
+        """Returns the cost of the unit or upgrade that is created by the ability, with corrections for morphs and zerg structures.
+        The costs of all abilities are calculated once when the game data is created.
+
+        :param ability:
+        """
+        if isinstance(ability, AbilityId):
+            ability_id = ability.value
+        elif isinstance(ability, UnitCommand):
+            ability_id = ability.ability.value
+        else:
+            assert isinstance(ability, AbilityData), f"Ability is not of type 'AbilityData', but was {type(ability)}"
+            ability_id = ability._proto.ability_id
+
+        cost = self._ability_costs.get(ability_id)
+        if cost is None:
+            # Only happens while the table is built, or for abilities that are not in the game data
+            if ability_id not in self.abilities:
+                raise KeyError(ability_id)
+            cost = self._ability_costs[ability_id] = self._calculate_ability_cost(ability_id)
+        return cost
+
 
 class AbilityData:
 
@@ -0,0 +1,85 @@
+"""
+Caches the game data (abilities, units, upgrades, buffs and effects) per SC2 data version.
+
+The game data is the same for all games with the same data version, so it only needs to be requested from SC2 once.
+It is kept in memory for later games in the same process.
+The same GameData instance is returned to every game and bot of the process with that version, so it has to be treated as read-only.
+
+Optionally the response is also written to a file so other processes can skip the request as well.
+Files are only used if the environment variable SC2_GAME_DATA_CACHE is set to the directory of the cache files.
+"""
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+from google.protobuf.message import DecodeError
+from loguru import logger
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.game_data import GameData
+
+CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = "SC2_GAME_DATA_CACHE"
+
+_game_data_by_version: Dict[str, GameData] = {}
+
+
+def cache_key(ping: sc_pb.ResponsePing) -> str:
+    """ Returns the key of the game data of the SC2 version that answered the ping. """
+    return f"{ping.base_build}_{ping.data_version}"
+
+
+def cache_directory() -> Optional[Path]:
+    """ Returns the directory of the cache files, or None if they are disabled because SC2_GAME_DATA_CACHE is not set. """
+    directory = os.environ.get(CACHE_DIRECTORY_ENVIRONMENT_VARIABLE)
+    return Path(directory) if directory else None
+
+
+def _cache_path(key: str) -> Optional[Path]:
+    directory = cache_directory()
+    if directory is None:
+        return None
+    return directory / f"{re.sub(r'[^0-9A-Za-z_.-]', '_', key)}.pb"
+
+
+def load_game_data(key: str) -> Optional[GameData]:
+    """Returns the cached game data for this key from memory or from its file, or None if it was not cached yet.
+    The game data is shared with all other users of the cache, don't modify it.
+
+    :param key: see cache_key
+    """
+    game_data = _game_data_by_version.get(key)
+    if game_data is not None:
+        return game_data
+    path = _cache_path(key)
+    if path is None or not path.is_file():
+        return None
+    try:
+        data = sc_pb.ResponseData.FromString(path.read_bytes())
+    except (OSError, DecodeError) as e:
+        logger.warning(f"Could not read cached game data {path}: {e}")
+        return None
+    game_data = _game_data_by_version[key] = GameData(data)
+    return game_data
+
+
+def store_game_data(key: str, data: sc_pb.ResponseData) -> GameData:
+    """Creates the game data from the response, keeps it in memory and writes the response to the cache file.
+
+    :param key: see cache_key
+    :param data:
+    """
+    game_data = _game_data_by_version[key] = GameData(data)
+    path = _cache_path(key)
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that other processes never read a partially written file
+            temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            temporary_path.write_bytes(data.SerializeToString())
+            os.replace(temporary_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write game data cache {path}: {e}")
+    return game_data
@@ -195,6 +195,9 @@ class ActionError(AbilityLookupTemplateClass):
 
 class GameState:
 
+    # Fields that are decoded from the observation on first access, see decode_lazy_fields
+    LAZY_FIELDS = ("psionic_matrix", "score", "upgrades", "visibility", "creep", "effects")
+
     def __init__(self, response_observation, previous_observation=None):
         """
         :param response_observation:
@@ -210,29 +213,63 @@ class GameState:
         self.player_result = response_observation.player_result
         self.common: Common = Common(self.observation.player_common)
 
-        # Area covered by Pylons and Warpprisms
-        self.psionic_matrix: PsionicMatrix = PsionicMatrix.from_proto(self.observation_raw.player.power_sources)
         # 22.4 per second on faster game speed
         self.game_loop: int = self.observation.game_loop
-
-        # https://github.com/Blizzard/s2client-proto/blob/33f0ecf615aa06ca845ffe4739ef3133f37265a9/s2clientprotocol/score.proto#L31
-        self.score: ScoreDetails = ScoreDetails(self.observation.score)
         self.abilities = self.observation.abilities  # abilities of selected units
-        self.upgrades: Set[UpgradeId] = {UpgradeId(upgrade) for upgrade in self.observation_raw.player.upgrade_ids}
-
-        # self.visibility[point]: 0=Hidden, 1=Fogged, 2=Visible
-        self.visibility: PixelMap = PixelMap(self.observation_raw.map_state.visibility)
-        # self.creep[point]: 0=No creep, 1=creep
-        self.creep: PixelMap = PixelMap(self.observation_raw.map_state.creep, in_bits=True)
-
-        # Effects like ravager bile shot, lurker attack, everything in effect_id.py
-        self.effects: Set[EffectData] = {EffectData(effect) for effect in self.observation_raw.effects}
-        """ Usage:
-        for effect in self.state.effects:
-            if effect.id == EffectId.RAVAGERCORROSIVEBILECP:
-                positions = effect.positions
-                # dodge the ravager biles
+
+        # Reaper grenades, parasitic bomb dummies and force fields are units in the observation, they are added to self.effects by BotAI._prepare_units
+        self._fake_effect_protos: List = []
+
+    def decode_lazy_fields(self):
+        """Decodes all lazily computed fields of this game state at once.
+        Called by BotAI every frame if 'self.game_state_eager_decoding' is set to True, for bots that prefer predictable step timings."""
+        for field in self.LAZY_FIELDS:
+            getattr(self, field)
+
+    @cached_property
+    def psionic_matrix(self) -> PsionicMatrix:
+        """ Area covered by Pylons and Warpprisms """
+        return PsionicMatrix.from_proto(self.observation_raw.player.power_sources)
+
+    @cached_property
+    def score(self) -> ScoreDetails:
+        """ https://github.com/Blizzard/s2client-proto/blob/33f0ecf615aa06ca845ffe4739ef3133f37265a9/s2clientprotocol/score.proto#L31 """
+        return ScoreDetails(self.observation.score)
+
+    @cached_property
+    def upgrades(self) -> Set[UpgradeId]:
+        return {UpgradeId(upgrade) for upgrade in self.observation_raw.player.upgrade_ids}
+
+    @cached_property
+    def visibility(self) -> PixelMap:
+        """ self.visibility[point]: 0=Hidden, 1=Fogged, 2=Visible """
+        return PixelMap(self.observation_raw.map_state.visibility)
+
+    @cached_property
+    def creep(self) -> PixelMap:
+        """ self.creep[point]: 0=No creep, 1=creep """
+        return PixelMap(self.observation_raw.map_state.creep, in_bits=True, packed=True)
+
+    @cached_property
+    def effects(self) -> Set[EffectData]:
+        """Effects like ravager bile shot, lurker attack, everything in effect_id.py
+
+        Usage::
+
+            for effect in self.state.effects:
+                if effect.id == EffectId.RAVAGERCORROSIVEBILECP:
+                    positions = effect.positions
+                    # dodge the ravager biles
         """
+        effects = {EffectData(effect) for effect in self.observation_raw.effects}
+        effects.update(EffectData(unit, fake=True) for unit in self._fake_effect_protos)
+        return effects
+
+    def _add_fake_effect(self, proto):
+        """ Registers a unit that is represented as effect, see FakeEffectID in constants.py """
+        self._fake_effect_protos.append(proto)
+        if "effects" in self.__dict__:
+            self.effects.add(EffectData(proto, fake=True))
 
     @cached_property
     def dead_units(self) -> Set[int]:
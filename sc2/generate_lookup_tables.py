@@ -0,0 +1,105 @@
+"""
+Generates sc2/dicts/lookup_tables.py from the dicts in sc2/dicts.
+
+The generated tables are keyed by the integer values of the ids and store sets as bitmasks in python integers,
+so a membership test is a dict lookup and a bit operation instead of hashing enum members in nested dicts.
+Run this after the ids or the dicts were updated:
+
+    python -m sc2.generate_lookup_tables
+"""
+from pathlib import Path
+from typing import Dict, Iterable
+
+from sc2.dicts.unit_research_abilities import RESEARCH_INFO
+from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+from sc2.dicts.unit_trained_from import UNIT_TRAINED_FROM
+from sc2.dicts.upgrade_researched_from import UPGRADE_RESEARCHED_FROM
+from sc2.ids.unit_typeid import UnitTypeId
+
+HEADER = f'# THIS FILE WAS AUTOMATICALLY GENERATED BY "{Path(__file__).name}" DO NOT CHANGE MANUALLY!\n# ANY CHANGE WILL BE OVERWRITTEN\n'
+
+# Upgrades of these structures can also be researched in their morphs
+EQUIVALENT_RESEARCH_STRUCTURES = {
+    UnitTypeId.SPIRE: {UnitTypeId.SPIRE, UnitTypeId.GREATERSPIRE},
+    UnitTypeId.GREATERSPIRE: {UnitTypeId.SPIRE, UnitTypeId.GREATERSPIRE},
+    UnitTypeId.HATCHERY: {UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE},
+    UnitTypeId.LAIR: {UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE},
+    UnitTypeId.HIVE: {UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE},
+}
+
+
+def bitmask(indices: Iterable[int]) -> int:
+    mask = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+def format_table(name: str, annotation: str, comment: str, table: Dict[int, int], hex_values: bool) -> str:
+    lines = [f"# {comment}", f"{name}: {annotation} = {{"]
+    for key, value in sorted(table.items()):
+        lines.append(f"    {key}: {hex(value) if hex_values else value},")
+    lines.append("}\n")
+    return "\n".join(lines)
+
+
+def format_mask(name: str, comment: str, mask: int) -> str:
+    return f"# {comment}\n{name}: int = {hex(mask)}\n"
+
+
+def generate_lookup_tables() -> str:
+    unit_trained_from_bits = {
+        unit_type.value: bitmask(producer.value for producer in producers)
+        for unit_type, producers in UNIT_TRAINED_FROM.items()
+    }
+    requires_techlab_bits = bitmask(
+        unit_type.value for train_info in TRAIN_INFO.values() for unit_type, info in train_info.items()
+        if info.get("requires_techlab", False)
+    )
+    upgrade_researched_from_bits = {
+        upgrade.value: bitmask(
+            structure.value for structure in EQUIVALENT_RESEARCH_STRUCTURES.get(structure_type, {structure_type})
+        )
+        for upgrade, structure_type in UPGRADE_RESEARCHED_FROM.items()
+    }
+    upgrade_required_building = {
+        upgrade.value: RESEARCH_INFO[structure_type][upgrade]["required_building"].value
+        for upgrade, structure_type in UPGRADE_RESEARCHED_FROM.items()
+        if "required_building" in RESEARCH_INFO[structure_type][upgrade]
+    }
+
+    tables = [
+        format_table(
+            "UNIT_TRAINED_FROM_BITS",
+            "Dict[int, int]",
+            "UnitTypeId value -> bitmask of the UnitTypeId values that can train, build or morph into it",
+            unit_trained_from_bits,
+            True,
+        ),
+        format_mask(
+            "UNIT_REQUIRES_TECHLAB_BITS",
+            "Bitmask of the UnitTypeId values that need a techlab in the structure that trains them",
+            requires_techlab_bits,
+        ),
+        format_table(
+            "UPGRADE_RESEARCHED_FROM_BITS",
+            "Dict[int, int]",
+            "UpgradeId value -> bitmask of the UnitTypeId values that can research it, including morphs of the structure",
+            upgrade_researched_from_bits,
+            True,
+        ),
+        format_table(
+            "UPGRADE_REQUIRED_BUILDING",
+            "Dict[int, int]",
+            "UpgradeId value -> UnitTypeId value of the structure that is required to research it",
+            upgrade_required_building,
+            False,
+        ),
+    ]
+    return "\n".join([HEADER, "from typing import Dict\n", *tables])
+
+
+if __name__ == "__main__":
+    path = Path(__file__).parent / "dicts" / "lookup_tables.py"
+    path.write_text(generate_lookup_tables())
+    print(f"Wrote {path}")
@@ -20,7 +20,7 @@ from loguru import logger
 from s2clientprotocol import sc2api_pb2 as sc_pb
 
 from sc2.bot_ai import BotAI
-from sc2.client import Client
+from sc2.client import Client, RecordedClient
 from sc2.controller import Controller
 from sc2.data import CreateGameError, Result, Status
 from sc2.game_state import GameState
@@ -28,7 +28,7 @@ from sc2.maps import Map
 from sc2.player import AbstractPlayer, Bot, BotProcess, Human
 from sc2.portconfig import Portconfig
 from sc2.protocol import ConnectionAlreadyClosed, ProtocolError
-from sc2.proxy import Proxy
+from sc2.proxy import Proxy, StepLatency
 from sc2.sc2process import SC2Process, kill_switch
 
 # Set the global logging level
@@ -44,6 +44,8 @@ class GameMatch:
         second sc2_config will be ignored if only one sc2_instance is spawned
         e.g. sc2_args=[{"fullscreen": True}, {}]: only player 1's sc2instance will be fullscreen
     :param game_time_limit: The time (in seconds) until a match is artificially declared a Tie
+    :param step_time_limit: Bots that run in their own process lose if they think longer than this many seconds in one step
+    :param total_time_limit: Bots that run in their own process lose if they think longer than this many seconds in total
     """
 
     map_sc2: Map
@@ -53,6 +55,8 @@ class GameMatch:
     disable_fog: bool = None
     sc2_config: List[Dict] = None
     game_time_limit: int = None
+    step_time_limit: float = None
+    total_time_limit: float = None
 
     def __post_init__(self):
         # avoid players sharing names
@@ -90,6 +94,22 @@ class GameMatch:
         return f"Map: {self.map_sc2.name}, {p1} vs {p2}, realtime={self.realtime}, seed={self.random_seed}"
 
 
+class MatchResult(dict):
+    """
+    The result of each player of a match, returned by run_match.
+    'latency' contains the step latencies of the players that ran in their own process (BotProcess), measured by their proxy.
+
+    Example::
+
+        for player, latency in result.latency.items():
+            print(player.name, result[player], latency.bot.mean, latency.bot.percentile(0.99), latency.step_timeouts)
+    """
+
+    def __init__(self, results: Dict[AbstractPlayer, Result], latency: Dict[AbstractPlayer, StepLatency]):
+        super().__init__(results)
+        self.latency = latency
+
+
 async def _play_game_human(client, player_id, realtime, game_time_limit):
     while True:
         state = await client.observation()
@@ -114,9 +134,9 @@ async def _play_game_ai(
         nonlocal gs
         ai._initialize_variables()
 
-        game_data = await client.get_game_data()
-        game_info = await client.get_game_info()
         ping_response = await client.ping()
+        game_data = await client.get_game_data(ping_response.ping)
+        game_info = await client.get_game_info()
 
         # This game_data will become self.game_data in botAI
         ai._prepare_start(
@@ -236,9 +256,9 @@ async def _play_game(
 async def _play_replay(client, ai, realtime=False, player_id=0):
     ai._initialize_variables()
 
-    game_data = await client.get_game_data()
-    game_info = await client.get_game_info()
     ping_response = await client.ping()
+    game_data = await client.get_game_data(ping_response.ping)
+    game_info = await client.get_game_info()
 
     client.game_step = 1
     # This game_data will become self._game_data in botAI
@@ -324,7 +344,14 @@ async def _play_replay(client, ai, realtime=False, player_id=0):
 
 
 async def _setup_host_game(
-    server: Controller, map_settings, players, realtime, random_seed=None, disable_fog=None, save_replay_as=None
+    server: Controller,
+    map_settings,
+    players,
+    realtime,
+    random_seed=None,
+    disable_fog=None,
+    save_replay_as=None,
+    record_observations_as=None,
 ):
     r = await server.create_game(map_settings, players, realtime, random_seed, disable_fog)
     if r.create_game.HasField("error"):
@@ -334,7 +361,7 @@ async def _setup_host_game(
         logger.critical(err)
         raise RuntimeError(err)
 
-    return Client(server._ws, save_replay_as)
+    return Client(server._ws, save_replay_as, record_observations_as)
 
 
 async def _host_game(
@@ -348,6 +375,7 @@ async def _host_game(
     random_seed=None,
     sc2_version=None,
     disable_fog=None,
+    record_observations_as=None,
 ):
 
     assert players, "Can't create a game without players"
@@ -360,7 +388,7 @@ async def _host_game(
         await server.ping()
 
         client = await _setup_host_game(
-            server, map_settings, players, realtime, random_seed, disable_fog, save_replay_as
+            server, map_settings, players, realtime, random_seed, disable_fog, save_replay_as, record_observations_as
         )
         # Bot can decide if it wants to launch with 'raw_affects_selection=True'
         if not isinstance(players[0], Human) and getattr(players[0].ai, "raw_affects_selection", None) is not None:
@@ -477,7 +505,9 @@ def run_game(map_settings, players, **kwargs) -> Union[Result, List[Optional[Res
     Returns a list of two Result enums if the game was "Human vs Bot" or "Bot vs Bot".
     """
     if sum(isinstance(p, (Human, Bot)) for p in players) > 1:
-        host_only_args = ["save_replay_as", "rgb_render_config", "random_seed", "sc2_version", "disable_fog"]
+        host_only_args = [
+            "save_replay_as", "rgb_render_config", "random_seed", "sc2_version", "disable_fog", "record_observations_as"
+        ]
         join_kwargs = {k: v for k, v in kwargs.items() if k not in host_only_args}
 
         portconfig = Portconfig()
@@ -511,6 +541,20 @@ def run_replay(ai, replay_path, realtime=False, observed_id=0):
     return result
 
 
+def run_recording(ai, recording_path: Union[str, Path]) -> Result:
+    """
+    Plays back a file that was written with 'run_game(..., record_observations_as="game.sc2obs")' frame by frame into the bot, without starting SC2.
+    Actions are not executed, the game continues as recorded. The actions the bot would have sent are available afterwards in 'ai.client.recorded_actions'.
+    Returns Result.Undecided when the recording ended before the game was over.
+    """
+    assert os.path.isfile(recording_path), f"Recording does not exist at the given path: {recording_path}"
+    client = RecordedClient(recording_path)
+    result = asyncio.get_event_loop().run_until_complete(
+        _play_game_ai(client, client._player_id, ai, realtime=False, game_time_limit=None)
+    )
+    return result
+
+
 async def play_from_websocket(
     ws_connection: Union[str, ClientWebSocketResponse],
     player: AbstractPlayer,
@@ -519,11 +563,13 @@ async def play_from_websocket(
     save_replay_as=None,
     game_time_limit: int = None,
     should_close=True,
+    record_observations_as=None,
 ):
     """Use this to play when the match is handled externally e.g. for bot ladder games.
     Portconfig MUST be specified if not playing vs Computer.
     :param ws_connection: either a string("ws://{address}:{port}/sc2api") or a ClientWebSocketResponse object
     :param should_close: closes the connection if True. Use False if something else will reuse the connection
+    :param record_observations_as: path of a file to record the observations to, which can be played back with 'run_recording'
 
     e.g. ladder usage: play_from_websocket("ws://127.0.0.1:5162/sc2api", MyBot, False, portconfig=my_PC)
     """
@@ -533,7 +579,7 @@ async def play_from_websocket(
             session = ClientSession()
             ws_connection = await session.ws_connect(ws_connection, timeout=120)
             should_close = True
-        client = Client(ws_connection)
+        client = Client(ws_connection, record_observations_path=record_observations_as)
         result = await _play_game(player, client, realtime, portconfig, game_time_limit=game_time_limit)
         if save_replay_as is not None:
             await client.save_replay(save_replay_as)
@@ -549,7 +595,7 @@ async def play_from_websocket(
     return result
 
 
-async def run_match(controllers: List[Controller], match: GameMatch, close_ws=True):
+async def run_match(controllers: List[Controller], match: GameMatch, close_ws=True) -> MatchResult:
     await _setup_host_game(controllers[0], **match.host_game_kwargs)
 
     # Setup portconfig beforehand, so all players use the same ports
@@ -569,7 +615,15 @@ async def run_match(controllers: List[Controller], match: GameMatch, close_ws=Tr
     for i, player in enumerate(players_that_need_sc2):
         if isinstance(player, BotProcess):
             pport = portpicker.pick_unused_port()
-            p = Proxy(controllers[i], player, pport, match.game_time_limit, match.realtime)
+            p = Proxy(
+                controllers[i],
+                player,
+                pport,
+                match.game_time_limit,
+                match.realtime,
+                step_time_limit=match.step_time_limit,
+                total_time_limit=match.total_time_limit,
+            )
             proxies.append(p)
             coros.append(p.play_with_proxy(startport))
         else:
@@ -592,7 +646,8 @@ async def run_match(controllers: List[Controller], match: GameMatch, close_ws=Tr
         if isinstance(a, Exception):
             logger.error(f"Exception[{a}] thrown by {[p for p in match.players if p.needs_sc2][i]}")
 
-    return process_results(match.players, async_results)
+    latency = {proxy.player: proxy.latency for proxy in proxies}
+    return MatchResult(process_results(match.players, async_results), latency)
 
 
 def process_results(players: List[AbstractPlayer], async_results: List[Result]) -> Dict[AbstractPlayer, Result]:
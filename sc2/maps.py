@@ -1,23 +1,129 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from loguru import logger
 
 from sc2.paths import Paths
 
+# Map folders of this repository, searched after the maps folder of the SC2 installation
+REPOSITORY_MAP_DIRECTORIES: List[Path] = [Path(__file__).parent.parent / "maps"]
+
+
+class MapRegistry:
+    """
+    Index of the map files by name.
+
+    The map directories are scanned once on the first lookup, after that names are resolved with a dict lookup.
+    The directories are only scanned again if a name is not found, e.g. because the map was added after the scan.
+    The bytes of map files (Map.data) are cached and only read again if the modification time or size of the file changed.
+    Creating a game does not use these bytes: create_game only sends the map path and SC2 reads the file itself.
+
+    Example::
+
+        from sc2 import maps
+
+        maps.registry.add_directory("/path/to/more/maps")
+        map_pool = maps.preload(["Simple64", "Simple96"])
+    """
+
+    def __init__(self, directories: Optional[Iterable[Path]] = None):
+        """
+        :param directories: searched 2 folder depths deep in this order, by default the maps folder of SC2 and REPOSITORY_MAP_DIRECTORIES
+        """
+        self._directories: Optional[List[Path]] = None if directories is None else [Path(d) for d in directories]
+        self._paths: Optional[Dict[str, Path]] = None
+        self._maps: Dict[str, Map] = {}
+        # Map file path -> ((modification time, size), bytes)
+        self._data: Dict[Path, Tuple[Tuple[int, int], bytes]] = {}
+
+    @property
+    def directories(self) -> List[Path]:
+        if self._directories is None:
+            self._directories = [Paths.MAPS, *REPOSITORY_MAP_DIRECTORIES]
+        return self._directories
+
+    def add_directory(self, directory: Path):
+        self.directories.append(Path(directory).expanduser())
+        self._paths = None
+
+    def refresh(self):
+        """ Scans the map directories again. """
+        paths: Dict[str, Path] = {}
+        for directory in self.directories:
+            if not directory.is_dir():
+                continue
+            # Iterate through 2 folder depths, the first map with a name is used
+            for map_dir in directory.iterdir():
+                if map_dir.is_dir():
+                    for map_file in map_dir.iterdir():
+                        if Map.is_map_file(map_file):
+                            paths.setdefault(map_file.stem, map_file)
+                elif Map.is_map_file(map_dir):
+                    paths.setdefault(map_dir.stem, map_dir)
+        self._paths = paths
+        self._maps.clear()
+
+    @property
+    def names(self) -> List[str]:
+        """ Names of all maps that were found. """
+        if self._paths is None:
+            self.refresh()
+        return sorted(self._paths)
+
+    def get(self, name: str) -> Map:
+        game_map = self._maps.get(name)
+        if game_map is not None:
+            return game_map
+        if self._paths is None:
+            self.refresh()
+        path = self._paths.get(name)
+        if path is None:
+            self.refresh()
+            path = self._paths.get(name)
+            if path is None:
+                raise KeyError(f"Map '{name}' was not found. Please put the map file in \"/StarCraft II/Maps/\".")
+        game_map = self._maps[name] = Map(path)
+        return game_map
+
+    def read(self, path: Path) -> bytes:
+        """Returns the bytes of the map file, from the cache if the file did not change since it was read.
+
+        :param path:
+        """
+        stat = path.stat()
+        version = stat.st_mtime_ns, stat.st_size
+        cached = self._data.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        data = path.read_bytes()
+        self._data[path] = version, data
+        return data
+
+    def preload(self, names: Iterable[str]) -> List[Map]:
+        """Resolves the names of a map pool and reads the map files into the cache of Map.data.
+
+        :param names:
+        """
+        maps = [self.get(name) for name in names]
+        for game_map in maps:
+            self.read(game_map.path)
+        return maps
+
+    def clear_cache(self):
+        self._data.clear()
+
+
+registry = MapRegistry()
+
 
 def get(name: str) -> Map:
-    # Iterate through 2 folder depths
-    for map_dir in (p for p in Paths.MAPS.iterdir()):
-        if map_dir.is_dir():
-            for map_file in (p for p in map_dir.iterdir()):
-                if Map.matches_target_map_name(map_file, name):
-                    return Map(map_file)
-        elif Map.matches_target_map_name(map_dir, name):
-            return Map(map_dir)
+    return registry.get(name)
+
 
-    raise KeyError(f"Map '{name}' was not found. Please put the map file in \"/StarCraft II/Maps/\".")
+def preload(names: Iterable[str]) -> List[Map]:
+    return registry.preload(names)
 
 
 class Map:
@@ -40,8 +146,7 @@ class Map:
 
     @property
     def data(self):
-        with open(self.path, "rb") as f:
-            return f.read()
+        return registry.read(self.path)
 
     def __repr__(self):
         return f"Map({self.path})"
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import struct
+from collections import defaultdict
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+from loguru import logger
+from s2clientprotocol import raw_pb2 as raw_pb
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.data import ActionResult, Result, Status
+
+# Responses of these requests are written to the recording, everything else is ignored
+RECORDED_RESPONSE_FIELDS = ("data", "game_info", "ping", "observation")
+# Each recorded response is prefixed by its length as 4 byte little endian unsigned int
+LENGTH_PREFIX = struct.Struct("<I")
+
+
+class ObservationRecorder:
+    """
+    Writes the data, game_info, ping and observation responses of a game to a length-prefixed protobuf file.
+    The file can be played back with 'RecordedClient' to feed the game frame by frame into a bot without starting SC2.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file: Optional[BinaryIO] = open(self.path, "wb")
+        self.responses_written: int = 0
+
+    def record(self, response: sc_pb.Response):
+        """ Appends the response to the file if it is a response to a recorded request type. """
+        if self._file is None:
+            return
+        if not any(response.HasField(field) for field in RECORDED_RESPONSE_FIELDS):
+            return
+        data = response.SerializeToString()
+        self._file.write(LENGTH_PREFIX.pack(len(data)))
+        self._file.write(data)
+        self.responses_written += 1
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        logger.info(f"Recorded {self.responses_written} responses to {self.path}")
+
+
+def read_recording(path: Union[str, Path]) -> Iterator[sc_pb.Response]:
+    """ Yields the responses of a file that was written by 'ObservationRecorder'. """
+    with open(path, "rb") as f:
+        while True:
+            prefix = f.read(LENGTH_PREFIX.size)
+            if not prefix:
+                return
+            assert len(prefix) == LENGTH_PREFIX.size, f"Recording {path} is truncated"
+            (length, ) = LENGTH_PREFIX.unpack(prefix)
+            data = f.read(length)
+            assert len(data) == length, f"Recording {path} is truncated"
+            response = sc_pb.Response()
+            response.ParseFromString(data)
+            yield response
+
+
+class RecordingSocket:
+    """
+    Stand-in for the websocket of a Client, answers requests from a recording instead of a running SC2 instance.
+    Data, game_info and ping requests are answered with the last recorded response before the current observation,
+    each observation request advances the recording by one frame.
+    Actions are not sent anywhere but collected in 'self.actions', keyed by the game loop they were issued on.
+    """
+
+    def __init__(self, responses: List[sc_pb.Response]):
+        assert responses, "Recording does not contain any responses"
+        self._responses = responses
+        self._index: int = 0
+        self._last_response: Dict[str, sc_pb.Response] = {}
+        self._pending_response: Optional[sc_pb.Response] = None
+        self._status: int = responses[0].status
+        self.player_id: int = next(
+            (
+                r.observation.observation.player_common.player_id
+                for r in responses if r.HasField("observation") and r.observation.HasField("observation")
+            ),
+            1,
+        )
+        self.game_loop: int = 0
+        self.actions: Dict[int, List[raw_pb.ActionRaw]] = defaultdict(list)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def _next_recorded(self, field: str) -> Optional[sc_pb.Response]:
+        """Finds the next recorded response of type 'field'.
+        Non-observation responses are not searched for past the next observation, so that extra requests of the bot do not skip frames.
+        Only observations advance the recording, so the other responses of a frame can be requested in any order."""
+        index = self._index
+        while index < len(self._responses):
+            response = self._responses[index]
+            if response.HasField(field):
+                if field == "observation":
+                    self._index = index + 1
+                self._last_response[field] = response
+                return response
+            if response.HasField("observation"):
+                break
+            index += 1
+        if field == "observation":
+            self._index = len(self._responses)
+            return None
+        return self._last_response.get(field)
+
+    def _answer(self, request: sc_pb.Request) -> sc_pb.Response:
+        field = request.WhichOneof("request")
+        if field in RECORDED_RESPONSE_FIELDS:
+            response = self._next_recorded(field)
+            if response is not None:
+                self._status = response.status
+                if field == "observation":
+                    self.game_loop = response.observation.observation.game_loop
+                return response
+            if field == "observation":
+                # Recording is over, end the game without a winner
+                logger.info(f"Recording ended at game loop {self.game_loop}")
+                self._status = Status.ended.value
+                return sc_pb.Response(
+                    status=self._status,
+                    observation=sc_pb.ResponseObservation(
+                        player_result=[sc_pb.PlayerResult(player_id=self.player_id, result=Result.Undecided.value)]
+                    ),
+                )
+            return sc_pb.Response(status=self._status, error=[f"No '{field}' response was recorded"])
+        if field == "action":
+            self.actions[self.game_loop].extend(a.action_raw for a in request.action.actions if a.HasField("action_raw"))
+            return sc_pb.Response(
+                status=self._status,
+                action=sc_pb.ResponseAction(result=[ActionResult.Success.value] * len(request.action.actions)),
+            )
+        if field in {"step", "debug", "leave_game", "quit"}:
+            response = sc_pb.Response(status=self._status)
+            getattr(response, field).SetInParent()
+            return response
+        return sc_pb.Response(status=self._status, error=[f"Request '{field}' is not supported by a recording"])
+
+    async def send_bytes(self, data: bytes):
+        request = sc_pb.Request()
+        request.ParseFromString(data)
+        self._pending_response = self._answer(request)
+
+    async def receive_bytes(self) -> bytes:
+        assert self._pending_response is not None, "No request was sent"
+        response, self._pending_response = self._pending_response, None
+        return response.SerializeToString()
+
+    async def close(self):
+        pass
+
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Callable, FrozenSet, List, Set, Tuple, Union
+from typing import Callable, FrozenSet, List, Optional, Set, Tuple, Union
 
 import numpy as np
 
@@ -8,30 +8,59 @@ from sc2.position import Point2
 
 class PixelMap:
 
-    def __init__(self, proto, in_bits: bool = False):
+    def __init__(self, proto, in_bits: bool = False, packed: bool = False):
         """
         :param proto:
         :param in_bits:
+        :param packed: only for in_bits maps, keep the bits packed in the proto buffer and answer queries with bit arithmetic.
+            'data_numpy' is then only unpacked on first access, after which all queries use the unpacked array.
         """
         self._proto = proto
         # Used for copying pixelmaps
         self._in_bits: bool = in_bits
+        self._packed: bool = in_bits and packed
+        self._width: int = self._proto.size.x
+        self._height: int = self._proto.size.y
 
-        assert self.width * self.height == (8 if in_bits else 1) * len(
+        assert self._width * self._height == (8 if in_bits else 1) * len(
             self._proto.data
-        ), f"{self.width * self.height} {(8 if in_bits else 1)*len(self._proto.data)}"
-        buffer_data = np.frombuffer(self._proto.data, dtype=np.uint8)
-        if in_bits:
+        ), f"{self._width * self._height} {(8 if in_bits else 1)*len(self._proto.data)}"
+        # Reading the bytes field once, as the protobuf implementation may create a new bytes object on every access
+        self._data_bytes: bytes = self._proto.data
+        self._buffer: np.ndarray = np.frombuffer(self._data_bytes, dtype=np.uint8)
+        self._data_numpy: Optional[np.ndarray] = None
+        if not self._packed:
+            self._data_numpy = self._unpack()
+
+    def _unpack(self) -> np.ndarray:
+        buffer_data = self._buffer
+        if self._in_bits:
             buffer_data = np.unpackbits(buffer_data)
-        self.data_numpy = buffer_data.reshape(self._proto.size.y, self._proto.size.x)
+        return buffer_data.reshape(self._height, self._width)
+
+    @property
+    def data_numpy(self) -> np.ndarray:
+        """ The map as (height, width) array, indexed by data_numpy[y, x]. Packed maps are unpacked on first access. """
+        if self._data_numpy is None:
+            self._data_numpy = self._unpack()
+        return self._data_numpy
+
+    @data_numpy.setter
+    def data_numpy(self, value: np.ndarray):
+        self._data_numpy = value
+
+    @property
+    def is_packed(self) -> bool:
+        """ True if queries are answered from the packed bits of the proto buffer. """
+        return self._data_numpy is None
 
     @property
     def width(self) -> int:
-        return self._proto.size.x
+        return self._width
 
     @property
     def height(self) -> int:
-        return self._proto.size.y
+        return self._height
 
     @property
     def bits_per_pixel(self) -> int:
@@ -43,9 +72,14 @@ class PixelMap:
 
     def __getitem__(self, pos: Tuple[int, int]) -> int:
         """ Example usage: is_pathable = self._game_info.pathing_grid[Point2((20, 20))] != 0 """
-        assert 0 <= pos[0] < self.width, f"x is {pos[0]}, self.width is {self.width}"
-        assert 0 <= pos[1] < self.height, f"y is {pos[1]}, self.height is {self.height}"
-        return int(self.data_numpy[pos[1], pos[0]])
+        x, y = pos[0], pos[1]
+        assert 0 <= x < self._width, f"x is {x}, self.width is {self._width}"
+        assert 0 <= y < self._height, f"y is {y}, self.height is {self._height}"
+        if self._data_numpy is None:
+            # Bits are packed big endian, see np.packbits
+            index = y * self._width + x
+            return (self._data_bytes[index >> 3] >> (7 - (index & 7))) & 1
+        return int(self._data_numpy[y, x])
 
     def __setitem__(self, pos: Tuple[int, int], value: int):
         """ Example usage: self._game_info.pathing_grid[Point2((20, 20))] = 255 """
@@ -57,6 +91,57 @@ class PixelMap:
         assert isinstance(value, int), f"value is of type {type(value)}, it should be an integer"
         self.data_numpy[pos[1], pos[0]] = value
 
+    def values_at(self, points: np.ndarray, out_of_bounds: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the values at all points in one vectorized lookup.
+        Coordinates are floored to integers like Point2.rounded, so each point is looked up in the tile it is in.
+
+        Example::
+
+            points = np.array([[20, 20], [30.5, 40.5]])
+            pathable = self.game_info.pathing_grid.values_at(points) == 1
+
+        :param points: array of shape (N, 2) with x and y coordinates
+        :param out_of_bounds: value returned for points outside of the map, if None all points have to be inside of the map
+        """
+        points = np.asarray(points)
+        if points.size == 0:
+            return np.zeros(0, dtype=np.uint8)
+        if points.dtype.kind == "f":
+            points = np.floor(points)
+        xs = points[:, 0].astype(np.intp)
+        ys = points[:, 1].astype(np.intp)
+        inside = (0 <= xs) & (xs < self._width) & (0 <= ys) & (ys < self._height)
+        all_inside = inside.all()
+        if not all_inside:
+            assert out_of_bounds is not None, "Points outside of the map were given, use the 'out_of_bounds' parameter"
+            xs = np.where(inside, xs, 0)
+            ys = np.where(inside, ys, 0)
+        if self._data_numpy is None:
+            values = self._packed_values(ys * self._width + xs)
+        else:
+            values = self._data_numpy[ys, xs]
+        if not all_inside:
+            values = np.where(inside, values, out_of_bounds)
+        return values
+
+    def region(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """
+        Returns the rectangle x0 <= x < x1, y0 <= y < y1 as (y1 - y0, x1 - x0) array, indexed by [y, x] like data_numpy.
+        For unpacked maps this is a view into data_numpy without copying, changes to it change the map.
+        For packed maps only the bits inside of the rectangle are decoded.
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self._width, x1), min(self._height, y1)
+        if self._data_numpy is not None:
+            return self._data_numpy[y0:y1, x0:x1]
+        ys, xs = np.mgrid[y0:y1, x0:x1]
+        return self._packed_values(ys * self._width + xs)
+
+    def _packed_values(self, index: np.ndarray) -> np.ndarray:
+        """ Reads the bits at the flat indices 'index' from the packed buffer. """
+        return ((self._buffer[index >> 3] >> (7 - (index & 7))) & 1).astype(np.uint8)
+
     def is_set(self, p: Tuple[int, int]) -> bool:
         return self[p] != 0
 
@@ -64,7 +149,7 @@ class PixelMap:
         return not self.is_set(p)
 
     def copy(self) -> "PixelMap":
-        return PixelMap(self._proto, in_bits=self._in_bits)
+        return PixelMap(self._proto, in_bits=self._in_bits, packed=self._packed)
 
     def flood_fill(self, start_point: Point2, pred: Callable[[int], bool]) -> Set[Point2]:
         nodes: Set[Point2] = set()
@@ -1,5 +1,7 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from sc2.position import Point2
 
@@ -26,7 +28,34 @@ class PowerSource:
 
 @dataclass
 class PsionicMatrix:
+    """
+    Area covered by the power sources (pylons and warp prisms in phasing mode) of the player.
+    'array' contains the sources as array of shape (N, 3) with the x, y and radius of each source for vectorized queries,
+    it is built again when the sources change.
+
+    Example::
+
+        # All cells of the placement grid that are powered and placeable
+        placement_grid = self.game_info.placement_grid
+        powered = self.state.psionic_matrix.grid(placement_grid.width, placement_grid.height)
+        ys, xs = np.nonzero(powered & (placement_grid.data_numpy == 1))
+    """
+
     sources: List[PowerSource]
+    # Values of the sources that 'array' and the grids were computed from
+    _array_values: Optional[List[Tuple[float, float, float]]] = field(default=None, init=False, repr=False, compare=False)
+    _array: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    # Rasterized grids of these sources by (width, height)
+    _grids: Dict[Tuple[int, int], np.ndarray] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def array(self) -> np.ndarray:
+        values = [(source.position.x, source.position.y, source.radius) for source in self.sources]
+        if values != self._array_values:
+            self._array_values = values
+            self._array = np.array(values, dtype=np.float64).reshape((-1, 3))
+            self._grids = {}
+        return self._array
 
     @classmethod
     def from_proto(cls, proto):
@@ -34,3 +63,41 @@ class PsionicMatrix:
 
     def covers(self, position: Point2) -> bool:
         return any(source.covers(position) for source in self.sources)
+
+    def covers_batch(self, points: np.ndarray) -> np.ndarray:
+        """Batch variant of covers, returns a boolean array.
+
+        :param points: array of shape (M, 2) with x and y coordinates
+        """
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 2))
+        array = self.array
+        if not len(array):
+            return np.zeros(len(points), dtype=bool)
+        # (M, N) squared distances from every point to every source
+        distances_squared = (points[:, None, 0] - array[None, :, 0])**2 + (points[:, None, 1] - array[None, :, 1])**2
+        return (distances_squared <= array[None, :, 2]**2).any(axis=1)
+
+    def grid(self, width: int, height: int) -> np.ndarray:
+        """Returns a read-only boolean array of shape (height, width), indexed by [y, x] like PixelMap.data_numpy.
+        A cell is powered if its center (x + 0.5, y + 0.5) is covered.
+        The grid is cached in this matrix and only rasterized again if the power sources changed.
+
+        :param width: e.g. self.game_info.placement_grid.width
+        :param height: e.g. self.game_info.placement_grid.height
+        """
+        array = self.array
+        grid = self._grids.get((width, height))
+        if grid is not None:
+            return grid
+        grid = np.zeros((height, width), dtype=bool)
+        for x, y, radius in array.tolist():
+            x0, x1 = max(0, int(x - radius)), min(width, int(x + radius) + 1)
+            y0, y1 = max(0, int(y - radius)), min(height, int(y + radius) + 1)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            xs = np.arange(x0, x1) + 0.5 - x
+            ys = np.arange(y0, y1) + 0.5 - y
+            grid[y0:y1, x0:x1] |= ys[:, None]**2 + xs[None, :]**2 <= radius**2
+        grid.flags.writeable = False
+        self._grids[width, height] = grid
+        return grid
@@ -31,10 +31,9 @@ class Protocol:
         self._ws: ClientWebSocketResponse = ws
         self._status: Status = None
 
-    async def __request(self, request):
-        logger.debug(f"Sending request: {request !r}")
+    async def __request(self, request_bytes: bytes):
         try:
-            await self._ws.send_bytes(request.SerializeToString())
+            await self._ws.send_bytes(request_bytes)
         except TypeError as exc:
             logger.exception("Cannot send: Connection already closed.")
             raise ConnectionAlreadyClosed("Connection already closed.") from exc
@@ -65,7 +64,16 @@ class Protocol:
     async def _execute(self, **kwargs):
         assert len(kwargs) == 1, "Only one request allowed by the API"
 
-        response = await self.__request(sc_pb.Request(**kwargs))
+        request = sc_pb.Request(**kwargs)
+        logger.debug(f"Sending request: {request !r}")
+        return await self._execute_serialized(request.SerializeToString())
+
+    async def _execute_serialized(self, request_bytes: bytes):
+        """Sends a request that is already serialized, e.g. built from cached message bytes.
+
+        :param request_bytes: a serialized sc_pb.Request
+        """
+        response = await self.__request(request_bytes)
 
         new_status = Status(response.status)
         if new_status != self._status:
@@ -5,8 +5,12 @@ import platform
 import subprocess
 import time
 import traceback
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from aiohttp import WSMsgType, web
+from google.protobuf.message import DecodeError
 from loguru import logger
 from s2clientprotocol import sc2api_pb2 as sc_pb
 
@@ -14,11 +18,151 @@ from sc2.controller import Controller
 from sc2.data import Result, Status
 from sc2.player import BotProcess
 
+# Protobuf wire types
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH_DELIMITED = 2
+_FIXED32 = 5
+
+# Field numbers of the fields that the proxy needs, see sc2api.proto
+_REQUEST_JOIN_GAME = sc_pb.Request.JOIN_GAME_FIELD_NUMBER
+_REQUEST_LEAVE_GAME = sc_pb.Request.LEAVE_GAME_FIELD_NUMBER
+_REQUEST_QUIT = sc_pb.Request.QUIT_FIELD_NUMBER
+_REQUEST_OBSERVATION = sc_pb.Request.OBSERVATION_FIELD_NUMBER
+_REQUEST_STEP = sc_pb.Request.STEP_FIELD_NUMBER
+_RESPONSE_JOIN_GAME = sc_pb.Response.JOIN_GAME_FIELD_NUMBER
+_RESPONSE_OBSERVATION = sc_pb.Response.OBSERVATION_FIELD_NUMBER
+_RESPONSE_STATUS = sc_pb.Response.STATUS_FIELD_NUMBER
+_OBSERVATION_OBSERVATION = sc_pb.ResponseObservation.OBSERVATION_FIELD_NUMBER
+_OBSERVATION_PLAYER_RESULT = sc_pb.ResponseObservation.PLAYER_RESULT_FIELD_NUMBER
+_OBSERVATION_GAME_LOOP = sc_pb.Observation.GAME_LOOP_FIELD_NUMBER
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """ Returns the varint that starts at 'position' and the position after it. """
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def _fields(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int, int, int]]:
+    """Yields (field number, wire type, start, end) of the fields of the serialized message in data[start:end] without decoding them.
+    For length delimited fields (messages, strings, packed repeated fields), start and end are the bounds of the content.
+
+    :param data:
+    :param start:
+    :param end:
+    """
+    if end is None:
+        end = len(data)
+    position = start
+    try:
+        while position < end:
+            key, position = _read_varint(data, position)
+            field_number, wire_type = key >> 3, key & 7
+            if wire_type == _VARINT:
+                field_start = position
+                _, position = _read_varint(data, position)
+            elif wire_type == _LENGTH_DELIMITED:
+                length, field_start = _read_varint(data, position)
+                position = field_start + length
+            elif wire_type == _FIXED64:
+                field_start = position
+                position += 8
+            elif wire_type == _FIXED32:
+                field_start = position
+                position += 4
+            else:
+                raise DecodeError(f"Unsupported wire type {wire_type} of field {field_number}")
+            if position > end:
+                raise DecodeError("Truncated message")
+            yield field_number, wire_type, field_start, position
+    except IndexError as e:
+        raise DecodeError("Truncated message") from e
+
+
+# Upper bounds in seconds of the buckets of LatencyHistogram, the last bucket has no upper bound
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10)
+
+
+@dataclass
+class LatencyHistogram:
+    """ Counts durations (in seconds) in the buckets of LATENCY_BUCKETS. """
+
+    counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0
+    max: float = 0
+
+    def add(self, duration: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, fraction: float) -> float:
+        """Returns the upper bound of the bucket that contains the given fraction of the durations, or the maximum duration if that is smaller.
+
+        :param fraction: e.g. 0.99 for the 99th percentile
+        """
+        remaining = fraction * self.count
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            remaining -= count
+            if remaining <= 0:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+            "buckets": dict(zip([*LATENCY_BUCKETS, "inf"], self.counts)),
+        }
+
+
+@dataclass
+class StepLatency:
+    """
+    Latencies of one bot in one game, measured by its proxy.
+
+    'bot' contains the think time of each step: the time from sending an observation to the bot until the bot requests the next step
+    (or the next observation in realtime), without the time SC2 needed to answer the requests the bot sent in between, e.g. queries and actions.
+    The first step is not measured because the bot runs its on_start after the first observation.
+    'sc2' contains the time SC2 needed to answer each request of the bot.
+    'step_timeouts' is the amount of steps that took longer than 'step_time_limit'.
+    """
+
+    bot: LatencyHistogram = field(default_factory=LatencyHistogram)
+    sc2: LatencyHistogram = field(default_factory=LatencyHistogram)
+    step_timeouts: int = 0
+
+    def to_dict(self) -> Dict:
+        return {"bot": self.bot.to_dict(), "sc2": self.sc2.to_dict(), "step_timeouts": self.step_timeouts}
+
 
 class Proxy:
     """
     Class for handling communication between sc2 and an external bot.
     This "middleman" is needed for enforcing time limits, collecting results, and closing things properly.
+
+    Requests and responses are forwarded as the original bytes.
+    Only the few fields the proxy needs (status, join_game, player_result, game_loop, leave_game and quit) are read from the serialized messages,
+    the rest of a message, e.g. the units of an observation, is skipped without being decoded.
     """
 
     def __init__(
@@ -28,7 +172,18 @@ class Proxy:
         proxyport: int,
         game_time_limit: int = None,
         realtime: bool = False,
+        step_time_limit: float = None,
+        total_time_limit: float = None,
     ):
+        """
+        :param controller:
+        :param player:
+        :param proxyport:
+        :param game_time_limit: in-game seconds until the game is declared a tie
+        :param realtime:
+        :param step_time_limit: the bot loses if its think time of a step is longer than this many seconds
+        :param total_time_limit: the bot loses if its think time of all steps is longer than this many seconds
+        """
         self.controller = controller
         self.player = player
         self.port = proxyport
@@ -42,20 +197,63 @@ class Proxy:
         self.player_id: int = None
         self.done = False
 
+        self.step_time_limit = step_time_limit
+        self.total_time_limit = total_time_limit
+        self.latency = StepLatency()
+        # perf_counter() when the last observation was sent to the bot, None while the bot is not thinking about a step
+        self._observation_sent_at: Optional[float] = None
+        # Time SC2 needed for the requests of the bot since the last observation
+        self._step_sc2_time: float = 0
+        # If the last response was an observation
+        self._observation_received = False
+        # The time after the first observation includes on_start and is not measured
+        self._first_step_done = False
+
+    def end_step(self) -> Optional[str]:
+        """Records the think time of the bot for the current step.
+        Returns the reason if the bot ran out of time.
+        """
+        step_time = time.perf_counter() - self._observation_sent_at - self._step_sc2_time
+        self._observation_sent_at = None
+        self.latency.bot.add(step_time)
+        if self.step_time_limit is not None and step_time > self.step_time_limit:
+            self.latency.step_timeouts += 1
+            return f"step took {step_time:.3f}s, limit is {self.step_time_limit}s"
+        if self.total_time_limit is not None and self.latency.bot.total > self.total_time_limit:
+            return f"total time is {self.latency.bot.total:.3f}s, limit is {self.total_time_limit}s"
+        return None
+
     async def parse_request(self, msg):
-        request = sc_pb.Request()
-        request.ParseFromString(msg.data)
-        if request.HasField("quit"):
-            request = sc_pb.Request(leave_game=sc_pb.RequestLeaveGame())
-        if request.HasField("leave_game"):
+        request_bytes: bytes = msg.data
+        field_numbers = {field_number for field_number, _, _, _ in _fields(request_bytes)}
+        if self._observation_sent_at is not None and (
+            _REQUEST_STEP in field_numbers or _REQUEST_OBSERVATION in field_numbers
+        ):
+            if self._first_step_done:
+                reason = self.end_step()
+            else:
+                self._observation_sent_at = None
+                self._first_step_done = True
+                reason = None
+            if reason is not None and self.result is None and self.controller._status == Status.in_game:
+                logger.info(f"Proxy({self.player.name}): player {self.player_id} is out of time, {reason}")
+                field_numbers = {_REQUEST_QUIT}
+        if _REQUEST_QUIT in field_numbers:
+            request_bytes = sc_pb.Request(leave_game=sc_pb.RequestLeaveGame()).SerializeToString()
+            field_numbers = {_REQUEST_LEAVE_GAME}
+        if _REQUEST_LEAVE_GAME in field_numbers:
             if self.controller._status == Status.in_game:
                 logger.info(f"Proxy: player {self.player.name}({self.player_id}) surrenders")
                 self.result = {self.player_id: Result.Defeat}
             elif self.controller._status == Status.ended:
                 await self.get_response()
-        elif request.HasField("join_game") and not request.join_game.HasField("player_name"):
-            request.join_game.player_name = self.player.name
-        await self.controller._ws.send_bytes(request.SerializeToString())
+        elif _REQUEST_JOIN_GAME in field_numbers:
+            # Only decoded once per game
+            request = sc_pb.Request.FromString(request_bytes)
+            if not request.join_game.HasField("player_name"):
+                request.join_game.player_name = self.player.name
+                request_bytes = request.SerializeToString()
+        await self.controller._ws.send_bytes(request_bytes)
 
     # TODO Catching too general exception Exception (broad-except)
     # pylint: disable=W0703
@@ -79,36 +277,55 @@ class Proxy:
             logger.exception(f"Caught unknown exception: {e}")
         return response_bytes
 
-    async def parse_response(self, response_bytes):
-        response = sc_pb.Response()
-        response.ParseFromString(response_bytes)
+    async def parse_response(self, response_bytes: bytes) -> bytes:
+        """Reads the status, join_game and the result or game loop of observations from the serialized response.
+        Returns the bytes that should be forwarded to the bot, which are the unchanged response.
+
+        :param response_bytes:
+        """
+        status: Optional[int] = None
+        join_game: Optional[Tuple[int, int]] = None
+        observation: Optional[Tuple[int, int]] = None
+        for field_number, wire_type, start, end in _fields(response_bytes):
+            if field_number == _RESPONSE_STATUS and wire_type == _VARINT:
+                status, _ = _read_varint(response_bytes, start)
+            elif field_number == _RESPONSE_JOIN_GAME:
+                join_game = start, end
+            elif field_number == _RESPONSE_OBSERVATION:
+                observation = start, end
 
-        if not response.HasField("status"):
-            logger.critical("Proxy: RESPONSE HAS NO STATUS {response}")
+        if status is None:
+            logger.critical(f"Proxy: RESPONSE HAS NO STATUS {sc_pb.Response.FromString(response_bytes)}")
         else:
-            new_status = Status(response.status)
+            new_status = Status(status)
             if new_status != self.controller._status:
                 logger.info(f"Controller({self.player.name}): {self.controller._status}->{new_status}")
                 self.controller._status = new_status
 
         if self.player_id is None:
-            if response.HasField("join_game"):
-                self.player_id = response.join_game.player_id
+            if join_game is not None:
+                self.player_id = sc_pb.ResponseJoinGame.FromString(response_bytes[join_game[0]:join_game[1]]).player_id
                 logger.info(f"Proxy({self.player.name}): got join_game for {self.player_id}")
 
-        if self.result is None:
-            if response.HasField("observation"):
-                obs: sc_pb.ResponseObservation = response.observation
-                if obs.player_result:
-                    self.result = {pr.player_id: Result(pr.result) for pr in obs.player_result}
-                elif (
-                    self.timeout_loop and obs.HasField("observation") and obs.observation.game_loop > self.timeout_loop
-                ):
-                    self.result = {i: Result.Tie for i in range(1, 3)}
-                    logger.info(f"Proxy({self.player.name}) timing out")
-                    act = [sc_pb.Action(action_chat=sc_pb.ActionChat(message="Proxy: Timing out"))]
-                    await self.controller._execute(action=sc_pb.RequestAction(actions=act))
-        return response
+        if self.result is None and observation is not None:
+            player_results = []
+            game_loop: Optional[int] = None
+            for field_number, _, start, end in _fields(response_bytes, *observation):
+                if field_number == _OBSERVATION_PLAYER_RESULT:
+                    player_results.append(sc_pb.PlayerResult.FromString(response_bytes[start:end]))
+                elif field_number == _OBSERVATION_OBSERVATION:
+                    for obs_field_number, obs_wire_type, obs_start, _ in _fields(response_bytes, start, end):
+                        if obs_field_number == _OBSERVATION_GAME_LOOP and obs_wire_type == _VARINT:
+                            game_loop, _ = _read_varint(response_bytes, obs_start)
+            if player_results:
+                self.result = {pr.player_id: Result(pr.result) for pr in player_results}
+            elif self.timeout_loop and game_loop is not None and game_loop > self.timeout_loop:
+                self.result = {i: Result.Tie for i in range(1, 3)}
+                logger.info(f"Proxy({self.player.name}) timing out")
+                act = [sc_pb.Action(action_chat=sc_pb.ActionChat(message="Proxy: Timing out"))]
+                await self.controller._execute(action=sc_pb.RequestAction(actions=act))
+        self._observation_received = observation is not None
+        return response_bytes
 
     async def get_result(self):
         try:
@@ -132,13 +349,21 @@ class Proxy:
                 if msg.data and msg.type == WSMsgType.BINARY:
 
                     await self.parse_request(msg)
+                    request_sent_at = time.perf_counter()
 
                     response_bytes = await self.get_response()
                     if response_bytes is None:
                         raise ConnectionError("Could not get response_bytes")
+                    sc2_time = time.perf_counter() - request_sent_at
+                    self.latency.sc2.add(sc2_time)
+                    self._step_sc2_time += sc2_time
 
-                    new_response = await self.parse_response(response_bytes)
-                    await bot_ws.send_bytes(new_response.SerializeToString())
+                    response_bytes = await self.parse_response(response_bytes)
+                    await bot_ws.send_bytes(response_bytes)
+                    if self._observation_received:
+                        # The bot starts thinking about the next step
+                        self._observation_sent_at = time.perf_counter()
+                        self._step_sc2_time = 0
 
                 elif msg.type == WSMsgType.CLOSED:
                     logger.error("Client shutdown")
@@ -7,6 +7,8 @@ from dataclasses import dataclass
 from functools import cached_property
 from typing import TYPE_CHECKING, Any, FrozenSet, List, Optional, Set, Tuple, Union
 
+from loguru import logger
+
 from sc2.cache import CacheDict
 from sc2.constants import (
     CAN_BE_ATTACKED,
@@ -62,7 +64,7 @@ from sc2.unit_command import UnitCommand
 
 if TYPE_CHECKING:
     from sc2.bot_ai import BotAI
-    from sc2.game_data import AbilityData, UnitTypeData
+    from sc2.game_data import AbilityData, GameData, UnitTypeData
 
 
 @dataclass
@@ -101,8 +103,157 @@ class UnitOrder:
         return f"UnitOrder({self.ability}, {self.target}, {self.progress})"
 
 
+class UnitTypeStatic:
+    """Data of a unit type that is the same for all units of that type, e.g. attributes, weapons, ranges and dps.
+    One record per unit type is created at game start, every Unit references the record of its type instead of
+    looking the data up in 'game_data' again each frame.
+    Unit types that are not in the game data get a record with default values, and UnitTypeStaticTable logs a warning for them:
+    'type_data', 'name', 'race', 'creation_ability', 'tech_alias', 'unit_alias' and 'footprint_radius' are None,
+    all attributes are False (so the units are not structures), there are no weapons and all numbers are 0.
+    Unit._type_data raises a KeyError for these types like before.
+    Types that are not in UnitTypeId (e.g. units of mods) only raise a ValueError when 'type_id' is read."""
+
+    __slots__ = (
+        "unit_type",
+        "_type_id",
+        "type_data",
+        "name",
+        "race",
+        "creation_ability",
+        "attributes",
+        "is_structure",
+        "is_light",
+        "is_armored",
+        "is_biological",
+        "is_mechanical",
+        "is_massive",
+        "is_psionic",
+        "tech_alias",
+        "unit_alias",
+        "weapons",
+        "can_attack",
+        "can_attack_ground",
+        "can_attack_air",
+        "ground_dps",
+        "ground_range",
+        "air_dps",
+        "air_range",
+        "bonus_damage",
+        "armor",
+        "sight_range",
+        "movement_speed",
+        "footprint_radius",
+        "cargo_size",
+        "has_minerals",
+        "has_vespene",
+    )
+
+    def __init__(self, unit_type: int, type_data: Optional[UnitTypeData]):
+        """
+        :param unit_type: value of the UnitTypeId
+        :param type_data:
+        """
+        self.unit_type: int = unit_type
+        try:
+            type_id: Optional[UnitTypeId] = UnitTypeId(unit_type)
+        except ValueError:
+            type_id = None
+        self._type_id: Optional[UnitTypeId] = type_id
+        self.type_data: Optional[UnitTypeData] = type_data
+        proto = type_data._proto if type_data is not None else None
+        self.name: Optional[str] = proto.name if proto is not None else None
+        self.race: Optional[Race] = Race(proto.race) if proto is not None else None
+        self.creation_ability: Optional[AbilityData] = type_data.creation_ability if type_data is not None else None
+        self.attributes: FrozenSet[int] = frozenset(proto.attributes) if proto is not None else frozenset()
+        self.is_structure: bool = IS_STRUCTURE in self.attributes
+        self.is_light: bool = IS_LIGHT in self.attributes
+        self.is_armored: bool = IS_ARMORED in self.attributes
+        self.is_biological: bool = IS_BIOLOGICAL in self.attributes
+        self.is_mechanical: bool = IS_MECHANICAL in self.attributes
+        self.is_massive: bool = IS_MASSIVE in self.attributes
+        self.is_psionic: bool = IS_PSIONIC in self.attributes
+        # A tuple because the record is shared by all units of the type, Unit.tech_alias returns a list
+        tech_alias = type_data.tech_alias if type_data is not None else None
+        self.tech_alias: Optional[Tuple[UnitTypeId, ...]] = tuple(tech_alias) if tech_alias is not None else None
+        self.unit_alias: Optional[UnitTypeId] = type_data.unit_alias if type_data is not None else None
+        self.weapons = proto.weapons if proto is not None else ()
+        self.armor: float = proto.armor if proto is not None else 0
+        self.sight_range: float = proto.sight_range if proto is not None else 0
+        self.movement_speed: float = proto.movement_speed if proto is not None else 0
+        self.footprint_radius: Optional[float] = type_data.footprint_radius if type_data is not None else None
+        self.cargo_size: int = proto.cargo_size if proto is not None else 0
+        self.has_minerals: bool = proto.has_minerals if proto is not None else False
+        self.has_vespene: bool = proto.has_vespene if proto is not None else False
+
+        # TODO BATTLECRUISER doesnt have weapons in proto?!
+        self.can_attack: bool = bool(self.weapons) or type_id in {UNIT_BATTLECRUISER, UNIT_ORACLE}
+        ground_weapon = next((weapon for weapon in self.weapons if weapon.type in TARGET_GROUND), None)
+        air_weapon = next((weapon for weapon in self.weapons if weapon.type in TARGET_AIR), None)
+        self.can_attack_ground: bool = type_id in {UNIT_BATTLECRUISER, UNIT_ORACLE} or ground_weapon is not None
+        self.can_attack_air: bool = type_id == UNIT_BATTLECRUISER or air_weapon is not None
+        self.ground_dps: float = (
+            (ground_weapon.damage * ground_weapon.attacks) / ground_weapon.speed if ground_weapon is not None else 0
+        )
+        self.air_dps: float = (air_weapon.damage * air_weapon.attacks) / air_weapon.speed if air_weapon is not None else 0
+        if type_id == UNIT_ORACLE:
+            self.ground_range: float = 4
+        elif type_id == UNIT_BATTLECRUISER:
+            self.ground_range: float = 6
+        else:
+            self.ground_range: float = ground_weapon.range if ground_weapon is not None else 0
+        if type_id == UNIT_BATTLECRUISER:
+            self.air_range: float = 6
+        else:
+            self.air_range: float = air_weapon.range if air_weapon is not None else 0
+        self.bonus_damage: Optional[Tuple[int, str]] = None
+        for weapon in self.weapons:
+            if weapon.damage_bonus:
+                bonus = weapon.damage_bonus[0]
+                self.bonus_damage = bonus.bonus, Attribute(bonus.attribute).name
+                break
+
+    @property
+    def type_id(self) -> UnitTypeId:
+        if self._type_id is None:
+            # Raises the ValueError of the unknown type
+            return UnitTypeId(self.unit_type)
+        return self._type_id
+
+    def __repr__(self) -> str:
+        return f"UnitTypeStatic({self._type_id or self.unit_type})"
+
+
+class UnitTypeStaticTable(dict):
+    """ Maps the unit type value to its UnitTypeStatic record. Records of types that are not in the game data are created on first access. """
+
+    def __init__(self, game_data: Optional[GameData]):
+        """
+        :param game_data:
+        """
+        super().__init__()
+        self._game_data = game_data
+        if game_data is not None:
+            for unit_type, type_data in game_data.units.items():
+                self[unit_type] = UnitTypeStatic(unit_type, type_data)
+
+    def __missing__(self, unit_type: int) -> UnitTypeStatic:
+        type_data = self._game_data.units.get(unit_type) if self._game_data is not None else None
+        if self._game_data is not None and type_data is None:
+            logger.warning(
+                f"Unit type {unit_type} is not in the game data, its units are treated as units without attributes and weapons"
+            )
+        record = self[unit_type] = UnitTypeStatic(unit_type, type_data)
+        return record
+
+
 # pylint: disable=R0904
 class Unit:
+    # Attributes are stored in slots. '__dict__' is needed by the cached properties of the unit (functools.cached_property stores
+    # its values in the instance dict) and for custom attributes that bots set on units. The dict is only created on the first write,
+    # so units whose cached properties are never used don't have one.
+    __slots__ = ("_proto", "_bot_object", "_static", "game_loop", "base_build", "distance_calculation_index", "__dict__")
+
+    # Deprecated: no longer used, the UnitTypeId of a unit is stored in its UnitTypeStatic record. Kept for code that still uses it.
     class_cache = CacheDict()
 
     def __init__(
@@ -120,6 +271,7 @@ class Unit:
         """
         self._proto = proto_data
         self._bot_object: BotAI = bot_object
+        self._static: UnitTypeStatic = bot_object._unit_type_static[proto_data.unit_type]
         self.game_loop: int = bot_object.state.game_loop
         self.base_build = base_build
         # Index used in the 2D numpy array to access the 2D distance between two units
@@ -132,28 +284,30 @@ class Unit:
     @property
     def type_id(self) -> UnitTypeId:
         """ UnitTypeId found in sc2/ids/unit_typeid. """
-        unit_type: int = self._proto.unit_type
-        return self.class_cache.retrieve_and_set(unit_type, lambda: UnitTypeId(unit_type))
+        return self._static.type_id
 
-    @cached_property
+    @property
     def _type_data(self) -> UnitTypeData:
         """ Provides the unit type data. """
-        return self._bot_object.game_data.units[self._proto.unit_type]
+        type_data = self._static.type_data
+        if type_data is None:
+            raise KeyError(self._proto.unit_type)
+        return type_data
 
-    @cached_property
+    @property
     def _creation_ability(self) -> AbilityData:
         """ Provides the AbilityData of the creation ability of this unit. """
-        return self._type_data.creation_ability
+        return self._static.creation_ability
 
     @property
     def name(self) -> str:
         """ Returns the name of the unit. """
-        return self._type_data.name
+        return self._static.name
 
-    @cached_property
+    @property
     def race(self) -> Race:
         """ Returns the race of the unit """
-        return Race(self._type_data._proto.race)
+        return self._static.race
 
     @property
     def tag(self) -> int:
@@ -163,156 +317,122 @@ class Unit:
     @property
     def is_structure(self) -> bool:
         """ Checks if the unit is a structure. """
-        return IS_STRUCTURE in self._type_data.attributes
+        return self._static.is_structure
 
     @property
     def is_light(self) -> bool:
         """ Checks if the unit has the 'light' attribute. """
-        return IS_LIGHT in self._type_data.attributes
+        return self._static.is_light
 
     @property
     def is_armored(self) -> bool:
         """ Checks if the unit has the 'armored' attribute. """
-        return IS_ARMORED in self._type_data.attributes
+        return self._static.is_armored
 
     @property
     def is_biological(self) -> bool:
         """ Checks if the unit has the 'biological' attribute. """
-        return IS_BIOLOGICAL in self._type_data.attributes
+        return self._static.is_biological
 
     @property
     def is_mechanical(self) -> bool:
         """ Checks if the unit has the 'mechanical' attribute. """
-        return IS_MECHANICAL in self._type_data.attributes
+        return self._static.is_mechanical
 
     @property
     def is_massive(self) -> bool:
         """ Checks if the unit has the 'massive' attribute. """
-        return IS_MASSIVE in self._type_data.attributes
+        return self._static.is_massive
 
     @property
     def is_psionic(self) -> bool:
         """ Checks if the unit has the 'psionic' attribute. """
-        return IS_PSIONIC in self._type_data.attributes
+        return self._static.is_psionic
 
-    @cached_property
+    @property
     def tech_alias(self) -> Optional[List[UnitTypeId]]:
         """Building tech equality, e.g. OrbitalCommand is the same as CommandCenter
         For Hive, this returns [UnitTypeId.Hatchery, UnitTypeId.Lair]
         For SCV, this returns None"""
-        return self._type_data.tech_alias
+        tech_alias = self._static.tech_alias
+        return list(tech_alias) if tech_alias is not None else None
 
-    @cached_property
+    @property
     def unit_alias(self) -> Optional[UnitTypeId]:
         """Building type equality, e.g. FlyingOrbitalCommand is the same as OrbitalCommand
         For flying OrbitalCommand, this returns UnitTypeId.OrbitalCommand
         For SCV, this returns None"""
-        return self._type_data.unit_alias
+        return self._static.unit_alias
 
-    @cached_property
+    @property
     def _weapons(self):
         """ Returns the weapons of the unit. """
-        return self._type_data._proto.weapons
+        return self._static.weapons
 
-    @cached_property
+    @property
     def can_attack(self) -> bool:
         """ Checks if the unit can attack at all. """
-        # TODO BATTLECRUISER doesnt have weapons in proto?!
-        return bool(self._weapons) or self.type_id in {UNIT_BATTLECRUISER, UNIT_ORACLE}
+        return self._static.can_attack
 
     @property
     def can_attack_both(self) -> bool:
         """ Checks if the unit can attack both ground and air units. """
-        return self.can_attack_ground and self.can_attack_air
+        static = self._static
+        return static.can_attack_ground and static.can_attack_air
 
-    @cached_property
+    @property
     def can_attack_ground(self) -> bool:
         """ Checks if the unit can attack ground units. """
-        if self.type_id in {UNIT_BATTLECRUISER, UNIT_ORACLE}:
-            return True
-        if self._weapons:
-            return any(weapon.type in TARGET_GROUND for weapon in self._weapons)
-        return False
+        return self._static.can_attack_ground
 
-    @cached_property
+    @property
     def ground_dps(self) -> float:
         """ Returns the dps against ground units. Does not include upgrades. """
-        if self.can_attack_ground:
-            weapon = next((weapon for weapon in self._weapons if weapon.type in TARGET_GROUND), None)
-            if weapon:
-                return (weapon.damage * weapon.attacks) / weapon.speed
-        return 0
+        return self._static.ground_dps
 
-    @cached_property
+    @property
     def ground_range(self) -> float:
         """ Returns the range against ground units. Does not include upgrades. """
-        if self.type_id == UNIT_ORACLE:
-            return 4
-        if self.type_id == UNIT_BATTLECRUISER:
-            return 6
-        if self.can_attack_ground:
-            weapon = next((weapon for weapon in self._weapons if weapon.type in TARGET_GROUND), None)
-            if weapon:
-                return weapon.range
-        return 0
+        return self._static.ground_range
 
-    @cached_property
+    @property
     def can_attack_air(self) -> bool:
         """ Checks if the unit can air attack at all. Does not include upgrades. """
-        if self.type_id == UNIT_BATTLECRUISER:
-            return True
-        if self._weapons:
-            return any(weapon.type in TARGET_AIR for weapon in self._weapons)
-        return False
+        return self._static.can_attack_air
 
-    @cached_property
+    @property
     def air_dps(self) -> float:
         """ Returns the dps against air units. Does not include upgrades. """
-        if self.can_attack_air:
-            weapon = next((weapon for weapon in self._weapons if weapon.type in TARGET_AIR), None)
-            if weapon:
-                return (weapon.damage * weapon.attacks) / weapon.speed
-        return 0
+        return self._static.air_dps
 
-    @cached_property
+    @property
     def air_range(self) -> float:
         """ Returns the range against air units. Does not include upgrades. """
-        if self.type_id == UNIT_BATTLECRUISER:
-            return 6
-        if self.can_attack_air:
-            weapon = next((weapon for weapon in self._weapons if weapon.type in TARGET_AIR), None)
-            if weapon:
-                return weapon.range
-        return 0
+        return self._static.air_range
 
-    @cached_property
+    @property
     def bonus_damage(self) -> Optional[Tuple[int, str]]:
         """Returns a tuple of form '(bonus damage, armor type)' if unit does 'bonus damage' against 'armor type'.
         Possible armor typs are: 'Light', 'Armored', 'Biological', 'Mechanical', 'Psionic', 'Massive', 'Structure'."""
         # TODO: Consider units with ability attacks (Oracle, Baneling) or multiple attacks (Thor).
-        if self._weapons:
-            for weapon in self._weapons:
-                if weapon.damage_bonus:
-                    b = weapon.damage_bonus[0]
-                    return b.bonus, Attribute(b.attribute).name
-        return None
+        return self._static.bonus_damage
 
     @property
     def armor(self) -> float:
         """ Returns the armor of the unit. Does not include upgrades """
-        return self._type_data._proto.armor
+        return self._static.armor
 
     @property
     def sight_range(self) -> float:
         """ Returns the sight range of the unit. """
-        return self._type_data._proto.sight_range
+        return self._static.sight_range
 
     @property
     def movement_speed(self) -> float:
         """Returns the movement speed of the unit.
         This is the unit movement speed on game speed 'normal'. To convert it to 'faster' movement speed, multiply it by a factor of '1.4'. E.g. reaper movement speed is listed here as 3.75, but should actually be 5.25.
         Does not include upgrades or buffs."""
-        return self._type_data._proto.movement_speed
+        return self._static.movement_speed
 
     @cached_property
     def real_speed(self) -> float:
@@ -381,12 +501,12 @@ class Unit:
     @property
     def is_mineral_field(self) -> bool:
         """ Checks if the unit is a mineral field. """
-        return self._type_data.has_minerals
+        return self._static.has_minerals
 
     @property
     def is_vespene_geyser(self) -> bool:
         """ Checks if the unit is a non-empty vespene geyser or gas extraction building. """
-        return self._type_data.has_vespene
+        return self._static.has_vespene
 
     @property
     def health(self) -> float:
@@ -709,7 +829,7 @@ class Unit:
             # TODO: hardcode hellbats when they have blueflame or attack upgrades
             for bonus in weapon.damage_bonus:
                 # More about damage bonus https://github.com/Blizzard/s2client-proto/blob/b73eb59ac7f2c52b2ca585db4399f2d3202e102a/s2clientprotocol/data.proto#L55
-                if bonus.attribute in target._type_data.attributes:
+                if bonus.attribute in target._static.attributes:
                     bonus_damage_per_upgrade = (
                         0 if not self.attack_upgrade_level else
                         DAMAGE_BONUS_PER_UPGRADE.get(self.type_id, {}).get(weapon.type, {}).get(bonus.attribute, 0)
@@ -858,7 +978,7 @@ class Unit:
 
         NOTE: This can be None if a building doesn't have a creation ability.
         For rich vespene buildings, flying terran buildings, this returns None"""
-        return self._type_data.footprint_radius
+        return self._static.footprint_radius
 
     @property
     def radius(self) -> float:
@@ -1172,7 +1292,7 @@ class Unit:
     @property
     def cargo_size(self) -> int:
         """ Returns the amount of cargo space the unit needs. """
-        return self._type_data.cargo_size
+        return self._static.cargo_size
 
     @property
     def cargo_max(self) -> int:
@@ -1349,6 +1469,7 @@ class Unit:
         can_afford_check: bool = False,
     ) -> Union[UnitCommand, bool]:
         """Orders Warpgate to warp in 'unit' at 'position'.
+        Free spots in the power field can be found with self.warp_in_planner of the bot, see WarpInPlanner.
 
         :param unit:
         :param queue:
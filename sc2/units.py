@@ -3,7 +3,9 @@ from __future__ import annotations
 
 import random
 from itertools import chain
-from typing import TYPE_CHECKING, Any, Callable, Generator, Iterable, List, Optional, Set, Tuple, Union
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Generator, Hashable, Iterable, List, Optional, Set, Tuple, Union
+)
 
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
@@ -29,6 +31,13 @@ class Units(list):
         """
         super().__init__(units)
         self._bot_object = bot_object
+        # Lookup tables and selector results are built lazily on first use and reset whenever the list is modified.
+        # Unit objects are snapshots of one frame, so the cached results stay valid as long as the list is unchanged.
+        self._caches_built: bool = False
+        self._tag_index: Optional[Dict[int, int]] = None
+        self._frozen_tags: Optional[FrozenSet[int]] = None
+        self._type_buckets: Optional[Dict[UnitTypeId, List[Unit]]] = None
+        self._selector_cache: Optional[Dict[Hashable, List[Unit]]] = None
 
     def __call__(self, unit_types: Union[UnitTypeId, Iterable[UnitTypeId]]) -> Units:
         """Creates a new mutable Units object from Units or list object.
@@ -47,15 +56,123 @@ class Units(list):
         """
         return Units(self, self._bot_object)
 
+    def _contents_changed(self, order_only: bool = False):
+        if not self._caches_built:
+            return
+        self._tag_index = None
+        self._type_buckets = None
+        self._selector_cache = None
+        if not order_only:
+            self._frozen_tags = None
+        self._caches_built = self._frozen_tags is not None
+
+    def append(self, unit: Unit):
+        super().append(unit)
+        if self._caches_built:
+            self._contents_changed()
+
+    def extend(self, units: Iterable[Unit]):
+        super().extend(units)
+        self._contents_changed()
+
+    def insert(self, index: int, unit: Unit):
+        super().insert(index, unit)
+        self._contents_changed()
+
+    def remove(self, unit: Unit):
+        super().remove(unit)
+        self._contents_changed()
+
+    def pop(self, index: int = -1) -> Unit:
+        unit = super().pop(index)
+        self._contents_changed()
+        return unit
+
+    def clear(self):
+        super().clear()
+        self._contents_changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._contents_changed(order_only=True)
+
+    def reverse(self):
+        super().reverse()
+        self._contents_changed(order_only=True)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._contents_changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._contents_changed()
+
+    def __iadd__(self, other: Iterable[Unit]) -> Units:
+        super().__iadd__(other)
+        self._contents_changed()
+        return self
+
+    @property
+    def _tag_to_index(self) -> Dict[int, int]:
+        """ Maps each tag to the position of its unit in this list. If a tag appears more than once, the first position is kept. """
+        if self._tag_index is None:
+            tag_index: Dict[int, int] = {}
+            for index, unit in enumerate(super().__iter__()):
+                tag_index.setdefault(unit.tag, index)
+            self._tag_index = tag_index
+            self._caches_built = True
+        return self._tag_index
+
+    def _tags_frozen(self) -> FrozenSet[int]:
+        if self._frozen_tags is None:
+            self._frozen_tags = frozenset(self._tag_to_index)
+            self._caches_built = True
+        return self._frozen_tags
+
+    @property
+    def _units_by_type(self) -> Dict[UnitTypeId, List[Unit]]:
+        """ Groups the units by their type in one pass, each group keeps the order of this list. """
+        if self._type_buckets is None:
+            type_buckets: Dict[UnitTypeId, List[Unit]] = {}
+            for unit in super().__iter__():
+                type_id = unit.type_id
+                bucket = type_buckets.get(type_id)
+                if bucket is None:
+                    type_buckets[type_id] = [unit]
+                else:
+                    bucket.append(unit)
+            self._type_buckets = type_buckets
+            self._caches_built = True
+        return self._type_buckets
+
+    def _cached_selection(self, key: Hashable, compute: Callable[[], List[Unit]]) -> Units:
+        """Returns a new Units object of the units that 'compute' selects.
+        The selection is computed once per key until this Units object is modified, the returned object is a copy that may be modified."""
+        if self._selector_cache is None:
+            self._selector_cache = {}
+            self._caches_built = True
+        selection = self._selector_cache.get(key)
+        if selection is None:
+            selection = self._selector_cache[key] = compute()
+        return Units(selection, self._bot_object)
+
+    def _cached_filter(self, key: Hashable, pred: Callable[[Unit], Any]) -> Units:
+        return self._cached_selection(key, lambda: [unit for unit in super(Units, self).__iter__() if pred(unit)])
+
+    @staticmethod
+    def _tag_set_of(units: Iterable[Unit]) -> FrozenSet[int]:
+        if isinstance(units, Units):
+            return units._tags_frozen()
+        return frozenset(unit.tag for unit in units)
+
     def __or__(self, other: Units) -> Units:
         """
         :param other:
         """
+        self_tags = self._tags_frozen()
         return Units(
-            chain(
-                iter(self),
-                (other_unit for other_unit in other if other_unit.tag not in (self_unit.tag for self_unit in self)),
-            ),
+            chain(super().__iter__(), (other_unit for other_unit in other if other_unit.tag not in self_tags)),
             self._bot_object,
         )
 
@@ -63,31 +180,21 @@ class Units(list):
         """
         :param other:
         """
-        return Units(
-            chain(
-                iter(self),
-                (other_unit for other_unit in other if other_unit.tag not in (self_unit.tag for self_unit in self)),
-            ),
-            self._bot_object,
-        )
+        return self.__or__(other)
 
     def __and__(self, other: Units) -> Units:
         """
         :param other:
         """
-        return Units(
-            (other_unit for other_unit in other if other_unit.tag in (self_unit.tag for self_unit in self)),
-            self._bot_object,
-        )
+        self_tags = self._tags_frozen()
+        return Units((other_unit for other_unit in other if other_unit.tag in self_tags), self._bot_object)
 
     def __sub__(self, other: Units) -> Units:
         """
         :param other:
         """
-        return Units(
-            (self_unit for self_unit in self if self_unit.tag not in (other_unit.tag for other_unit in other)),
-            self._bot_object,
-        )
+        other_tags = self._tag_set_of(other)
+        return Units((self_unit for self_unit in super().__iter__() if self_unit.tag not in other_tags), self._bot_object)
 
     def __hash__(self) -> int:
         return hash(unit.tag for unit in self)
@@ -108,10 +215,10 @@ class Units(list):
         """
         :param tag:
         """
-        for unit in self:
-            if unit.tag == tag:
-                return unit
-        return None
+        index = self._tag_to_index.get(tag)
+        if index is None:
+            return None
+        return self[index]
 
     def by_tag(self, tag: int) -> Unit:
         """
@@ -515,6 +622,13 @@ class Units(list):
 
         :param other:
         """
+        if not isinstance(other, (set, frozenset, dict)):
+            other = set(other)
+        if len(other) * 4 < len(self):
+            # Few tags requested: look them up instead of scanning all units, sort to keep the order of this list
+            tag_index = self._tag_to_index
+            indices = sorted(tag_index[tag] for tag in other if tag in tag_index)
+            return self.subgroup(self[index] for index in indices)
         return self.filter(lambda unit: unit.tag in other)
 
     def tags_not_in(self, other: Iterable[int]) -> Units:
@@ -529,6 +643,8 @@ class Units(list):
 
         :param other:
         """
+        if not isinstance(other, (set, frozenset, dict)):
+            other = set(other)
         return self.filter(lambda unit: unit.tag not in other)
 
     def of_type(self, other: Union[UnitTypeId, Iterable[UnitTypeId]]) -> Units:
@@ -542,10 +658,20 @@ class Units(list):
         :param other:
         """
         if isinstance(other, UnitTypeId):
-            other = {other}
-        elif isinstance(other, list):
-            other = set(other)
-        return self.filter(lambda unit: unit.type_id in other)
+            return Units(self._units_by_type.get(other, ()), self._bot_object)
+        other = frozenset(other)
+        return self._cached_selection(("of_type", other), lambda: self._of_types(other))
+
+    def _of_types(self, types: FrozenSet[UnitTypeId]) -> List[Unit]:
+        buckets = [bucket for type_id, bucket in self._units_by_type.items() if type_id in types]
+        if len(buckets) <= 1:
+            return buckets[0] if buckets else []
+        tag_index = self._tag_to_index
+        if len(tag_index) != len(self):
+            # The same unit is in this list more than once, the tag index can not restore the order
+            return [unit for unit in super().__iter__() if unit.type_id in types]
+        # Merge the buckets back into the order of this list
+        return sorted(chain.from_iterable(buckets), key=lambda unit: tag_index[unit.tag])
 
     def exclude_type(self, other: Union[UnitTypeId, Iterable[UnitTypeId]]) -> Units:
         """Filters all units that are not of a specific type
@@ -557,11 +683,8 @@ class Units(list):
 
         :param other:
         """
-        if isinstance(other, UnitTypeId):
-            other = {other}
-        elif isinstance(other, list):
-            other = set(other)
-        return self.filter(lambda unit: unit.type_id not in other)
+        other = frozenset({other}) if isinstance(other, UnitTypeId) else frozenset(other)
+        return self._cached_filter(("exclude_type", other), lambda unit: unit.type_id not in other)
 
     def same_tech(self, other: Set[UnitTypeId]) -> Units:
         """Returns all structures that have the same base structure.
@@ -646,88 +769,88 @@ class Units(list):
     @property
     def selected(self) -> Units:
         """ Returns all units that are selected by the human player. """
-        return self.filter(lambda unit: unit.is_selected)
+        return self._cached_filter("selected", lambda unit: unit.is_selected)
 
     @property
     def tags(self) -> Set[int]:
-        """ Returns all unit tags as a set. """
-        return {unit.tag for unit in self}
+        """ Returns all unit tags as a set. The set is a copy of the tags that are cached until this Units object is modified. """
+        return set(self._tags_frozen())
 
     @property
     def ready(self) -> Units:
         """ Returns all structures that are ready (construction complete). """
-        return self.filter(lambda unit: unit.is_ready)
+        return self._cached_filter("ready", lambda unit: unit.is_ready)
 
     @property
     def not_ready(self) -> Units:
         """ Returns all structures that are not ready (construction not complete). """
-        return self.filter(lambda unit: not unit.is_ready)
+        return self._cached_filter("not_ready", lambda unit: not unit.is_ready)
 
     @property
     def idle(self) -> Units:
         """ Returns all units or structures that are doing nothing (unit is standing still, structure is doing nothing). """
-        return self.filter(lambda unit: unit.is_idle)
+        return self._cached_filter("idle", lambda unit: unit.is_idle)
 
     @property
     def owned(self) -> Units:
         """ Deprecated: All your units. """
-        return self.filter(lambda unit: unit.is_mine)
+        return self._cached_filter("owned", lambda unit: unit.is_mine)
 
     @property
     def enemy(self) -> Units:
         """ Deprecated: All enemy units."""
-        return self.filter(lambda unit: unit.is_enemy)
+        return self._cached_filter("enemy", lambda unit: unit.is_enemy)
 
     @property
     def flying(self) -> Units:
         """ Returns all units that are flying. """
-        return self.filter(lambda unit: unit.is_flying)
+        return self._cached_filter("flying", lambda unit: unit.is_flying)
 
     @property
     def not_flying(self) -> Units:
         """ Returns all units that not are flying. """
-        return self.filter(lambda unit: not unit.is_flying)
+        return self._cached_filter("not_flying", lambda unit: not unit.is_flying)
 
     @property
     def structure(self) -> Units:
         """ Deprecated: All structures. """
-        return self.filter(lambda unit: unit.is_structure)
+        return self._cached_filter("structure", lambda unit: unit.is_structure)
 
     @property
     def not_structure(self) -> Units:
         """ Deprecated: All units that are not structures. """
-        return self.filter(lambda unit: not unit.is_structure)
+        return self._cached_filter("not_structure", lambda unit: not unit.is_structure)
 
     @property
     def gathering(self) -> Units:
         """ Returns all workers that are mining minerals or vespene (gather command). """
-        return self.filter(lambda unit: unit.is_gathering)
+        return self._cached_filter("gathering", lambda unit: unit.is_gathering)
 
     @property
     def returning(self) -> Units:
         """ Returns all workers that are carrying minerals or vespene and are returning to a townhall. """
-        return self.filter(lambda unit: unit.is_returning)
+        return self._cached_filter("returning", lambda unit: unit.is_returning)
 
     @property
     def collecting(self) -> Units:
         """ Returns all workers that are mining or returning resources. """
-        return self.filter(lambda unit: unit.is_collecting)
+        return self._cached_filter("collecting", lambda unit: unit.is_collecting)
 
     @property
     def visible(self) -> Units:
         """Returns all units or structures that are visible.
         TODO: add proper description on which units are exactly visible (not snapshots?)"""
-        return self.filter(lambda unit: unit.is_visible)
+        return self._cached_filter("visible", lambda unit: unit.is_visible)
 
     @property
     def mineral_field(self) -> Units:
         """ Returns all units that are mineral fields. """
-        return self.filter(lambda unit: unit.is_mineral_field)
+        return self._cached_filter("mineral_field", lambda unit: unit.is_mineral_field)
 
     @property
     def vespene_geyser(self) -> Units:
         """ Returns all units that are vespene geysers. """
-        return self.filter(lambda unit: unit.is_vespene_geyser)
+        return self._cached_filter("vespene_geyser", lambda unit: unit.is_vespene_geyser)
 
     @property
     def prefer_idle(self) -> Units:
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+if TYPE_CHECKING:
+    from sc2.bot_ai import BotAI
+
+# Size of the square spot that a warped in unit needs, 1 if not listed.
+# Units with a radius larger than half a cell get a 2x2 spot so units warped in next to each other don't overlap.
+WARP_IN_FOOTPRINT: Dict[UnitTypeId, int] = {
+    UnitTypeId.STALKER: 2,
+    UnitTypeId.SENTRY: 2,
+}
+
+
+class WarpInPlanner:
+    """
+    Finds spots to warp in units without sending placement queries to SC2.
+
+    A cell is free if it is powered (see PsionicMatrix.grid), pathable and no ground unit stands on it.
+    The free cells are computed once per frame for the area of the power sources.
+    Spots that were returned are reserved until the next frame, so multiple calls in one frame never return the same spot.
+
+    Example::
+
+        spots = self.warp_in_planner.spots(len(warpgates), near=self.enemy_start_locations[0], footprint=2)
+        for warpgate, spot in zip(warpgates, spots):
+            warpgate.warp_in(UnitTypeId.STALKER, spot)
+    """
+
+    def __init__(self, bot: BotAI):
+        self._bot = bot
+        # (game loop, power sources) of the free cells
+        self._key: Optional[Tuple[int, bytes]] = None
+        # Free cells of the area of the power sources, indexed by [y - origin y, x - origin x]
+        self._free: np.ndarray = np.zeros((0, 0), dtype=bool)
+        self._origin: Tuple[int, int] = (0, 0)
+        # (power sources, width, height) of the powered grid, it is kept over frames while the power sources don't change
+        self._powered_key: Optional[Tuple[bytes, int, int]] = None
+        self._powered: np.ndarray = np.zeros((0, 0), dtype=bool)
+
+    def _update(self):
+        bot = self._bot
+        matrix = bot.state.psionic_matrix
+        key = (bot.state.game_loop, matrix.array.tobytes())
+        if key == self._key:
+            return
+        self._key = key
+        sources = matrix.array
+        if not len(sources):
+            self._free = np.zeros((0, 0), dtype=bool)
+            self._origin = (0, 0)
+            return
+
+        pathing_grid = bot.game_info.pathing_grid
+        width, height = pathing_grid.width, pathing_grid.height
+        x0 = max(0, int((sources[:, 0] - sources[:, 2]).min()))
+        y0 = max(0, int((sources[:, 1] - sources[:, 2]).min()))
+        x1 = min(width, int((sources[:, 0] + sources[:, 2]).max()) + 1)
+        y1 = min(height, int((sources[:, 1] + sources[:, 2]).max()) + 1)
+        powered_key = (key[1], width, height)
+        if powered_key != self._powered_key:
+            self._powered_key = powered_key
+            self._powered = matrix.grid(width, height)
+        # The pathing grid is updated every frame, structures are not pathable
+        free = self._powered[y0:y1, x0:x1] & (pathing_grid.region(x0, y0, x1, y1) == 1)
+
+        # Remove the cells that are overlapped by ground units
+        for unit in bot.all_units:
+            if unit.is_structure or unit.is_flying:
+                continue
+            x, y = unit.position_tuple
+            radius = unit.radius
+            if x + radius < x0 or x - radius >= x1 or y + radius < y0 or y - radius >= y1:
+                continue
+            free[max(0, int(y - radius) - y0):int(y + radius) + 1 - y0,
+                 max(0, int(x - radius) - x0):int(x + radius) + 1 - x0] = False
+
+        self._free = free
+        self._origin = (x0, y0)
+
+    def spots(self, amount: int, near: Optional[Point2] = None, footprint: int = 1) -> List[Point2]:
+        """Returns up to 'amount' non-overlapping spots where units can be warped in, best spots first.
+        The returned spots are reserved for the rest of the frame.
+
+        :param amount:
+        :param near: prefer spots close to this point, by default spots close to the power sources
+        :param footprint: 1 for a 1x1 spot, 2 for a 2x2 spot, see WARP_IN_FOOTPRINT
+        """
+        assert footprint in {1, 2}, f"footprint is {footprint}, it should be 1 or 2"
+        self._update()
+        free = self._free
+        if amount <= 0 or not free.size:
+            return []
+        if footprint == 1:
+            blocks = free
+        else:
+            blocks = free[:-1, :-1] & free[1:, :-1] & free[:-1, 1:] & free[1:, 1:]
+        ys, xs = np.nonzero(blocks)
+        if not len(xs):
+            return []
+
+        x0, y0 = self._origin
+        centers = np.column_stack((xs + x0 + footprint / 2, ys + y0 + footprint / 2))
+        if near is None:
+            sources = self._bot.state.psionic_matrix.array
+            distances = ((centers[:, None, :] - sources[None, :, :2])**2).sum(axis=2).min(axis=1)
+        else:
+            distances = ((centers - np.array(near[:2], dtype=np.float64))**2).sum(axis=1)
+
+        spots: List[Point2] = []
+        for index in np.argsort(distances, kind="stable").tolist():
+            x, y = xs[index], ys[index]
+            cells = free[y:y + footprint, x:x + footprint]
+            # Cells may have been reserved by a spot that was chosen before in this loop
+            if not cells.all():
+                continue
+            cells[:] = False
+            spots.append(Point2(centers[index].tolist()))
+            if len(spots) == amount:
+                break
+        return spots